@@ -0,0 +1,254 @@
+"""
+Offline microbenchmarks for the bot's hot paths.
+
+Runs without Discord or Lavalink: searches are answered from an in-memory
+catalog and interactions/players are fakes from ``benchmarks.fakes``.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_hotpaths --save bench_baseline.json
+    python -m benchmarks.bench_hotpaths --compare bench_baseline.json
+"""
+import logging
+import os
+import random
+import tempfile
+
+import wavelink
+
+import renify_controller
+import renify_core
+from benchmarks.fakes import FakeInteraction, make_playlist, make_session, make_tracks
+from benchmarks.runner import Bench
+from renify_autocomplete import AutocompleteIndex
+from renify_autoplay import CoOccurrenceIndex
+from renify_playlists import PlaylistStore, decode_track
+from renify_queue import RenifyQueue
+from renify_sources import classify
+from renify_stats import FleetStats
+from renify_tracing import tracer
+
+# Keep per-command INFO logging and trace files out of the measurements
+logging.getLogger('RenifyBot').setLevel(logging.WARNING)
+tracer.path = None
+
+QUEUE_SIZES = (10, 500, 5000)
+
+bench = Bench("hotpaths")
+
+
+# --- RATE LIMITER ---
+
+def _rate_limiter_case(users: int):
+    def setup():
+        limiter = renify_core.RateLimiter()
+        ids = [random.randrange(users) for _ in range(4096)]
+        state = {'i': 0}
+
+        def run():
+            state['i'] = (state['i'] + 1) & 4095
+            limiter.is_rate_limited(ids[state['i']])
+        for user_id in range(users):
+            limiter.is_rate_limited(user_id)
+        return run
+    return setup
+
+
+for _users in (1_000, 100_000):
+    bench.case(f"rate_limiter/{_users}_users")(_rate_limiter_case(_users))
+
+
+# --- INPUT VALIDATION ---
+
+@bench.case("validate_query/text")
+def _():
+    return lambda: renify_core.validate_query("  never gonna give you up rick astley  ")
+
+
+@bench.case("validate_query/max_length")
+def _():
+    query = "a" * renify_core.MAX_QUERY_LENGTH
+    return lambda: renify_core.validate_query(query)
+
+
+@bench.case("validate_query/url")
+def _():
+    return lambda: renify_core.validate_query("https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PL1234567890")
+
+
+@bench.case("classify/text")
+def _():
+    return lambda: classify("never gonna give you up rick astley")
+
+
+@bench.case("classify/youtube_share")
+def _():
+    return lambda: classify("https://youtu.be/dQw4w9WgXcQ?si=Ab3dEfGh1jKlMn0p")
+
+
+@bench.case("classify/spotify_playlist")
+def _():
+    return lambda: classify("https://open.spotify.com/intl-de/playlist/37i9dQZF1DWXRqgorJj26U?si=0123456789abcdef")
+
+
+# --- AUTOCOMPLETE ---
+
+def _autocomplete_case(history: int, text: str):
+    def setup():
+        index = AutocompleteIndex(popular_path="")
+        for track in make_tracks(history):
+            index.record(1, track)
+        return lambda: index.suggest(1, text)
+    return setup
+
+
+bench.case("autocomplete/1000_broad_prefix")(_autocomplete_case(1000, "benchmark song"))
+bench.case("autocomplete/1000_word_prefix")(_autocomplete_case(1000, "number 42"))
+
+
+# --- RENDERING ---
+
+def _queue_command_case(size: int):
+    def setup():
+        guild, user, player = make_session(queue_size=size)
+        cog = renify_core.MusicCog(None)
+        callback = renify_core.MusicCog.queue_command.callback
+
+        async def run():
+            await callback(cog, FakeInteraction(guild, user))
+        return run
+    return setup
+
+
+def _controller_embed_case(size: int):
+    def setup():
+        guild, user, player = make_session(queue_size=size)
+        create = renify_controller.MusicCog.create_controller_embed
+        return lambda: create(None, player, player.current)
+    return setup
+
+
+for _size in QUEUE_SIZES:
+    bench.case(f"queue_command/{_size}")(_queue_command_case(_size))
+    bench.case(f"controller_embed/{_size}")(_controller_embed_case(_size))
+
+
+@bench.case("help_command")
+def _():
+    guild, user, _ = make_session()
+    cog = renify_core.MusicCog(None)
+    callback = renify_core.MusicCog.help_command.callback
+
+    async def run():
+        await callback(cog, FakeInteraction(guild, user))
+    return run
+
+
+# --- /play TIER CHECKS ---
+
+def _play_case(queue_size: int, result):
+    """Run play_command end to end up to the tier check, which rejects the request."""
+    def setup():
+        async def search(query, **kwargs):
+            return result
+
+        guild, user, player = make_session(queue_size=queue_size)
+        cog = renify_core.MusicCog(None)
+        callback = renify_core.MusicCog.play_command.callback
+
+        async def run():
+            # Each call is a fresh user so the rate limiter never short-circuits the path
+            user.id += 1
+            if len(renify_core.rate_limiter.users) > 10_000:
+                renify_core.rate_limiter.users.clear()
+            original, wavelink.Playable.search = vars(wavelink.Playable)['search'], search
+            try:
+                await callback(cog, FakeInteraction(guild, user), "benchmark song")
+            finally:
+                wavelink.Playable.search = original
+        return run
+    return setup
+
+
+bench.case("play_tier_check/playlist_over_limit")(_play_case(400, make_playlist(200)))
+bench.case("play_tier_check/queue_full")(_play_case(500, make_tracks(1)))
+
+
+# --- PLAYLIST ENQUEUE ---
+
+def _queue_extend_case(size: int):
+    def setup():
+        tracks = make_tracks(size)
+
+        def run():
+            queue = RenifyQueue()
+            # Same call play_command makes when a playlist is loaded
+            queue.put(tracks)
+        return run
+    return setup
+
+
+for _size in QUEUE_SIZES:
+    bench.case(f"queue_extend/{_size}")(_queue_extend_case(_size))
+
+
+# --- SAVED PLAYLISTS ---
+
+def _playlist_load_case(size: int):
+    """Read, decompress and decode a saved playlist, as /playlist load does."""
+    def setup():
+        store = PlaylistStore(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+        tracks = make_tracks(size)
+        store._save(1, "bench", [t.encoded for t in tracks], sum(t.length for t in tracks))
+
+        async def run():
+            await store.load(1, "bench")
+        return run
+    return setup
+
+
+@bench.case("playlist/decode_track")
+def _():
+    encoded = make_tracks(1)[0].encoded
+    return lambda: decode_track(encoded)
+
+
+bench.case("playlist/load_500")(_playlist_load_case(500))
+
+
+# --- AUTOPLAY ---
+
+@bench.case("autoplay/pick")
+def _():
+    index = CoOccurrenceIndex()
+    tracks = make_tracks(2000)
+    for i in range(100_000):
+        index.record(i % 50, tracks[(i * 7919) % len(tracks)], at=float(i))
+    return lambda: index.pick(1, tracks[3])
+
+
+# --- STATS ---
+
+def _fleet(guilds: int) -> tuple[FleetStats, list]:
+    fleet = FleetStats(tier_of=lambda track: 'FREE')
+    players = []
+    for i in range(guilds):
+        _, _, player = make_session(guild_id=i, queue_size=20, playing=False)
+        fleet.attach(player)
+        players.append(player)
+    return fleet, players
+
+
+@bench.case("stats/snapshot_1000_guilds")
+def _():
+    fleet, _ = _fleet(1000)
+    return fleet.snapshot
+
+
+@bench.case("stats/reconcile_1000_guilds")
+def _():
+    fleet, players = _fleet(1000)
+    return lambda: fleet.reconcile(players)
+
+
+if __name__ == "__main__":
+    bench.main()
@@ -0,0 +1,145 @@
+"""
+Queue editing benchmarks: ``RenifyQueue`` (chunked, indexed) vs ``wavelink.Queue`` (flat list).
+
+Every case leaves the queue at its original size so repeated calls measure
+the same operation on the same-sized queue.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_queue
+    python -m benchmarks.bench_queue --filter 100000
+"""
+import random
+
+import wavelink
+
+from benchmarks.fakes import make_tracks
+from benchmarks.runner import Bench
+from renify_queue import RenifyQueue
+
+SIZES = (5_000, 100_000)
+QUEUES = {'renify': RenifyQueue, 'wavelink': wavelink.Queue}
+RANGE = 100
+
+bench = Bench("queue")
+_tracks: dict[int, list[wavelink.Playable]] = {}
+
+
+def _filled(kind: str, size: int) -> wavelink.Queue:
+    if size not in _tracks:
+        _tracks[size] = make_tracks(size)
+    queue = QUEUES[kind]()
+    queue.put(_tracks[size])
+    return queue
+
+
+def _get_put(kind, size):
+    def setup():
+        queue = _filled(kind, size)
+
+        def run():
+            # What autoplay does when a track ends, then a /play appends
+            queue.put(queue.get())
+        return run
+    return setup
+
+
+def _remove_middle(kind, size):
+    def setup():
+        queue = _filled(kind, size)
+        rng = random.Random(0)
+
+        def run():
+            i = rng.randrange(size)
+            track = queue[i]
+            queue.delete(i)
+            queue.put_at(i, track)
+        return run
+    return setup
+
+
+def _move(kind, size):
+    def setup():
+        queue = _filled(kind, size)
+        rng = random.Random(0)
+
+        def run():
+            src, dst = rng.randrange(size), rng.randrange(size)
+            if kind == 'renify':
+                queue.move(src, dst)
+            else:
+                queue.put_at(dst, queue.get_at(src))
+        return run
+    return setup
+
+
+def _remove_range(kind, size):
+    def setup():
+        queue = _filled(kind, size)
+        refill = _tracks[size][:RANGE]
+        rng = random.Random(0)
+
+        def run():
+            start = rng.randrange(size - RANGE)
+            if kind == 'renify':
+                queue.remove_range(start, start + RANGE)
+            else:
+                del queue[start:start + RANGE]
+            queue.put(refill)
+        return run
+    return setup
+
+
+def _skip_to(kind, size):
+    def setup():
+        queue = _filled(kind, size)
+        refill = _tracks[size][:RANGE + 1]
+
+        def run():
+            if kind == 'renify':
+                queue.skip_to(RANGE)
+            else:
+                del queue[:RANGE]
+                queue.get()
+            queue.put(refill)
+        return run
+    return setup
+
+
+def _shuffle(kind, size):
+    def setup():
+        queue = _filled(kind, size)
+        return queue.shuffle
+    return setup
+
+
+def _index(kind, size):
+    def setup():
+        queue = _filled(kind, size)
+        rng = random.Random(0)
+        return lambda: queue[rng.randrange(size)]
+    return setup
+
+
+def _filter_duplicates(size):
+    def setup():
+        queue = _filled('renify', size)
+        # Half of the pasted playlist overlaps with what is queued
+        playlist = _tracks[size][size // 2:] + make_tracks(size // 2, start=size)
+        return lambda: queue.filter_new(playlist)
+    return setup
+
+
+for _size in SIZES:
+    for _kind in QUEUES:
+        bench.case(f"get_put/{_kind}/{_size}")(_get_put(_kind, _size))
+        bench.case(f"remove_middle/{_kind}/{_size}")(_remove_middle(_kind, _size))
+        bench.case(f"move/{_kind}/{_size}")(_move(_kind, _size))
+        bench.case(f"remove_range_{RANGE}/{_kind}/{_size}")(_remove_range(_kind, _size))
+        bench.case(f"skip_to/{_kind}/{_size}")(_skip_to(_kind, _size))
+        bench.case(f"shuffle/{_kind}/{_size}")(_shuffle(_kind, _size))
+        bench.case(f"index/{_kind}/{_size}")(_index(_kind, _size))
+    bench.case(f"filter_duplicates/renify/{_size}")(_filter_duplicates(_size))
+
+
+if __name__ == "__main__":
+    bench.main()
@@ -0,0 +1,113 @@
+"""
+Event throughput with and without ``RENIFY_SPEEDUPS`` (uvloop + orjson).
+
+Replays a mix of gateway events (interaction, voice state, presence) and
+Lavalink websocket events (player update, track start) through the same
+steps the libraries take: decode with ``discord.utils._from_json`` or
+``aiohttp.WSMessage.json``, then dispatch each event to a listener task on
+the event loop. Reports events per second and CPU milliseconds per 1,000
+events for the standard library baseline and for the speedups mode (only the
+parts whose packages are installed).
+
+Usage (from the repository root):
+    python -m benchmarks.bench_speedups
+    python -m benchmarks.bench_speedups --events 50000
+"""
+import argparse
+import asyncio
+import json
+from time import perf_counter, process_time
+
+import aiohttp
+import discord
+
+import renify_speedups
+from benchmarks.fakes import make_track_payload
+
+ROUNDS = 5
+
+
+def _gateway_events() -> list[str]:
+    user = {'id': '80351110224678912', 'username': 'listener', 'global_name': 'Listener', 'avatar': 'a' * 32,
+            'discriminator': '0', 'public_flags': 64}
+    member = {'user': user, 'roles': [str(10 ** 17 + i) for i in range(6)], 'joined_at': '2024-01-01T00:00:00+00:00',
+              'deaf': False, 'mute': False, 'flags': 0, 'permissions': '2248473465835073'}
+    interaction = {'t': 'INTERACTION_CREATE', 's': 42, 'op': 0, 'd': {
+        'id': '1234567890123456789', 'application_id': '987654321098765432', 'type': 2, 'token': 't' * 180,
+        'guild_id': '111111111111111111', 'channel_id': '222222222222222222', 'member': member, 'locale': 'en-US',
+        'guild_locale': 'en-US', 'app_permissions': '2248473465835073', 'entitlements': [],
+        'data': {'id': '333333333333333333', 'name': 'play', 'type': 1,
+                 'options': [{'name': 'query', 'type': 3, 'value': 'never gonna give you up rick astley'}]}}}
+    voice = {'t': 'VOICE_STATE_UPDATE', 's': 43, 'op': 0, 'd': {
+        'guild_id': '111111111111111111', 'channel_id': '444444444444444444', 'user_id': user['id'], 'member': member,
+        'session_id': 's' * 32, 'deaf': False, 'mute': False, 'self_deaf': False, 'self_mute': True,
+        'self_video': False, 'suppress': False, 'request_to_speak_timestamp': None}}
+    presence = {'t': 'PRESENCE_UPDATE', 's': 44, 'op': 0, 'd': {
+        'user': {'id': user['id']}, 'guild_id': '111111111111111111', 'status': 'online',
+        'activities': [{'name': 'Spotify', 'type': 2, 'details': 'Song', 'state': 'Artist', 'created_at': 1700000000000}],
+        'client_status': {'desktop': 'online'}}}
+    return [json.dumps(e) for e in (interaction, voice, presence)]
+
+
+def _lavalink_events() -> list[aiohttp.WSMessage]:
+    update = {'op': 'playerUpdate', 'guildId': '111111111111111111',
+              'state': {'time': 1700000000000, 'position': 61234, 'connected': True, 'ping': 23}}
+    start = {'op': 'event', 'type': 'TrackStartEvent', 'guildId': '111111111111111111', 'track': make_track_payload(7)}
+    return [aiohttp.WSMessage(aiohttp.WSMsgType.TEXT, json.dumps(e), None) for e in (update, start)]
+
+
+async def _pump(events: int, gateway: list[str], lavalink: list[aiohttp.WSMessage]) -> tuple[float, float]:
+    seen = 0
+
+    async def listener(payload):
+        nonlocal seen
+        seen += 1
+
+    mix = [(True, g) for g in gateway] * 3 + [(False, m) for m in lavalink] * 2  # Gateway traffic dominates
+    loop = asyncio.get_running_loop()
+    wall, cpu = perf_counter(), process_time()
+    for i in range(events):
+        is_gateway, raw = mix[i % len(mix)]
+        payload = discord.utils._from_json(raw) if is_gateway else raw.json()
+        loop.create_task(listener(payload))  # discord.py schedules each listener as its own task
+        if i % 64 == 63:
+            await asyncio.sleep(0)
+    while seen < events:
+        await asyncio.sleep(0)
+    return perf_counter() - wall, process_time() - cpu
+
+
+def _measure(events: int, loop_factory, rounds: int) -> tuple[float, float]:
+    gateway, lavalink = _gateway_events(), _lavalink_events()
+    best = None
+    for _ in range(rounds):
+        with asyncio.Runner(loop_factory=loop_factory) as runner:
+            result = runner.run(_pump(events, gateway, lavalink))
+        best = result if best is None or result[0] < best[0] else best
+    return best
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Renify benchmarks: speedups")
+    parser.add_argument('--events', type=int, default=20_000)
+    parser.add_argument('--rounds', type=int, default=ROUNDS)
+    args = parser.parse_args(argv)
+
+    # Baseline: what a plain `pip install -r requirements.txt` gives (discord.py picks orjson on its own if present)
+    discord.utils._from_json = json.loads
+    results = {'stdlib': _measure(args.events, None, args.rounds)}
+
+    used = renify_speedups.install(True)
+    label = f"speedups ({used['loop']}, {used['json']})"
+    results[label] = _measure(args.events, renify_speedups.loop_factory(), args.rounds)
+
+    print(f"{'mode':<32} {'events/s':>12} {'CPU ms / 1k events':>20}")
+    base_wall = results['stdlib'][0]
+    for name, (wall, cpu) in results.items():
+        change = f"  ({base_wall / wall:.2f}x)" if name != 'stdlib' else ""
+        print(f"{name:<32} {args.events / wall:>12,.0f} {cpu * 1000 / (args.events / 1000):>20.2f}{change}")
+    print(f"gateway compression: {used['gateway']}, REST compression: {used['http']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+Offline stand-ins for the Discord and Wavelink objects the cogs touch.
+
+Tracks and playlists are real ``wavelink.Playable`` / ``wavelink.Playlist``
+objects built from Lavalink-shaped payloads, so anything that renders or
+type-checks them behaves exactly as in production. Interactions, guilds,
+channels and players are minimal fakes that record what the bot sent.
+"""
+import base64
+import struct
+from types import SimpleNamespace
+
+import wavelink
+
+from renify_queue import RenifyQueue
+
+
+# --- TRACKS ---
+
+def _utf(text: str) -> bytes:
+    data = text.encode('utf-8')
+    return struct.pack('>H', len(data)) + data
+
+
+def encode_track(info: dict) -> str:
+    """Lavalink's binary track encoding (versioned message, track info version 3)."""
+    body = bytearray([3])
+    body += _utf(info["title"]) + _utf(info["author"]) + struct.pack('>q', info["length"]) + _utf(info["identifier"])
+    body.append(info["isStream"])
+    for key in ("uri", "artworkUrl", "isrc"):
+        body += b'\x01' + _utf(info[key]) if info.get(key) is not None else b'\x00'
+    body += _utf(info["sourceName"]) + struct.pack('>q', info.get("position", 0))
+    return base64.b64encode(struct.pack('>I', len(body) | 1 << 30) + body).decode()
+
+
+def make_track_payload(i: int, source: str = "youtube", length: int = 210_000) -> dict:
+    """Build a Lavalink v4 track payload for the i-th catalog entry."""
+    identifier = f"trk{i:07d}"
+    info = {
+        "identifier": identifier,
+        "isSeekable": True,
+        "author": f"Artist {i % 997}",
+        "length": length,
+        "isStream": False,
+        "position": 0,
+        "title": f"Benchmark Song Number {i} (Official Audio)",
+        "uri": f"https://www.youtube.com/watch?v={identifier}",
+        "artworkUrl": f"https://i.ytimg.com/vi/{identifier}/hqdefault.jpg",
+        "isrc": None,
+        "sourceName": source,
+    }
+    return {"encoded": encode_track(info), "info": info, "pluginInfo": {}, "userData": {}}
+
+
+def make_tracks(count: int, start: int = 0) -> list[wavelink.Playable]:
+    return [wavelink.Playable(make_track_payload(i)) for i in range(start, start + count)]
+
+
+def make_playlist(count: int, name: str = "Benchmark Playlist", start: int = 0) -> wavelink.Playlist:
+    return wavelink.Playlist({
+        "info": {"name": name, "selectedTrack": -1},
+        "tracks": [make_track_payload(i) for i in range(start, start + count)],
+        "pluginInfo": {},
+    })
+
+
+# --- DISCORD ---
+
+class FakeResponse:
+    """Mimics ``discord.InteractionResponse``."""
+
+    def __init__(self):
+        self.sent: list[tuple] = []
+        self._done = False
+
+    def is_done(self) -> bool:
+        return self._done
+
+    async def send_message(self, content=None, **kwargs):
+        self._done = True
+        self.sent.append((content, kwargs))
+
+    async def defer(self, **kwargs):
+        self._done = True
+
+    async def edit_message(self, **kwargs):
+        self._done = True
+        self.sent.append((None, kwargs))
+
+
+class FakeFollowup:
+    """Mimics ``discord.Webhook`` as used by ``interaction.followup``."""
+
+    def __init__(self):
+        self.sent: list[tuple] = []
+
+    async def send(self, content=None, **kwargs):
+        self.sent.append((content, kwargs))
+
+
+class FakeVoiceChannel:
+    def __init__(self, guild: 'FakeGuild', channel_id: int):
+        self.guild = guild
+        self.id = channel_id
+        self.mention = f"<#{channel_id}>"
+        self.members: list = []
+
+    def permissions_for(self, member):
+        return SimpleNamespace(connect=True, speak=True)
+
+    async def connect(self, *, cls=None, **kwargs):
+        player = FakePlayer(self)
+        self.guild.voice_client = player
+        return player
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int):
+        self.id = guild_id
+        self.me = SimpleNamespace(id=1, display_name="Renify", bot=True)
+        self.voice_client = None
+        self.voice_channel = FakeVoiceChannel(self, guild_id * 10)
+        self.text_channel = SimpleNamespace(id=guild_id * 10 + 1, guild=self, mention=f"<#{guild_id * 10 + 1}>")
+        self.members: dict[int, object] = {}
+
+    def get_member(self, user_id: int):
+        return self.members.get(user_id)
+
+
+class FakeUser:
+    def __init__(self, user_id: int, channel: FakeVoiceChannel | None):
+        self.id = user_id
+        self.name = f"user{user_id}"
+        self.display_name = self.name
+        self.bot = False
+        self.voice = SimpleNamespace(channel=channel) if channel else None
+
+
+class FakeInteraction:
+    """Mimics the parts of ``discord.Interaction`` the cogs use."""
+
+    def __init__(self, guild: FakeGuild, user: FakeUser):
+        self.guild = guild
+        self.guild_id = guild.id
+        self.user = user
+        self.channel = guild.text_channel
+        self.response = FakeResponse()
+        self.followup = FakeFollowup()
+
+    async def original_response(self):
+        return SimpleNamespace(id=0, delete=_noop, edit=_noop)
+
+
+async def _noop(*args, **kwargs):
+    return None
+
+
+# --- WAVELINK ---
+
+class FakePlayer:
+    """Mimics ``RenifyPlayer`` without a voice connection or Lavalink node."""
+
+    def __init__(self, channel: FakeVoiceChannel):
+        self.channel = channel
+        self.guild = channel.guild
+        self.queue = RenifyQueue()
+        self.home_channel = channel.guild.text_channel
+        self.controller_message = None
+        self.current: wavelink.Playable | None = None
+        self.paused = False
+        self.connected = True
+        self.volume = 100
+
+    @property
+    def playing(self) -> bool:
+        return self.current is not None
+
+    def is_connected(self) -> bool:
+        return self.connected
+
+    async def play(self, track, **kwargs):
+        self.current = track
+        return track
+
+    async def pause(self, value: bool):
+        self.paused = value
+
+    async def set_volume(self, value: int = 100):
+        self.volume = value
+
+    async def stop(self, **kwargs):
+        old, self.current = self.current, None
+        return old
+
+    async def move_to(self, channel, **kwargs):
+        self.channel = channel
+
+    async def disconnect(self, **kwargs):
+        self.connected = False
+        self.current = None
+        if self.guild.voice_client is self:
+            self.guild.voice_client = None
+
+
+def make_session(guild_id: int = 1, user_id: int = 1000, queue_size: int = 0, playing: bool = True):
+    """Return (guild, user, player) with the user in the bot's voice channel."""
+    guild = FakeGuild(guild_id)
+    user = FakeUser(user_id, guild.voice_channel)
+    player = FakePlayer(guild.voice_channel)
+    guild.voice_client = player
+    if queue_size:
+        player.queue.put(make_tracks(queue_size))
+    if playing:
+        player.current = make_tracks(1, start=queue_size)[0]
+    return guild, user, player
@@ -0,0 +1,156 @@
+"""
+Tiny benchmark runner shared by the ``bench_*`` scripts.
+
+Each case is timed in several rounds of auto-sized batches; the median
+per-operation time is reported. Results can be written as a JSON baseline
+and later compared against it, flagging cases that got slower than the
+allowed threshold.
+"""
+import argparse
+import asyncio
+import inspect
+import json
+import platform
+import statistics
+import sys
+from time import perf_counter, time
+
+ROUNDS = 5
+MIN_ROUND_SECONDS = 0.05
+
+
+class Bench:
+    """Collects benchmark cases and runs them from the command line."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.cases: list[tuple[str, object]] = []
+
+    def case(self, name: str):
+        """Register a case. The function returns the callable to time (sync or async)."""
+        def decorator(setup):
+            self.cases.append((name, setup))
+            return setup
+        return decorator
+
+    def run(self, only: str | None = None, rounds: int = ROUNDS) -> dict:
+        results = {}
+        for name, setup in self.cases:
+            if only and only not in name:
+                continue
+            func = setup()
+            if inspect.iscoroutinefunction(func):
+                stats = asyncio.run(_time_async(func, rounds))
+            else:
+                stats = _time_sync(func, rounds)
+            results[name] = stats
+            print(f"{name:<48} {stats['median_us']:>12.2f} µs/op  (min {stats['min_us']:.2f}, n={stats['ops']})")
+        return results
+
+    def main(self, argv: list[str] | None = None):
+        parser = argparse.ArgumentParser(description=f"Renify benchmarks: {self.name}")
+        parser.add_argument('--filter', help="Only run cases whose name contains this string")
+        parser.add_argument('--rounds', type=int, default=ROUNDS)
+        parser.add_argument('--save', metavar='PATH', help="Write results as a JSON baseline")
+        parser.add_argument('--compare', metavar='PATH', help="Compare against a saved JSON baseline")
+        parser.add_argument('--threshold', type=float, default=0.25,
+                            help="Allowed slowdown before a case is flagged (0.25 = 25%%)")
+        args = parser.parse_args(argv)
+
+        results = self.run(args.filter, args.rounds)
+        if args.save:
+            save_baseline(args.save, self.name, results)
+            print(f"Saved baseline to {args.save}")
+        if args.compare:
+            regressions = compare(load_baseline(args.compare), results, args.threshold)
+            if regressions:
+                sys.exit(1)
+
+
+def _batch_size(func) -> int:
+    n = 1
+    while True:
+        start = perf_counter()
+        for _ in range(n):
+            func()
+        if perf_counter() - start >= MIN_ROUND_SECONDS or n >= 1 << 20:
+            return n
+        n *= 2
+
+
+def _time_sync(func, rounds: int) -> dict:
+    n = _batch_size(func)
+    samples = []
+    for _ in range(rounds):
+        start = perf_counter()
+        for _ in range(n):
+            func()
+        samples.append((perf_counter() - start) / n)
+    return _summarize(samples, n)
+
+
+async def _time_async(func, rounds: int) -> dict:
+    n = 1
+    while True:
+        start = perf_counter()
+        for _ in range(n):
+            await func()
+        if perf_counter() - start >= MIN_ROUND_SECONDS or n >= 1 << 20:
+            break
+        n *= 2
+    samples = []
+    for _ in range(rounds):
+        start = perf_counter()
+        for _ in range(n):
+            await func()
+        samples.append((perf_counter() - start) / n)
+    return _summarize(samples, n)
+
+
+def _summarize(samples: list[float], ops: int) -> dict:
+    return {
+        'median_us': statistics.median(samples) * 1e6,
+        'min_us': min(samples) * 1e6,
+        'ops': ops,
+    }
+
+
+# --- BASELINES ---
+
+def save_baseline(path: str, suite: str, results: dict):
+    data = {
+        'suite': suite,
+        'created_at': time(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': results,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+
+
+def load_baseline(path: str) -> dict:
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['results']
+
+
+def compare(baseline: dict, results: dict, threshold: float) -> list[str]:
+    """Print a comparison table and return the names of regressed cases."""
+    regressions = []
+    print(f"\n{'case':<48} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, stats in results.items():
+        old = baseline.get(name)
+        if old is None:
+            print(f"{name:<48} {'-':>12} {stats['median_us']:>12.2f}      new")
+            continue
+        change = stats['median_us'] / old['median_us'] - 1 if old['median_us'] else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  ❌ REGRESSION"
+            regressions.append(name)
+        elif change < -threshold:
+            flag = "  ✅ faster"
+        print(f"{name:<48} {old['median_us']:>12.2f} {stats['median_us']:>12.2f} {change:>+8.1%}{flag}")
+    if regressions:
+        print(f"\n{len(regressions)} case(s) regressed by more than {threshold:.0%}")
+    return regressions
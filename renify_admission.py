@@ -0,0 +1,112 @@
+"""
+Renify – Tier-priority admission control for Lavalink searches.
+
+Every search and track load takes one of ``SEARCH_CONCURRENCY`` slots. When
+all slots are busy, requests wait in a priority queue ordered by arrival time
+minus a tier head start, so paying tiers jump ahead of a burst of FREE
+requests without starving them. A request that has waited ``SEARCH_MAX_WAIT``
+seconds is rejected with ``SearchOverloaded`` instead of running after the user
+has given up. Queue depth, in-flight searches and wait times are exported
+through ``renify_metrics``.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+from time import monotonic
+
+from renify_metrics import metrics
+
+logger = logging.getLogger('RenifyBot.admission')
+
+# --- CONFIGURATION ---
+SEARCH_CONCURRENCY = int(os.getenv("RENIFY_SEARCH_CONCURRENCY", 16))   # Lavalink searches in flight at once
+SEARCH_MAX_WAIT = float(os.getenv("RENIFY_SEARCH_MAX_WAIT", 10.0))     # Seconds queued before a search is rejected
+HEADSTART = 2.0  # Seconds of queue priority per tier weight step (FREE 1, PREMIUM 2, DIAMOND 3)
+
+BUSY_SEARCH_MESSAGE = "🚦 Lots of people are searching right now. Please try again in a few seconds."
+
+WAIT_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class SearchOverloaded(Exception):
+    """A search waited too long for a free slot."""
+
+
+class AdmissionController:
+    """Concurrency cap with a tier-weighted priority queue of waiters."""
+
+    def __init__(self, limit: int = SEARCH_CONCURRENCY, max_wait: float = SEARCH_MAX_WAIT, clock=monotonic):
+        self.limit = limit
+        self.max_wait = max_wait
+        self.clock = clock
+        self.active = 0
+        self.waiting = 0
+        self._heap: list[tuple[float, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._depth = metrics.gauge('renify_search_queue_depth', "Searches waiting for a slot")
+        self._in_flight = metrics.gauge('renify_search_in_flight', "Searches currently running")
+        self._wait = metrics.histogram('renify_search_wait_seconds', "Time searches waited for a slot", WAIT_BUCKETS)
+        self._rejected = metrics.counter('renify_search_rejected_total', "Searches rejected after waiting too long")
+
+    async def acquire(self, weight: int = 1, tier: str = "FREE", max_wait: float | None = None):
+        """Wait for a slot; raises SearchOverloaded after ``max_wait`` seconds."""
+        start = self.clock()
+        if self.active < self.limit and not self._heap:
+            self.active += 1
+            self._in_flight.set(self.active)
+            self._wait.observe(0.0, tier=tier)
+            return
+
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (start - (weight - 1) * HEADSTART, next(self._seq), fut))
+        self.waiting += 1
+        self._depth.set(self.waiting)
+        self._dispatch()
+        try:
+            await asyncio.wait_for(fut, self.max_wait if max_wait is None else max_wait)
+        except asyncio.TimeoutError:
+            self._rejected.inc(tier=tier)
+            raise SearchOverloaded(f"waited {self.clock() - start:.1f}s for a search slot") from None
+        except BaseException:
+            if fut.done() and not fut.cancelled():
+                self.release()  # The slot was handed over just as we were cancelled
+            raise
+        finally:
+            self.waiting -= 1
+            self._depth.set(self.waiting)
+        self._wait.observe(self.clock() - start, tier=tier)
+
+    def try_acquire(self, tier: str = "FREE") -> bool:
+        """Take a slot only if one is free right now and nobody is waiting; never queues."""
+        if self.active >= self.limit or self._heap:
+            return False
+        self.active += 1
+        self._in_flight.set(self.active)
+        self._wait.observe(0.0, tier=tier)
+        return True
+
+    def release(self):
+        """Free a slot and hand it to the highest-priority waiter."""
+        self.active -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        while self.active < self.limit and self._heap:
+            _, _, fut = heapq.heappop(self._heap)
+            if not fut.done():  # Skip waiters that already gave up
+                self.active += 1
+                fut.set_result(None)
+        self._in_flight.set(self.active)
+
+    async def run(self, func, *args, weight: int = 1, tier: str = "FREE", **kwargs):
+        """Call ``await func(*args, **kwargs)`` inside a slot."""
+        await self.acquire(weight, tier)
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            self.release()
+
+
+search_admission = AdmissionController()
@@ -0,0 +1,212 @@
+"""
+Renify – Prefix-indexed autocomplete for the /play query option.
+
+Suggestions come from a sorted array of normalized keys per guild (built
+from that guild's play history) plus a global popular-tracks list, so every
+keystroke is answered with a couple of binary searches and never touches
+Lavalink. Picking a suggestion sends a short token that maps back to the
+stored Lavalink track payload, letting /play skip the search entirely.
+"""
+import bisect
+import hashlib
+import heapq
+import json
+import logging
+import os
+import re
+from time import time
+
+import wavelink
+
+logger = logging.getLogger('RenifyBot.autocomplete')
+
+# --- CONFIGURATION ---
+POPULAR_TRACKS_FILE = os.getenv("RENIFY_POPULAR_TRACKS", "")  # JSON list of Lavalink track payloads
+GUILD_TRACK_LIMIT = int(os.getenv("RENIFY_AUTOCOMPLETE_GUILD_TRACKS", 1000))
+
+# Discord caps choice names/values at 100 characters, far shorter than an encoded track,
+# so choices carry a token that resolves to the stored payload instead.
+TOKEN_PREFIX = "renify:track:"
+MAX_CHOICES = 25
+MAX_SCAN = 200
+MAX_KEY_WORDS = 8
+
+_NON_WORD = re.compile(r'[^\w]+')
+
+
+def normalize(text: str) -> str:
+    return _NON_WORD.sub(' ', text.casefold()).strip()
+
+
+def track_key(track: wavelink.Playable) -> str:
+    return hashlib.blake2b(track.encoded.encode(), digest_size=8).hexdigest()
+
+
+class Suggestion:
+    """A remembered track and how often it was played."""
+    __slots__ = ('key', 'title', 'author', 'payload', 'plays', 'last_played')
+
+    def __init__(self, key: str, track: wavelink.Playable):
+        self.key = key
+        self.title = track.title
+        self.author = track.author
+        self.payload = track.raw_data
+        self.plays = 0
+        self.last_played = 0.0
+
+    @property
+    def label(self) -> str:
+        label = f"{self.title} — {self.author}"
+        return label if len(label) <= 100 else label[:99] + "…"
+
+    def index_keys(self) -> set[str]:
+        """Keys for the title, 'author title', and every word start within the title."""
+        title = normalize(self.title)
+        keys = {title, normalize(f"{self.author} {self.title}")}
+        words = title.split()
+        for i in range(1, min(len(words), MAX_KEY_WORDS)):
+            keys.add(' '.join(words[i:]))
+        return {k[:100] for k in keys if k}
+
+
+class PrefixIndex:
+    """Sorted array of (key, track key) pairs answering prefix queries in O(log n + k)."""
+
+    def __init__(self):
+        self.entries: list[tuple[str, str]] = []
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, suggestion: Suggestion):
+        for key in suggestion.index_keys():
+            entry = (key, suggestion.key)
+            i = bisect.bisect_left(self.entries, entry)
+            if i == len(self.entries) or self.entries[i] != entry:
+                self.entries.insert(i, entry)
+
+    def remove(self, suggestion: Suggestion):
+        for key in suggestion.index_keys():
+            entry = (key, suggestion.key)
+            i = bisect.bisect_left(self.entries, entry)
+            if i < len(self.entries) and self.entries[i] == entry:
+                del self.entries[i]
+
+    def search(self, prefix: str, limit: int = MAX_SCAN) -> list[str]:
+        """Track keys whose index keys start with prefix (deduplicated, at most limit)."""
+        found: dict[str, None] = {}
+        i = bisect.bisect_left(self.entries, (prefix,))
+        while i < len(self.entries) and len(found) < limit:
+            key, track = self.entries[i]
+            if not key.startswith(prefix):
+                break
+            found[track] = None
+            i += 1
+        return list(found)
+
+
+class TrackHistory:
+    """Remembered tracks for one guild (or the global popular list) and their index."""
+
+    def __init__(self, limit: int | None = GUILD_TRACK_LIMIT):
+        self.limit = limit
+        self.tracks: dict[str, Suggestion] = {}
+        self.index = PrefixIndex()
+
+    def record(self, track: wavelink.Playable, plays: int = 1, at: float | None = None) -> Suggestion:
+        key = track_key(track)
+        suggestion = self.tracks.get(key)
+        if suggestion is None:
+            suggestion = self.tracks[key] = Suggestion(key, track)
+            self.index.add(suggestion)
+            if self.limit and len(self.tracks) > self.limit:
+                self._evict()
+        suggestion.plays += plays
+        suggestion.last_played = max(suggestion.last_played, at or time())
+        return suggestion
+
+    def _evict(self):
+        # Drop the least recently played 10% in one pass so eviction stays amortized O(1)
+        count = max(1, self.limit // 10)
+        for suggestion in heapq.nsmallest(count, self.tracks.values(), key=lambda s: s.last_played):
+            self.index.remove(suggestion)
+            del self.tracks[suggestion.key]
+
+    def match(self, prefix: str) -> list[Suggestion]:
+        if not prefix:
+            return heapq.nlargest(MAX_CHOICES, self.tracks.values(), key=lambda s: (s.plays, s.last_played))
+        matches = [self.tracks[key] for key in self.index.search(prefix)]
+        matches.sort(key=lambda s: (s.plays, s.last_played), reverse=True)
+        return matches
+
+
+class AutocompleteIndex:
+    """Per-guild play history plus a global popular list, queried on every keystroke."""
+
+    def __init__(self, popular_path: str = POPULAR_TRACKS_FILE):
+        self.guilds: dict[int, TrackHistory] = {}
+        self.popular = TrackHistory(limit=None)
+        if popular_path:
+            self.load_popular(popular_path)
+
+    def load_popular(self, path: str):
+        try:
+            with open(path, encoding='utf-8') as f:
+                payloads = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to load popular tracks from {path}: {e}")
+            return
+        for rank, payload in enumerate(payloads):
+            payload.setdefault('pluginInfo', {})
+            payload.setdefault('userData', {})
+            self.popular.record(wavelink.Playable(payload), plays=len(payloads) - rank, at=0.0)
+        logger.info(f"Loaded {len(self.popular.tracks)} popular tracks for autocomplete")
+
+    def record(self, guild_id: int, track: wavelink.Playable, at: float | None = None):
+        """Remember a track that started playing in a guild."""
+        history = self.guilds.get(guild_id)
+        if history is None:
+            history = self.guilds[guild_id] = TrackHistory()
+        history.record(track, at=at)
+
+    def warm(self, plays: list[tuple[int, float, dict]]):
+        """Rebuild guild histories from ``(guild_id, played_at, payload)`` rows, oldest first."""
+        tracks: dict[int, wavelink.Playable] = {}  # Rows share one payload dict per track
+        for guild_id, at, payload in plays:
+            track = tracks.get(id(payload))
+            if track is None:
+                track = tracks[id(payload)] = wavelink.Playable(payload)
+            self.record(guild_id, track, at=at)
+        if plays:
+            logger.info(f"🔤 Autocomplete warmed from {len(plays)} plays across {len(self.guilds)} guilds")
+
+    def suggest(self, guild_id: int | None, current: str) -> list[tuple[str, str]]:
+        """Return up to 25 (name, value) choices: this guild's history first, then popular tracks."""
+        prefix = normalize(current)[:100]
+        seen: set[str] = set()
+        choices = []
+        sources = [self.guilds.get(guild_id), self.popular]
+        for history in sources:
+            if history is None:
+                continue
+            for suggestion in history.match(prefix):
+                if suggestion.key in seen:
+                    continue
+                seen.add(suggestion.key)
+                choices.append((suggestion.label, TOKEN_PREFIX + suggestion.key))
+                if len(choices) >= MAX_CHOICES:
+                    return choices
+        return choices
+
+    def resolve(self, guild_id: int | None, value: str) -> wavelink.Playable | None:
+        """Turn a picked suggestion back into a track without a Lavalink search."""
+        if not value.startswith(TOKEN_PREFIX):
+            return None
+        key = value[len(TOKEN_PREFIX):]
+        for history in (self.guilds.get(guild_id), self.popular):
+            if history is not None and key in history.tracks:
+                return wavelink.Playable(history.tracks[key].payload)
+        return None
+
+
+autocomplete_index = AutocompleteIndex()
@@ -0,0 +1,161 @@
+"""
+Renify – Autoplay from a co-occurrence index of what guilds play next.
+
+Every track that starts is linked to the track played just before it in the
+same guild, as long as both belong to one listening session. Counts are kept
+per track for its top-K followers across all guilds, so when a queue runs dry
+the next track is a dictionary lookup and a weighted pick, with no search.
+Only a track the index knows nothing about costs one related-tracks search.
+The index is warmed from the play history at startup and updated as tracks
+start.
+"""
+import logging
+import os
+import random
+from collections import deque
+from time import time
+
+import wavelink
+
+from renify_admission import search_admission
+from renify_lanes import guild_lanes, LaneBusy
+from renify_queue import track_key
+
+logger = logging.getLogger('RenifyBot.autoplay')
+
+# --- CONFIGURATION ---
+AUTOPLAY = os.getenv("RENIFY_AUTOPLAY", "false").lower() == "true"  # Default for new players
+TOP_K = int(os.getenv("RENIFY_AUTOPLAY_NEIGHBORS", 20))            # Followers kept per track
+TRACK_LIMIT = int(os.getenv("RENIFY_AUTOPLAY_TRACKS", 50_000))     # Tracks remembered across all guilds
+WARM_DAYS = int(os.getenv("RENIFY_AUTOPLAY_WARM_DAYS", 30))        # Play history replayed at startup
+SESSION_GAP = 30 * 60  # Plays further apart than this aren't linked
+RECENT = 50            # Tracks per guild that autoplay won't pick again
+PICK_FROM = 5          # Weighted pick among this many best followers
+
+
+class CoOccurrenceIndex:
+    """Top-K "played next" counts per track, shared by every guild."""
+
+    def __init__(self, top_k: int = TOP_K, limit: int = TRACK_LIMIT, rng: random.Random | None = None):
+        self.top_k = top_k
+        self.limit = limit
+        self.rng = rng or random.Random()
+        self.payloads: dict[tuple, dict] = {}             # Least recently played first
+        self.neighbors: dict[tuple, dict[tuple, int]] = {}
+        self.last: dict[int, tuple[tuple, float]] = {}    # Previous track per guild
+        self.recent: dict[int, deque] = {}
+        self.picks = 0
+        self.fallbacks = 0
+
+    def __len__(self) -> int:
+        return len(self.payloads)
+
+    def record(self, guild_id: int, track: wavelink.Playable, at: float | None = None):
+        """Link a started track to the one before it in the same guild session."""
+        self._record(guild_id, track_key(track), track.raw_data, time() if at is None else at)
+
+    def _record(self, guild_id: int, key: tuple, payload: dict, at: float):
+        self.payloads.pop(key, None)
+        self.payloads[key] = payload
+        if len(self.payloads) > self.limit:
+            self._evict()
+
+        recent = self.recent.get(guild_id)
+        if recent is None:
+            recent = self.recent[guild_id] = deque(maxlen=RECENT)
+        recent.append(key)
+
+        previous = self.last.get(guild_id)
+        self.last[guild_id] = (key, at)
+        if previous is None or previous[0] == key or at - previous[1] > SESSION_GAP:
+            return
+        followers = self.neighbors.get(previous[0])
+        if followers is None:
+            followers = self.neighbors[previous[0]] = {}
+        followers[key] = followers.get(key, 0) + 1
+        if len(followers) > 2 * self.top_k:
+            # Trim back to the top K in one pass so updates stay amortized O(1)
+            keep = sorted(followers.items(), key=lambda item: item[1], reverse=True)[:self.top_k]
+            self.neighbors[previous[0]] = dict(keep)
+
+    def _evict(self):
+        # Dicts keep insertion order and record() re-inserts, so the first entries are the stalest
+        for key in list(self.payloads)[:max(1, self.limit // 10)]:
+            del self.payloads[key]
+            self.neighbors.pop(key, None)
+
+    def candidates(self, guild_id: int, track: wavelink.Playable) -> list[tuple[tuple, int]]:
+        """Known followers of a track, best first, minus what this guild played recently."""
+        followers = self.neighbors.get(track_key(track))
+        if not followers:
+            return []
+        recent = self.recent.get(guild_id, ())
+        return sorted(((key, count) for key, count in followers.items()
+                       if key in self.payloads and key not in recent),
+                      key=lambda item: item[1], reverse=True)
+
+    def pick(self, guild_id: int, track: wavelink.Playable) -> wavelink.Playable | None:
+        """A likely next track from the index, or None if it has no candidates."""
+        candidates = self.candidates(guild_id, track)[:PICK_FROM]
+        if not candidates:
+            return None
+        key, _ = self.rng.choices(candidates, weights=[count for _, count in candidates])[0]
+        self.picks += 1
+        return wavelink.Playable(self.payloads[key])
+
+    async def related(self, guild_id: int, track: wavelink.Playable) -> wavelink.Playable | None:
+        """One related-tracks search for a track the index doesn't know."""
+        if track.source == 'youtube':
+            query = f"https://www.youtube.com/watch?v={track.identifier}&list=RD{track.identifier}"
+        else:
+            query = f"ytmsearch:{track.author}"
+        self.fallbacks += 1
+        try:
+            results = await search_admission.run(wavelink.Playable.search, query, tier='autoplay')
+        except Exception as e:
+            logger.warning(f"Related search for autoplay failed in guild {guild_id}: {e}")
+            return None
+        recent = self.recent.get(guild_id, ())
+        skip = {track_key(track), *recent}
+        for result in (results.tracks if isinstance(results, wavelink.Playlist) else results):
+            if track_key(result) not in skip:
+                return result
+        return None
+
+    async def next_track(self, guild_id: int, track: wavelink.Playable) -> wavelink.Playable | None:
+        """What to play after ``track`` once the queue is empty."""
+        return self.pick(guild_id, track) or await self.related(guild_id, track)
+
+    def warm(self, plays: list[tuple[int, float, dict]]):
+        """Replay ``(guild_id, played_at, payload)`` rows in time order to rebuild the index."""
+        for guild_id, at, payload in plays:
+            info = payload['info']
+            self._record(guild_id, (info['sourceName'], info['identifier']), payload, at)
+        # Startup plays are not this session's "recently played"
+        self.last.clear()
+        self.recent.clear()
+        if plays:
+            logger.info(f"🔮 Autoplay index warmed from {len(plays)} plays: {len(self.payloads)} tracks, "
+                        f"{sum(len(f) for f in self.neighbors.values())} links")
+
+
+autoplay_index = CoOccurrenceIndex()
+
+
+async def play_next(player: wavelink.Player, previous: wavelink.Playable) -> bool:
+    """The queue ran dry after ``previous``: play a likely next track. Returns False if there was none."""
+    track = await autoplay_index.next_track(player.guild.id, previous)
+    if track is None:
+        return False
+    try:
+        # Take a turn in the guild's lane like any command that touches the player
+        async with guild_lanes.reserve(player.guild.id) as turn:
+            await turn.wait()
+            if player.queue or player.playing or not player.connected:
+                return True  # Someone queued something in the meantime
+            track.extras = {'autoplay': True}
+            await player.play(track)
+    except LaneBusy:
+        return False
+    logger.info(f"🔮 Autoplay in guild {player.guild.id}: {track.title[:50]}")
+    return True
@@ -0,0 +1,320 @@
+"""
+Renify – Hot-reloadable runtime configuration.
+
+Tier limits and weights, the rate limiter, the query length cap and the
+Lavalink node list are read from ``RuntimeConfig`` snapshots, not from
+module constants. When ``RENIFY_CONFIG_FILE`` is set, the file is polled
+for changes. A change is parsed and validated in full before a new snapshot
+replaces the old one in a single assignment, so a command never sees half
+of an update. A file that fails validation is logged and ignored. Keys
+missing from the file fall back to the environment defaults.
+
+Lavalink nodes are reconciled by URI: new nodes are connected, players on
+removed nodes are moved to the remaining nodes before those are closed, and
+players on unchanged nodes are left alone.
+"""
+import asyncio
+import inspect
+import itertools
+import json
+import logging
+import os
+from urllib.parse import urlsplit
+
+import wavelink
+
+from renify_metrics import metrics
+
+logger = logging.getLogger('RenifyBot.config')
+
+# --- CONFIGURATION ---
+CONFIG_FILE = os.getenv("RENIFY_CONFIG_FILE", "")  # JSON file applied at runtime; empty = environment only
+POLL_INTERVAL = float(os.getenv("RENIFY_CONFIG_POLL_INTERVAL", 2.0))
+MAX_QUERY_LIMIT = 6000  # Discord's own cap on a string option
+
+
+class ConfigError(Exception):
+    """A config file that can't be applied; the running config is unchanged."""
+
+
+def normalize_uri(uri: str) -> str:
+    uri = uri.strip().rstrip('/')
+    return uri if '://' in uri else f'http://{uri}'
+
+
+def _positive_int(value, key: str, allow_none: bool = False):
+    if value is None and allow_none:
+        return None
+    if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+        raise ConfigError(f"{key} must be a positive integer{' or null' if allow_none else ''}")
+    return value
+
+
+def _tiers(value, key: str, allow_none: bool = False) -> dict[str, int | None]:
+    if not isinstance(value, dict) or not value:
+        raise ConfigError(f"{key} must be an object mapping tier names to numbers")
+    return {str(tier): _positive_int(v, f"{key}.{tier}", allow_none) for tier, v in value.items()}
+
+
+def _nodes(value) -> tuple[str, ...]:
+    if isinstance(value, str):
+        value = value.split(',')
+    if not isinstance(value, list) or not all(isinstance(uri, str) for uri in value):
+        raise ConfigError("lavalink_nodes must be a list of URIs")
+    uris = tuple(dict.fromkeys(normalize_uri(uri) for uri in value if uri.strip()))
+    if not uris:
+        raise ConfigError("lavalink_nodes must list at least one node")
+    for uri in uris:
+        parts = urlsplit(uri)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise ConfigError(f"lavalink_nodes: {uri!r} is not an http(s) URI")
+        try:
+            parts.port
+        except ValueError:
+            raise ConfigError(f"lavalink_nodes: {uri!r} has an invalid port") from None
+    return uris
+
+
+class RuntimeConfig:
+    """One immutable snapshot of the settings that can change at runtime."""
+    __slots__ = ('tier_limits', 'tier_weights', 'command_cooldown', 'max_calls_per_window',
+                 'max_query_length', 'lavalink_nodes', 'lavalink_password')
+
+    def __init__(self, tier_limits: dict[str, int | None], tier_weights: dict[str, int], command_cooldown: float,
+                 max_calls_per_window: int, max_query_length: int, lavalink_nodes, lavalink_password: str):
+        set_ = object.__setattr__
+        set_(self, 'tier_limits', dict(tier_limits))
+        set_(self, 'tier_weights', dict(tier_weights))
+        set_(self, 'command_cooldown', command_cooldown)
+        set_(self, 'max_calls_per_window', max_calls_per_window)
+        set_(self, 'max_query_length', max_query_length)
+        set_(self, 'lavalink_nodes', tuple(lavalink_nodes))
+        set_(self, 'lavalink_password', lavalink_password)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("RuntimeConfig is immutable; build a new one with with_overrides()")
+
+    def with_overrides(self, data: dict) -> 'RuntimeConfig':
+        """A validated copy with the keys in ``data`` replaced; raises ConfigError and changes nothing if invalid."""
+        if not isinstance(data, dict):
+            raise ConfigError("the config file must contain a JSON object")
+        unknown = set(data) - set(self.__slots__)
+        if unknown:
+            raise ConfigError(f"unknown setting(s): {', '.join(sorted(unknown))}")
+
+        values = {key: getattr(self, key) for key in self.__slots__}
+        # Tier maps override per tier, so a file that only mentions FREE keeps the other tiers' defaults
+        if 'tier_limits' in data:
+            values['tier_limits'] = {**self.tier_limits, **_tiers(data['tier_limits'], 'tier_limits', allow_none=True)}
+        if 'tier_weights' in data:
+            values['tier_weights'] = {**self.tier_weights, **_tiers(data['tier_weights'], 'tier_weights')}
+        if 'command_cooldown' in data:
+            cooldown = data['command_cooldown']
+            if isinstance(cooldown, bool) or not isinstance(cooldown, (int, float)) or cooldown <= 0:
+                raise ConfigError("command_cooldown must be a positive number of seconds")
+            values['command_cooldown'] = float(cooldown)
+        if 'max_calls_per_window' in data:
+            values['max_calls_per_window'] = _positive_int(data['max_calls_per_window'], 'max_calls_per_window')
+        if 'max_query_length' in data:
+            length = _positive_int(data['max_query_length'], 'max_query_length')
+            if length > MAX_QUERY_LIMIT:
+                raise ConfigError(f"max_query_length can't exceed {MAX_QUERY_LIMIT}")
+            values['max_query_length'] = length
+        if 'lavalink_nodes' in data:
+            values['lavalink_nodes'] = _nodes(data['lavalink_nodes'])
+        if 'lavalink_password' in data:
+            if not isinstance(data['lavalink_password'], str) or not data['lavalink_password']:
+                raise ConfigError("lavalink_password must be a non-empty string")
+            values['lavalink_password'] = data['lavalink_password']
+        return RuntimeConfig(**values)
+
+    def changed(self, other: 'RuntimeConfig') -> list[str]:
+        return [key for key in self.__slots__ if getattr(self, key) != getattr(other, key)]
+
+
+class ConfigWatcher:
+    """Holds the current snapshot and polls the config file for a new one."""
+
+    def __init__(self, path: str = CONFIG_FILE, interval: float = POLL_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self.defaults: RuntimeConfig | None = None
+        self.current: RuntimeConfig | None = None
+        self._signature = None
+        self._listeners = []
+        self._task: asyncio.Task | None = None
+        self._reloads = metrics.counter('renify_config_reloads_total', "Config file changes by outcome")
+
+    def configure(self, defaults: RuntimeConfig):
+        """Set the environment defaults and apply the config file on top of them, once, at import."""
+        self.defaults = self.current = defaults
+        if self.path:
+            self._apply(self._read(), initial=True)
+
+    def on_change(self, callback):
+        """Call ``callback(old, new)`` (sync or async) after each applied change."""
+        self._listeners.append(callback)
+        return callback
+
+    def start(self):
+        """Start polling the config file (idempotent; does nothing without RENIFY_CONFIG_FILE)."""
+        if self.path and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._poll())
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _read(self) -> tuple[tuple | None, str | None]:
+        signature = self._stat()
+        if signature is None:
+            return None, None
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return signature, f.read()
+        except OSError:
+            return None, None
+
+    def _apply(self, read: tuple[tuple | None, str | None], initial: bool = False) -> RuntimeConfig | None:
+        signature, text = read
+        if signature == self._signature:
+            return None
+        self._signature = signature
+        if text is None:
+            logger.warning(f"⚙️ Config file {self.path} is missing; keeping the current settings")
+            return None
+        try:
+            new = self.defaults.with_overrides(json.loads(text))
+        except (ValueError, ConfigError) as e:
+            self._reloads.inc(outcome='rejected')
+            logger.error(f"⚙️ Rejected config file {self.path}: {e}")
+            return None
+        old, self.current = self.current, new  # The one and only switch-over point
+        if not initial:
+            self._reloads.inc(outcome='applied')
+        changed = old.changed(new)
+        if changed:
+            logger.info(f"⚙️ Applied config file {self.path}: {', '.join(changed)} changed")
+        return old
+
+    async def reload(self) -> bool:
+        """Re-read the file now; returns True if a change was applied."""
+        old = self._apply(await asyncio.to_thread(self._read))
+        if old is None:
+            return False
+        new = self.current
+        for callback in self._listeners:
+            try:
+                result = callback(old, new)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"⚙️ Config listener {getattr(callback, '__qualname__', callback)} failed: {e}", exc_info=True)
+        return True
+
+    async def _poll(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            if self._stat() != self._signature:
+                await self.reload()
+
+
+runtime_config = ConfigWatcher()
+
+
+# --- LAVALINK NODES ---
+
+NODE_READY_TIMEOUT = 15.0  # Seconds to wait for an added node's ready op before retiring the nodes it replaces
+
+_node_ids = itertools.count()
+_retiring: dict[str, wavelink.Node] = {}  # By identifier: removed nodes waiting for another node to take their players
+_retry_task: asyncio.Task | None = None
+
+
+def make_nodes(uris, password: str) -> list[wavelink.Node]:
+    return [wavelink.Node(identifier=f'node-{next(_node_ids)}', uri=uri, password=password) for uri in uris]
+
+
+async def _wait_ready(nodes: list[wavelink.Node], timeout: float = NODE_READY_TIMEOUT):
+    """Wait until no node is still CONNECTING (wavelink only marks a node CONNECTED after Lavalink's ready op)."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while any(node.status is wavelink.NodeStatus.CONNECTING for node in nodes) and loop.time() < deadline:
+        await asyncio.sleep(0.1)
+
+
+async def _retire(dead: wavelink.Node) -> bool:
+    """Move a removed node's players to a connected node and close it; False if no other node is connected."""
+    alive = [n for n in wavelink.Pool.nodes.values()
+             if n.identifier not in _retiring and n.status is wavelink.NodeStatus.CONNECTED]
+    if not alive:
+        return False
+    for player in list(dead.players.values()):
+        target = min(alive, key=lambda n: len(n.players))
+        try:
+            await player.switch_node(target)
+            logger.info(f'🔀 Moved player for guild {player.guild.id} from {dead.identifier} to {target.identifier}')
+        except Exception as e:
+            logger.error(f'❌ Failed to move player off {dead.identifier}: {e}')
+    await dead.close(eject=True)
+    logger.info(f"🎵 Removed Lavalink node {dead.uri}")
+    return True
+
+
+async def _retry_retiring(interval: float):
+    while _retiring:
+        await asyncio.sleep(interval)
+        for identifier, dead in list(_retiring.items()):
+            if _retiring.get(identifier) is dead and await _retire(dead):
+                _retiring.pop(identifier, None)
+
+
+async def sync_nodes(client, old: RuntimeConfig, new: RuntimeConfig):
+    """Connect added Lavalink nodes and retire removed ones, moving their players first.
+
+    A password change reconnects every node. A removed node is only closed once another node is
+    connected; until then it is retried every poll interval.
+    """
+    global _retry_task
+    if old.lavalink_nodes == new.lavalink_nodes and old.lavalink_password == new.lavalink_password:
+        return
+    # A node still waiting to be retired never shadows a live node with the same URI
+    nodes = sorted(wavelink.Pool.nodes.values(), key=lambda node: node.identifier not in _retiring)
+    existing = {normalize_uri(node.uri): node for node in nodes}
+    if old.lavalink_password != new.lavalink_password:
+        # Nodes authenticate once, at connect, so every node has to be replaced
+        added = list(new.lavalink_nodes)
+        removed = list(existing.values())
+    else:
+        added = [uri for uri in new.lavalink_nodes if uri not in existing]
+        removed = [node for uri, node in existing.items() if uri not in new.lavalink_nodes]
+        for uri in new.lavalink_nodes:
+            if uri in existing:
+                _retiring.pop(existing[uri].identifier, None)  # Added back before it was retired
+
+    if added:
+        nodes = make_nodes(added, new.lavalink_password)
+        # Pool is keyed by identifier, so replacements for the same URI can connect alongside the old nodes
+        try:
+            await wavelink.Pool.connect(client=client, nodes=nodes)
+        except Exception as e:
+            logger.error(f"❌ Failed to add Lavalink node(s) {', '.join(added)}: {e}")
+        await _wait_ready(nodes)
+        for node in nodes:
+            if node.status is wavelink.NodeStatus.CONNECTED:
+                logger.info(f"🎵 Added Lavalink node {node.identifier} ({node.uri})")
+            else:
+                logger.error(f"❌ Lavalink node {node.uri} did not connect")
+
+    for dead in removed:
+        _retiring[dead.identifier] = dead
+    for dead in removed:
+        if await _retire(dead):
+            _retiring.pop(dead.identifier, None)
+        else:
+            logger.warning(f"⚠️ Not removing Lavalink node {dead.uri} yet: no other node is connected; will retry")
+    if _retiring and (_retry_task is None or _retry_task.done()):
+        _retry_task = asyncio.create_task(_retry_retiring(runtime_config.interval))
@@ -6,6 +6,20 @@ from discord import app_commands, ui
 from collections import defaultdict
 from time import time
 import logging
+from renify_traffic import traffic_recorder
+from renify_idle import idle_manager, has_listeners, FINISHED
+from renify_queue import RenifyQueue, requester_of, track_key
+from renify_lanes import guild_lanes, serialized, send_busy, LaneBusy, Turn, DEFERRED_WAIT_TIMEOUT
+from renify_admission import search_admission, SearchOverloaded, BUSY_SEARCH_MESSAGE
+from renify_metrics import metrics
+from renify_sources import classify
+from renify_watchdog import loop_watchdog
+from renify_speedups import run_with_speedups
+from renify_config import runtime_config, RuntimeConfig, make_nodes, sync_nodes
+from renify_autoplay import autoplay_index, play_next, AUTOPLAY
+from renify_stats import fleet_stats, NO_TIER
+from renify_settings import apply_settings
+from renify_render import TIER_EMOJI, EmbedCache, escape_author, fit_embed, track_line, track_title
 
 # Configure logging
 logging.basicConfig(
@@ -21,7 +35,7 @@ LAVALINK_HOST = os.getenv("LAVALINK_HOST", "lavalink")
 LAVALINK_PORT = int(os.getenv("LAVALINK_PORT", 2333))
 LAVALINK_PASSWORD = os.getenv("LAVALINK_PASSWORD", "renifythoushallnotpass")
 
-# Security constants
+# Security constants (defaults; RENIFY_CONFIG_FILE can change them at runtime, see renify_config)
 MAX_QUERY_LENGTH = 500
 MAX_QUEUE_SIZE = 50  # Default (will be overridden by tier)
 COMMAND_COOLDOWN = 30
@@ -34,6 +48,13 @@ TIER_LIMITS = {
     'DIAMOND': None   # Diamond tier: Unlimited (None = unlimited)
 }
 
+# Fair-queue turns per round (see RENIFY_FAIR_QUEUE)
+TIER_WEIGHTS = {
+    'FREE': 1,
+    'PREMIUM': 2,
+    'DIAMOND': 3
+}
+
 def get_user_tier(user_id: int) -> str:
     """Get user's tier. For now, default to FREE."""
     # TODO: Implement your payment/subscription system here
@@ -42,21 +63,61 @@ def get_user_tier(user_id: int) -> str:
 
 def get_queue_limit(tier: str) -> int | None:
     """Get queue limit based on tier."""
-    return TIER_LIMITS.get(tier, 500)
+    return runtime_config.current.tier_limits.get(tier, 500)
+
+def get_tier_weight(tier: str) -> int:
+    """Get a tier's fair-queue and search-admission weight."""
+    return runtime_config.current.tier_weights.get(tier, 1)
+
+def get_fair_weight(user_id: int | None) -> int:
+    """Get how many tracks a requester gets per fair-queue round."""
+    if user_id is None:
+        return 1
+    return get_tier_weight(get_user_tier(user_id))
+
+def get_track_tier(track: wavelink.Playable) -> str:
+    """Get the tier a queued track is counted under in the fleet stats."""
+    requester_id = requester_of(track)
+    return NO_TIER if requester_id is None else get_user_tier(requester_id)
+
+fleet_stats.tier_of = get_track_tier
+
+runtime_config.configure(RuntimeConfig(
+    tier_limits=TIER_LIMITS,
+    tier_weights=TIER_WEIGHTS,
+    command_cooldown=COMMAND_COOLDOWN,
+    max_calls_per_window=MAX_CALLS_PER_WINDOW,
+    max_query_length=MAX_QUERY_LENGTH,
+    lavalink_nodes=[f'http://{LAVALINK_HOST}:{LAVALINK_PORT}'],
+    lavalink_password=LAVALINK_PASSWORD,
+))
 
 # --- RATE LIMITER ---
 class RateLimiter:
     def __init__(self):
         self.users = defaultdict(list)
+        self.last_sweep = time()
     
     def is_rate_limited(self, user_id: int) -> bool:
         now = time()
-        self.users[user_id] = [call_time for call_time in self.users[user_id] if now - call_time < COMMAND_COOLDOWN]
-        limited = len(self.users[user_id]) >= MAX_CALLS_PER_WINDOW
+        config = runtime_config.current
+        if now - self.last_sweep >= config.command_cooldown:
+            self.sweep(now)
+        self.users[user_id] = [call_time for call_time in self.users[user_id] if now - call_time < config.command_cooldown]
+        limited = len(self.users[user_id]) >= config.max_calls_per_window
         if not limited:
             self.users[user_id].append(now)
         return limited
 
+    def sweep(self, now: float):
+        """Forget users whose calls have all expired so the table doesn't grow forever."""
+        cooldown = runtime_config.current.command_cooldown
+        self.users = defaultdict(list, {
+            user_id: calls for user_id, calls in self.users.items()
+            if calls and now - calls[-1] < cooldown
+        })
+        self.last_sweep = now
+
 rate_limiter = RateLimiter()
 
 # --- INPUT VALIDATION ---
@@ -64,8 +125,9 @@ def validate_query(query: str) -> tuple[bool, str]:
     """Validate and sanitize user input"""
     if not query:
         return False, "❌ Please provide a search query."
-    if len(query) > MAX_QUERY_LENGTH:
-        return False, f"❌ Query too long (max {MAX_QUERY_LENGTH} characters)."
+    max_length = runtime_config.current.max_query_length
+    if len(query) > max_length:
+        return False, f"❌ Query too long (max {max_length} characters)."
     dangerous_chars = ['\n', '\r', '\x00']
     if any(char in query for char in dangerous_chars):
         return False, "❌ Invalid characters in query."
@@ -81,15 +143,29 @@ class RenifyPlayer(wavelink.Player):
         super().__init__(*args, **kwargs)
         self.home_channel: discord.TextChannel = None 
         self.controller_message: discord.Message = None # Tracks the interactive message
+        self.autoplay = wavelink.AutoPlayMode.partial # Advance through the queue without recommendations
+        self.queue = RenifyQueue(weight_for=get_fair_weight) # Indexed queue so huge queues stay fast to edit
+        self.autoplay_next = AUTOPLAY # Play a related track when the queue runs dry (RENIFY_AUTOPLAY)
+        fleet_stats.attach(self)
 
     # You might want to override disconnect to clear the controller message
     async def disconnect(self):
+        fleet_stats.detach(self)
         if self.controller_message:
             await self.controller_message.delete()
             self.controller_message = None
         await super().disconnect()
 
 
+def requester_name(player: RenifyPlayer, track: wavelink.Playable) -> str:
+    """Display name of whoever queued the track, from the requester_id stamped by /play."""
+    requester_id = requester_of(track)
+    if requester_id is None:
+        return "Autoplay"
+    member = player.guild.get_member(requester_id) if player.guild else None
+    return member.display_name if member else f"User {requester_id}"
+
+
 # --- BOT CLASS SETUP ---
 class RenifyBot(commands.Bot):
     """
@@ -116,6 +192,10 @@ class RenifyBot(commands.Bot):
         # This will hold the Wavelink node connection
         self.wavelink = None
 
+    async def on_interaction(self, interaction: discord.Interaction):
+        """Feeds every interaction to the (opt-in) traffic recorder."""
+        traffic_recorder.record(interaction)
+
     async def on_ready(self):
         """Called when the bot is connected to Discord."""
         logger.info(f'🤖 Logged in as: {self.user} (ID: {self.user.id})')
@@ -134,22 +214,19 @@ class RenifyBot(commands.Bot):
     async def setup_wavelink(self):
         """Connects the bot to the Lavalink server."""
         try:
-            # Create a Wavelink node object
-            node = wavelink.Node(
-                uri=f'http://{LAVALINK_HOST}:{LAVALINK_PORT}',
-                password=LAVALINK_PASSWORD
-            )
+            # Create a Wavelink node object for every configured Lavalink server
+            config = runtime_config.current
+            nodes = make_nodes(config.lavalink_nodes, config.lavalink_password)
             
-            # Connect the node to the bot
-            self.wavelink = await wavelink.Pool.connect(client=self, nodes=[node])
+            # Connect the nodes to the bot
+            self.wavelink = await wavelink.Pool.connect(client=self, nodes=nodes)
             
-            # Register event listeners after connection is established
-            if self.get_cog('MusicCog'):
-                # Note: Event listeners are handled differently in newer Wavelink versions
-                # We'll handle track events through the player directly
+            # Note: Event listeners are handled differently in newer Wavelink versions
+            # Track start events are handled by MusicCog.on_wavelink_track_start
             
-            logger.info(f'🎵 Wavelink node connected: {node.identifier}')
-            print(f'🎵 Wavelink node connected: {node.identifier}')
+            for node in nodes:
+                logger.info(f'🎵 Wavelink node connected: {node.identifier}')
+                print(f'🎵 Wavelink node connected: {node.identifier}')
             
         except Exception as e:
             logger.error(f'❌ Failed to connect to Lavalink: {e}', exc_info=True)
@@ -159,6 +236,12 @@ class RenifyBot(commands.Bot):
         """Called when setting up the bot, before on_ready."""
         # Register the event listeners after cogs are loaded
         await super().setup_hook()
+        idle_manager.start()
+        loop_watchdog.start()
+        runtime_config.on_change(lambda old, new: sync_nodes(self, old, new))
+        runtime_config.start()
+        fleet_stats.start(lambda: [g.voice_client for g in self.guilds if isinstance(g.voice_client, RenifyPlayer)])
+        await metrics.serve()
 
 # --- VIEW/BUTTONS CLASS ---
 
@@ -184,6 +267,7 @@ class MusicControls(ui.View):
         return player
 
     @ui.button(label="Pause", style=discord.ButtonStyle.secondary, custom_id="persistent:pause_btn", emoji="⏸️")
+    @serialized
     async def pause_button(self, interaction: discord.Interaction, button: ui.Button):
         player = await self.get_player(interaction)
         if not player: return
@@ -202,6 +286,7 @@ class MusicControls(ui.View):
             await interaction.followup.send("⏸️ Paused!", ephemeral=True)
 
     @ui.button(label="Skip", style=discord.ButtonStyle.primary, custom_id="persistent:skip_btn", emoji="⏭️")
+    @serialized
     async def skip_button(self, interaction: discord.Interaction, button: ui.Button):
         player = await self.get_player(interaction)
         if not player: return
@@ -210,16 +295,82 @@ class MusicControls(ui.View):
         await interaction.response.send_message("⏭️ Skipped! Next track coming up...", ephemeral=True)
 
     @ui.button(label="Stop", style=discord.ButtonStyle.danger, custom_id="persistent:stop_btn", emoji="⏹️")
+    @serialized
     async def stop_button(self, interaction: discord.Interaction, button: ui.Button):
         player = await self.get_player(interaction)
         if not player: return
         
-        player.queue.clear()
-        await player.disconnect()
-        await interaction.response.send_message("⏹️ Music stopped and controller cleared.", ephemeral=True)
+        # Stay connected for a quick restart; the idle reaper disconnects after the grace period
+        await idle_manager.park(player)
+        await interaction.response.send_message("⏹️ Music stopped and queue cleared.", ephemeral=True)
         
 # --- COMMANDS (Updated) ---
 
+def build_help_embed(user_tier: str, queue_limit: int | None) -> discord.Embed:
+    """Build the /help embed for a tier; cached in help_embeds, so this runs once per tier and limit."""
+    embed = discord.Embed(
+        title="🎵 Renify Bot - Help & Guide",
+        description="Welcome to **Renify**, your music bot! Here's everything you need to know.",
+        color=0x1DB954
+    )
+    
+    # Commands section
+    commands_text = """
+**🎵 Music Commands:**
+`/play <song name>` - Play music or add to queue
+`/pause` - Pause the current song
+`/resume` - Resume paused music
+`/queue` - View your music queue
+
+**🎮 Interactive Controller:**
+`/controller` - Get an interactive control panel with buttons
+
+**⚙️ Control Commands:**
+Buttons on controller handle pause/skip/stop
+(Requires appropriate permissions)
+
+**❓ Help:**
+`/help` - Show this guide
+    """
+    embed.add_field(name="📜 Commands", value=commands_text, inline=False)
+    
+    # Queue limits
+    tier_emoji = TIER_EMOJI.get(user_tier, "")
+    limit_text = f"{queue_limit:,} tracks" if queue_limit else "Unlimited tracks"
+    
+    tier_info = f"""
+**Your Tier:** {tier_emoji} {user_tier}
+**Queue Limit:** {limit_text}
+**Current Plan:** Free (All users start here)
+    """
+    embed.add_field(name="💎 Your Subscription", value=tier_info, inline=False)
+    
+    # Quick start
+    quick_start = f"""
+1. **Join a voice channel** in this server
+2. Use `/play <song name>` to start playing music
+3. Use `/controller` for interactive buttons
+4. Queue up to {limit_text.lower()} (your {user_tier} tier limit)
+5. Enjoy! The bot will auto-disconnect when queue ends
+    """
+    embed.add_field(name="🚀 Quick Start", value=quick_start, inline=False)
+    
+    # Tips
+    tips = """
+• You can search for songs by name or paste YouTube URLs
+• Add playlists with `/play <playlist url>`
+• Queue fills up! Check `/queue` to see what's next
+• Use `/controller` for a nice button interface
+• Bot needs to be in your voice channel to work
+    """
+    embed.add_field(name="💡 Tips & Tricks", value=tips, inline=False)
+    
+    embed.set_footer(text="Renify Bot v1.0 | Made with ❤️ for music lovers")
+    return embed
+
+help_embeds = EmbedCache(build_help_embed)
+
+
 @commands.guild_only() 
 class MusicCog(commands.Cog):
     
@@ -253,7 +404,8 @@ class MusicCog(commands.Cog):
 
         if not player:
             player = await voice_channel.connect(cls=RenifyPlayer)
-            player.home_channel = ctx.channel 
+            await apply_settings(player, ctx.channel) # Home channel, volume and queue modes saved for this server
+            idle_manager.mark_idle(player, FINISHED) # Reaped if nothing ever plays; track start clears it
             
         elif player.channel != voice_channel:
             await ctx.response.send_message(f"❌ I'm already playing music in {player.channel.mention}!", ephemeral=True)
@@ -263,21 +415,22 @@ class MusicCog(commands.Cog):
     
     # --- Controller Logic ---
     
-    def create_controller_embed(self, player: RenifyPlayer, track: wavelink.abc.Playable) -> discord.Embed:
+    def create_controller_embed(self, player: RenifyPlayer, track: wavelink.Playable) -> discord.Embed:
         """Creates the dynamic 'Now Playing' embed."""
         embed = discord.Embed(
             title="🎧 Now Playing | Renify Controller",
-            description=f"**[{track.title}]({track.uri})** by `{track.author}`",
+            description=track_line(track),
             color=0x1DB954 # Spotify Green
         )
         embed.add_field(name="Queue Size", value=f"{len(player.queue)} tracks", inline=True)
         # You'd need to calculate a progress bar here, which is more complex.
         # For simplicity, we omit the progress bar for now.
         embed.set_thumbnail(url=track.thumbnail if hasattr(track, 'thumbnail') else None)
-        embed.set_footer(text=f"Requested by: {player.home_channel.guild.me.display_name}")
+        embed.set_footer(text=f"Requested by: {requester_name(player, track)}")
+        fit_embed(embed)
         return embed
 
-    async def update_controller_message(self, player: RenifyPlayer, track: wavelink.abc.Playable = None):
+    async def update_controller_message(self, player: RenifyPlayer, track: wavelink.Playable = None):
         """Updates the interactive message with the current track info."""
         if not player.controller_message:
             return
@@ -315,20 +468,41 @@ class MusicCog(commands.Cog):
         
         # Store the message object for later updates
         player.controller_message = await interaction.original_response()
+
+    async def send_controller(self, player: RenifyPlayer, channel: discord.abc.Messageable):
+        """Posts a new controller panel to a channel, e.g. after /play has already answered its interaction."""
+        try:
+            player.controller_message = await channel.send(
+                embed=self.create_controller_embed(player, player.current), view=MusicControls(self.bot))
+        except discord.HTTPException as e:
+            logger.warning(f"Could not post the controller in guild {player.guild.id}: {e}")
         
     # --- Wavelink Events (Modified) ---
 
-    # async def on_wavelink_track_start(self, event: wavelink.TrackStart):
+    @commands.Cog.listener()
+    async def on_wavelink_track_start(self, payload: wavelink.TrackStartEventPayload):
         """Event handler for when a track starts playing."""
-        player: RenifyPlayer = event.player
-        track = event.track
+        player: RenifyPlayer = payload.player
+        track = payload.track
+        fleet_stats.track_started(player)
+        idle_manager.mark_active(player.guild.id)
+        autoplay_index.record(player.guild.id, track)
         
         # Call the update logic to refresh the controller message
         await self.update_controller_message(player, track)
 
-    # async def on_wavelink_track_end(self, event: wavelink.TrackEndEvent):
-    #     """Event handler for when a track finishes."""
-    #     pass
+    @commands.Cog.listener()
+    async def on_wavelink_track_end(self, payload: wavelink.TrackEndEventPayload):
+        """Autoplay or start the idle countdown once the queue has run dry."""
+        player: RenifyPlayer = payload.player
+        if player:
+            fleet_stats.track_ended(player, payload.reason)
+        if not player or player.queue:
+            return
+        if (getattr(player, 'autoplay_next', False) and payload.reason == 'finished' and payload.track
+                and has_listeners(player.channel) and await play_next(player, payload.track)):
+            return
+        idle_manager.mark_idle(player, FINISHED)
 
     # --- Slash Commands (Modified /play) ---
     
@@ -353,16 +527,33 @@ class MusicCog(commands.Cog):
         
         await interaction.response.defer() 
 
-        player = await self.get_player(interaction)
-        if not player: return
-        
+        # Take this guild's next turn now so queue changes land in the order the commands arrived
+        try:
+            turn = guild_lanes.reserve(interaction.guild_id)
+        except LaneBusy as e:
+            logger.warning(f"Busy: {e}")
+            await send_busy(interaction)
+            return
+        async with turn:
+            await self._play(interaction, query, turn)
+
+    async def _play(self, interaction: discord.Interaction, query: str, turn: Turn):
+        """Search (overlapping with other /play calls), then wait for the guild's turn to touch the player."""
         # Log command usage
         logger.info(f"User {interaction.user.name} ({interaction.user.id}) requested /play with query: {query[:100]}")
+        user_tier = get_user_tier(interaction.user.id)
+
+        # Pasted links go straight to their source's loader in canonical form; text uses the default search source
+        parsed = classify(query)
+        query = parsed.query
 
         try:
-            # Search for tracks using Wavelink's search function
-            # Wavelink handles multi-source searching for us (if Lavalink plugins are installed)
-            tracks = await wavelink.Playable.search(query)
+            # Wavelink handles multi-source loading for us (if Lavalink plugins are installed)
+            tracks = await search_admission.run(parsed.search, weight=get_tier_weight(user_tier), tier=user_tier)
+        except SearchOverloaded as e:
+            logger.warning(f"Search rejected for user {interaction.user.id}: {e}")
+            await interaction.followup.send(BUSY_SEARCH_MESSAGE, ephemeral=True)
+            return
         except Exception as e:
             logger.error(f"Search failed for user {interaction.user.id}: {e}", exc_info=True)
             await interaction.followup.send("❌ Could not search for that track. Please try again.", ephemeral=True)
@@ -371,49 +562,82 @@ class MusicCog(commands.Cog):
         if not tracks:
             await interaction.followup.send(f"🧐 Couldn't find any results for: **`{query[:50]}`**", ephemeral=True)
             return
+
+        try:
+            await turn.wait(DEFERRED_WAIT_TIMEOUT)
+        except LaneBusy as e:
+            logger.warning(f"Busy: {e}")
+            await send_busy(interaction)
+            return
+
+        player = await self.get_player(interaction)
+        if not player: return
             
-        # Get user tier and queue limit
-        user_tier = get_user_tier(interaction.user.id)
+        # Get queue limit for the user's tier
         queue_limit = get_queue_limit(user_tier)
+        tier_emoji = TIER_EMOJI.get(user_tier, "")
         current_queue_size = len(player.queue)
-        
-        # Check queue size limits based on tier
+        was_playing = player.playing or player.paused
+
+        # Same duplicate and tier-limit checks as renify_core's /play
         if isinstance(tracks, wavelink.Playlist):
-            if queue_limit is not None:
-                if len(tracks.tracks) + current_queue_size > queue_limit:
-                    tier_emoji = {"FREE": "🆓", "PREMIUM": "⭐", "DIAMOND": "💎"}.get(user_tier, "")
-                    await interaction.followup.send(
-                        f"❌ {tier_emoji} Your {user_tier} tier allows {queue_limit} tracks. "
-                        f"Adding this playlist ({len(tracks.tracks)} tracks) would exceed the limit. "
-                        f"Upgrade to increase your limit!",
-                        ephemeral=True
-                    )
+            playlist = tracks
+            to_add = playlist.tracks
+            skipped = 0
+
+            # Drop tracks that are already queued or playing before they count against the limit
+            if player.queue.no_duplicates:
+                to_add, skipped = player.queue.filter_new(to_add, exclude=[player.current])
+                if not to_add:
+                    await interaction.followup.send("♻️ Every track in that playlist is already queued.", ephemeral=True)
                     return
-        
-        # Handle single tracks or the first track of a playlist
-        track = tracks[0] if not isinstance(tracks, wavelink.Playlist) else tracks.tracks[0]
 
-        if player.is_playing() or player.paused:
-            # Check queue limit before adding
+            if queue_limit is not None and len(to_add) + current_queue_size > queue_limit:
+                await interaction.followup.send(
+                    f"❌ {tier_emoji} Your {user_tier} tier allows {queue_limit} tracks. "
+                    f"Adding this playlist ({len(to_add)} tracks) would exceed the limit. "
+                    f"Upgrade to increase your limit!",
+                    ephemeral=True
+                )
+                return
+
+            # Remember who asked for each track (controller footer and fair queueing)
+            playlist.track_extras(extras={'requester_id': interaction.user.id})
+            track = to_add[0]
+            skipped_text = f" Skipped {skipped} already queued." if skipped else ""
+            if was_playing:
+                player.queue.put(to_add)
+                response_text = f"{tier_emoji} 🎶 Loaded **{len(to_add)}** tracks from playlist **[{playlist.name[:50]}]({query[:100]})**.{skipped_text} ({current_queue_size}/{queue_limit if queue_limit else '∞'} in queue)"
+            else:
+                player.queue.put(to_add[1:]) # Queue the rest after the first track
+                remaining = len(to_add) - 1
+                response_text = f"{tier_emoji} 🎶 Found it! Playing **[{track_title(track)}]({track.uri})** and queued {remaining} more tracks from the playlist.{skipped_text} ({remaining}/{queue_limit if queue_limit else '∞'} in queue)"
+
+        else:
+            # Handle single tracks (take the best result)
+            track = tracks[0]
+            track.extras = {'requester_id': interaction.user.id}
+
+            if player.queue.no_duplicates and (player.queue.is_queued(track) or
+                                               (player.current and track_key(player.current) == track_key(track))):
+                await interaction.followup.send(f"♻️ **{track_title(track)}** is already in the queue.", ephemeral=True)
+                return
+
             if queue_limit is not None and len(player.queue) >= queue_limit:
-                tier_emoji = {"FREE": "🆓", "PREMIUM": "⭐", "DIAMOND": "💎"}.get(user_tier, "")
                 await interaction.followup.send(
                     f"❌ {tier_emoji} Queue is full (max {queue_limit} tracks for {user_tier} tier). "
                     f"Upgrade for a higher limit!",
                     ephemeral=True
                 )
                 return
-            
-            tier_emoji = {"FREE": "🆓", "PREMIUM": "⭐", "DIAMOND": "💎"}.get(user_tier, "")
-            
-            # Add to queue
-            if isinstance(tracks, wavelink.Playlist):
-                player.queue.extend(tracks.tracks)
-                response_text = f"{tier_emoji} 🎶 Loaded **{len(tracks.tracks)}** tracks from playlist **[{tracks.name[:50]}]({query[:100]})**. ({current_queue_size}/{queue_limit if queue_limit else '∞'} in queue)"
-            else:
+
+            if was_playing:
                 player.queue.put(track)
-                response_text = f"{tier_emoji} 🎧 Queued **[{track.title[:50]}]({track.uri})** by `{track.author}`. ({current_queue_size}/{queue_limit if queue_limit else '∞'} in queue)"
-            
+                response_text = f"{tier_emoji} 🎧 Queued **[{track_title(track)}]({track.uri})** by `{escape_author(track.author)}`. ({current_queue_size}/{queue_limit if queue_limit else '∞'} in queue)"
+            else:
+                response_text = f"{tier_emoji} 🎶 Found it! Playing **[{track_title(track)}]({track.uri})** now."
+
+        if was_playing:
             await interaction.followup.send(response_text)
             logger.info(f"Added track(s) to queue for {user_tier} tier user")
             
@@ -422,22 +646,14 @@ class MusicCog(commands.Cog):
             
         else:
             # Start playing immediately
-            tier_emoji = {"FREE": "🆓", "PREMIUM": "⭐", "DIAMOND": "💎"}.get(user_tier, "")
-            
-            if isinstance(tracks, wavelink.Playlist):
-                player.queue.extend(tracks.tracks[1:]) # Queue the rest after the first track
-                remaining = len(tracks.tracks) - 1
-                response_text = f"{tier_emoji} 🎶 Found it! Playing **[{track.title[:50]}]({track.uri})** and queued {remaining} more tracks from the playlist. ({remaining}/{queue_limit if queue_limit else '∞'} in queue)"
-            else:
-                response_text = f"{tier_emoji} 🎶 Found it! Playing **[{track.title[:50]}]({track.uri})** now."
-
             await player.play(track)
             await interaction.followup.send(response_text)
             logger.info(f"Playing track: {track.title}")
             
-            # Auto-send the controller message after starting play, if one doesn't exist
+            # Post the controller panel after starting play, if one doesn't exist.
+            # (The interaction is already answered, so this goes to the channel rather than through /controller.)
             if not player.controller_message:
-                 await self.controller_command(interaction)
+                await self.send_controller(player, interaction.channel)
 
     @discord.app_commands.command(name="sync", description="Sync slash commands with Discord (Admin only).")
     @discord.app_commands.default_permissions(administrator=True)
@@ -458,68 +674,8 @@ class MusicCog(commands.Cog):
     @discord.app_commands.command(name="help", description="Shows a helpful guide for using Renify Bot.")
     async def help_command(self, interaction: discord.Interaction):
         """Shows help information for first-time users."""
-        embed = discord.Embed(
-            title="🎵 Renify Bot - Help & Guide",
-            description="Welcome to **Renify**, your music bot! Here's everything you need to know.",
-            color=0x1DB954
-        )
-        
-        # Commands section
-        commands_text = """
-**🎵 Music Commands:**
-`/play <song name>` - Play music or add to queue
-`/pause` - Pause the current song
-`/resume` - Resume paused music
-`/queue` - View your music queue
-
-**🎮 Interactive Controller:**
-`/controller` - Get an interactive control panel with buttons
-
-**⚙️ Control Commands:**
-Buttons on controller handle pause/skip/stop
-(Requires appropriate permissions)
-
-**❓ Help:**
-`/help` - Show this guide
-        """
-        embed.add_field(name="📜 Commands", value=commands_text, inline=False)
-        
-        # Queue limits
         user_tier = get_user_tier(interaction.user.id)
-        queue_limit = get_queue_limit(user_tier)
-        tier_emoji = {"FREE": "🆓", "PREMIUM": "⭐", "DIAMOND": "💎"}.get(user_tier, "")
-        limit_text = f"{queue_limit:,} tracks" if queue_limit else "Unlimited tracks"
-        
-        tier_info = f"""
-**Your Tier:** {tier_emoji} {user_tier}
-**Queue Limit:** {limit_text}
-**Current Plan:** Free (All users start here)
-        """
-        embed.add_field(name="💎 Your Subscription", value=tier_info, inline=False)
-        
-        # Quick start
-        quick_start = """
-1. **Join a voice channel** in this server
-2. Use `/play <song name>` to start playing music
-3. Use `/controller` for interactive buttons
-4. Queue up to 500 songs (your free tier limit)
-5. Enjoy! The bot will auto-disconnect when queue ends
-        """
-        embed.add_field(name="🚀 Quick Start", value=quick_start, inline=False)
-        
-        # Tips
-        tips = """
-• You can search for songs by name or paste YouTube URLs
-• Add playlists with `/play <playlist url>`
-• Queue fills up! Check `/queue` to see what's next
-• Use `/controller` for a nice button interface
-• Bot needs to be in your voice channel to work
-        """
-        embed.add_field(name="💡 Tips & Tricks", value=tips, inline=False)
-        
-        embed.set_footer(text="Renify Bot v1.0 | Made with ❤️ for music lovers")
-        
-        await interaction.response.send_message(embed=embed)
+        await interaction.response.send_message(embed=help_embeds.get(user_tier, get_queue_limit(user_tier)))
 
 
 # --- BOT RUNNING (Keep the same) ---
@@ -541,7 +697,8 @@ async def main():
 if __name__ == "__main__":
     import asyncio
     try:
-        asyncio.run(main())
+        # Runs on uvloop with orjson when RENIFY_SPEEDUPS=true and they are installed
+        run_with_speedups(main())
     except KeyboardInterrupt:
         logger.info("Bot shutting down...")
         print("\n👋 Renify shutting down...")
\ No newline at end of file
@@ -6,6 +6,28 @@ from collections import defaultdict
 from time import time
 import logging
 import asyncio
+import io
+from renify_tracing import tracer, traced, span, format_trace
+from renify_traffic import traffic_recorder
+from renify_autocomplete import autocomplete_index, TOKEN_PREFIX
+from renify_history import history_store
+from renify_idle import idle_manager, has_listeners, EMPTY, FINISHED
+from renify_queue import RenifyQueue, requester_of, track_key
+from renify_lanes import guild_lanes, serialized, send_busy, LaneBusy, Turn, DEFERRED_WAIT_TIMEOUT
+from renify_admission import search_admission, SearchOverloaded, BUSY_SEARCH_MESSAGE
+from renify_metrics import metrics
+from renify_sources import classify
+from renify_watchdog import loop_watchdog
+from renify_speedups import run_with_speedups
+from renify_autoplay import autoplay_index, play_next, AUTOPLAY, WARM_DAYS
+from renify_config import runtime_config, RuntimeConfig, make_nodes, sync_nodes
+from renify_playlists import playlist_store, PlaylistFull, MAX_PLAYLISTS, NAME_LENGTH as PLAYLIST_NAME_LENGTH
+from renify_memory import memory_diagnostics
+from renify_profiler import profiler, ProfilerBusy
+from renify_stats import fleet_stats, NO_TIER
+from renify_settings import guild_settings, apply_settings, home_channel, dj_or_permissions, MAX_VOLUME
+from renify_render import (TIER_EMOJI, EmbedCache, escape_author, escape_title, fit_embed, queue_embed,
+                           track_title)
 
 # Configure logging
 logging.basicConfig(
@@ -22,8 +44,11 @@ DISCORD_TOKEN = os.getenv("DISCORD_TOKEN", "YOUR_BOT_TOKEN_HERE")
 LAVALINK_HOST = os.getenv("LAVALINK_HOST", "lavalink")
 LAVALINK_PORT = int(os.getenv("LAVALINK_PORT", 2333))
 LAVALINK_PASSWORD = os.getenv("LAVALINK_PASSWORD", "renifythoushallnotpass")
+# Optional comma-separated list of nodes (e.g. "http://127.0.0.1:2333,http://127.0.0.1:2334")
+# Overrides LAVALINK_HOST/LAVALINK_PORT; useful for failover and the local fake Lavalink
+LAVALINK_NODES = os.getenv("LAVALINK_NODES", "")
 
-# Security constants
+# Security constants (defaults; RENIFY_CONFIG_FILE can change them at runtime, see renify_config)
 MAX_QUERY_LENGTH = 500
 MAX_QUEUE_SIZE = 50  # Default (will be overridden by tier)
 COMMAND_COOLDOWN = 30
@@ -36,6 +61,13 @@ TIER_LIMITS = {
     'DIAMOND': None   # Diamond tier: Unlimited (None = unlimited)
 }
 
+# Fair-queue turns per round (see RENIFY_FAIR_QUEUE)
+TIER_WEIGHTS = {
+    'FREE': 1,
+    'PREMIUM': 2,
+    'DIAMOND': 3
+}
+
 def get_user_tier(user_id: int) -> str:
     """Get user's tier. For now, default to FREE."""
     # TODO: Implement your payment/subscription system here
@@ -44,30 +76,85 @@ def get_user_tier(user_id: int) -> str:
 
 def get_queue_limit(tier: str) -> int | None:
     """Get queue limit based on tier."""
-    return TIER_LIMITS.get(tier, 500)
+    return runtime_config.current.tier_limits.get(tier, 500)
+
+def get_tier_weight(tier: str) -> int:
+    """Get a tier's fair-queue and search-admission weight."""
+    return runtime_config.current.tier_weights.get(tier, 1)
+
+def get_fair_weight(user_id: int | None) -> int:
+    """Get how many tracks a requester gets per fair-queue round."""
+    if user_id is None:
+        return 1
+    return get_tier_weight(get_user_tier(user_id))
+
+def get_track_tier(track: wavelink.Playable) -> str:
+    """Get the tier a queued track is counted under in /stats."""
+    requester_id = requester_of(track)
+    return NO_TIER if requester_id is None else get_user_tier(requester_id)
+
+fleet_stats.tier_of = get_track_tier
+
+def get_lavalink_uris() -> list[str]:
+    """Get the Lavalink node URIs to connect to."""
+    if LAVALINK_NODES:
+        uris = [uri.strip() for uri in LAVALINK_NODES.split(',') if uri.strip()]
+        return [uri if '://' in uri else f'http://{uri}' for uri in uris]
+    return [f'http://{LAVALINK_HOST}:{LAVALINK_PORT}']
+
+runtime_config.configure(RuntimeConfig(
+    tier_limits=TIER_LIMITS,
+    tier_weights=TIER_WEIGHTS,
+    command_cooldown=COMMAND_COOLDOWN,
+    max_calls_per_window=MAX_CALLS_PER_WINDOW,
+    max_query_length=MAX_QUERY_LENGTH,
+    lavalink_nodes=get_lavalink_uris(),
+    lavalink_password=LAVALINK_PASSWORD,
+))
 
 # --- RATE LIMITER ---
 class RateLimiter:
     def __init__(self):
         self.users = defaultdict(list)
+        self.last_sweep = time()
     
     def is_rate_limited(self, user_id: int) -> bool:
         now = time()
-        self.users[user_id] = [call_time for call_time in self.users[user_id] if now - call_time < COMMAND_COOLDOWN]
-        limited = len(self.users[user_id]) >= MAX_CALLS_PER_WINDOW
+        config = runtime_config.current
+        if now - self.last_sweep >= config.command_cooldown:
+            self.sweep(now)
+        self.users[user_id] = [call_time for call_time in self.users[user_id] if now - call_time < config.command_cooldown]
+        limited = len(self.users[user_id]) >= config.max_calls_per_window
         if not limited:
             self.users[user_id].append(now)
         return limited
 
+    def sweep(self, now: float):
+        """Forget users whose calls have all expired so the table doesn't grow forever."""
+        cooldown = runtime_config.current.command_cooldown
+        self.users = defaultdict(list, {
+            user_id: calls for user_id, calls in self.users.items()
+            if calls and now - calls[-1] < cooldown
+        })
+        self.last_sweep = now
+
 rate_limiter = RateLimiter()
 
+async def reply(interaction: discord.Interaction, content: str, **kwargs):
+    """Answer an interaction, or follow up if it was already deferred or answered."""
+    if interaction.response.is_done():
+        await interaction.followup.send(content, **kwargs)
+    else:
+        await interaction.response.send_message(content, **kwargs)
+
 # --- INPUT VALIDATION ---
 def validate_query(query: str) -> tuple[bool, str]:
     """Validate and sanitize user input"""
     if not query:
         return False, "❌ Please provide a search query."
-    if len(query) > MAX_QUERY_LENGTH:
-        return False, f"❌ Query too long (max {MAX_QUERY_LENGTH} characters)."
+    max_length = runtime_config.current.max_query_length
+    if len(query) > max_length:
+        return False, f"❌ Query too long (max {max_length} characters)."
     dangerous_chars = ['\n', '\r', '\x00']
     if any(char in query for char in dangerous_chars):
         return False, "❌ Invalid characters in query."
@@ -103,6 +190,23 @@ class RenifyBot(commands.Bot):
         # This will hold the Wavelink node connection
         self.wavelink = None
 
+    async def setup_hook(self):
+        """Called when setting up the bot, before on_ready."""
+        idle_manager.start()
+        # Before the gateway connects, so no track can start while the indexes are rebuilt
+        plays = await history_store.sequences(WARM_DAYS)
+        autoplay_index.warm(plays)
+        autocomplete_index.warm(plays)
+        loop_watchdog.start()
+        runtime_config.on_change(lambda old, new: sync_nodes(self, old, new))
+        runtime_config.start()
+        fleet_stats.start(lambda: [g.voice_client for g in self.guilds if isinstance(g.voice_client, RenifyPlayer)])
+        await metrics.serve()
+
+    async def on_interaction(self, interaction: discord.Interaction):
+        """Feeds every interaction to the (opt-in) traffic recorder."""
+        traffic_recorder.record(interaction)
+
     async def on_ready(self):
         """Called when the bot is connected to Discord."""
         logger.info(f'🤖 Logged in as: {self.user} (ID: {self.user.id})')
@@ -134,21 +238,20 @@ class RenifyBot(commands.Bot):
                 logger.info(f'Attempting to connect to Lavalink (attempt {attempt + 1}/{max_retries})...')
                 print(f'Attempting to connect to Lavalink (attempt {attempt + 1}/{max_retries})...')
                 
-                # Create a Wavelink node object
-                node = wavelink.Node(
-                    uri=f'http://{LAVALINK_HOST}:{LAVALINK_PORT}',
-                    password=LAVALINK_PASSWORD
-                )
+                # Create a Wavelink node object for every configured Lavalink server
+                config = runtime_config.current
+                nodes = make_nodes(config.lavalink_nodes, config.lavalink_password)
                 
-                # Connect the node to the bot
-                self.wavelink = await wavelink.Pool.connect(client=self, nodes=[node])
+                # Connect the nodes to the bot
+                self.wavelink = await wavelink.Pool.connect(client=self, nodes=nodes)
                 
                 # Bind the event listener for when tracks end
                 # Note: Event listeners are handled differently in newer Wavelink versions
                 # We'll handle track events through the player directly
 
-                logger.info(f'🎵 Wavelink node connected: {node.identifier}')
-                print(f'🎵 Wavelink node connected: {node.identifier}')
+                for node in nodes:
+                    logger.info(f'🎵 Wavelink node connected: {node.identifier} ({node.uri})')
+                    print(f'🎵 Wavelink node connected: {node.identifier} ({node.uri})')
                 return  # Success, exit the retry loop
                 
             except Exception as e:
@@ -164,6 +267,23 @@ class RenifyBot(commands.Bot):
                     print(f'❌ Failed to connect to Lavalink after {max_retries} attempts')
                     raise
 
+
+    async def on_wavelink_node_disconnected(self, payload: wavelink.NodeDisconnectedEventPayload):
+        """Moves players off a Lavalink node that dropped, if another node is available."""
+        dead = payload.node
+        alive = [n for n in wavelink.Pool.nodes.values() if n is not dead and n.status is wavelink.NodeStatus.CONNECTED]
+        if not alive:
+            logger.warning(f'⚠️ Lavalink node {dead.identifier} disconnected and no other node is available')
+            return
+
+        for player in list(dead.players.values()):
+            target = min(alive, key=lambda n: len(n.players))
+            try:
+                await player.switch_node(target)
+                logger.info(f'🔀 Moved player for guild {player.guild.id} from {dead.identifier} to {target.identifier}')
+            except Exception as e:
+                logger.error(f'❌ Failed to move player off {dead.identifier}: {e}')
+                await player.disconnect()
     
     # Note: Track event handling is now done through the player directly
     # These methods are commented out due to Wavelink API changes
@@ -184,6 +304,84 @@ class RenifyPlayer(wavelink.Player):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.home_channel = None # The text channel where commands are used
+        self.autoplay = wavelink.AutoPlayMode.partial # Advance through the queue without recommendations
+        self.queue = RenifyQueue(weight_for=get_fair_weight) # Indexed queue so huge queues stay fast to edit
+        self.autoplay_next = AUTOPLAY # Play a related track when the queue runs dry (see /autoplay)
+        fleet_stats.attach(self)
+
+    async def disconnect(self, **kwargs) -> None:
+        fleet_stats.detach(self)
+        await super().disconnect(**kwargs)
+
+def build_help_embed(user_tier: str, queue_limit: int | None) -> discord.Embed:
+    """Build the /help embed for a tier; cached in help_embeds, so this runs once per tier and limit."""
+    embed = discord.Embed(
+        title="🎵 Renify Bot - Help & Guide",
+        description="Welcome to **Renify**, your music bot! Here's everything you need to know.",
+        color=0x1DB954
+    )
+    
+    # Commands section
+    commands_text = """
+**🎵 Music Commands:**
+`/play <song name>` - Play music or add to queue
+`/pause` - Pause the current song
+`/resume` - Resume paused music
+`/queue` - View your music queue
+`/history` - Recently played or this week's top tracks
+`/replay [number]` - Play a track from the history again
+`/playlist save|load|list|delete` - Save the queue and load it again later
+
+**⚙️ Control Commands (Requires Permissions):**
+`/skip` - Skip to next song
+`/stop` - Stop music and disconnect bot
+`/remove <position> [to]` - Remove a track or a range
+`/move <position> <to>` - Move a track in the queue
+`/skipto <position>` - Jump ahead in the queue
+`/shuffle` - Shuffle the queue
+`/fairqueue <on/off>` - Let requesters take turns
+`/nodupes <on/off>` - Skip songs that are already queued
+`/autoplay <on/off>` - Play related tracks when the queue runs out
+`/settings` - Home channel, DJ role and default volume for this server
+
+**❓ Help:**
+`/help` - Show this guide
+    """
+    embed.add_field(name="📜 Commands", value=commands_text, inline=False)
+    
+    # Queue limits
+    tier_emoji = TIER_EMOJI.get(user_tier, "")
+    limit_text = f"{queue_limit:,} tracks" if queue_limit else "Unlimited tracks"
+    
+    tier_info = f"""
+**Your Tier:** {tier_emoji} {user_tier}
+**Queue Limit:** {limit_text}
+**Current Plan:** Free (All users start here)
+    """
+    embed.add_field(name="💎 Your Subscription", value=tier_info, inline=False)
+    
+    # Quick start
+    quick_start = f"""
+1. **Join a voice channel** in this server
+2. Use `/play <song name>` to start playing music
+3. Queue up to {limit_text.lower()} (your {user_tier} tier limit)
+4. Enjoy! The bot will auto-disconnect when queue ends
+    """
+    embed.add_field(name="🚀 Quick Start", value=quick_start, inline=False)
+    
+    # Tips
+    tips = """
+• You can search for songs by name or paste YouTube URLs
+• Add playlists with `/play <playlist url>`
+• Queue fills up! Check `/queue` to see what's next
+• Bot needs to be in your voice channel to work
+    """
+    embed.add_field(name="💡 Tips & Tricks", value=tips, inline=False)
+    
+    embed.set_footer(text="Renify Bot v1.0 | Made with ❤️ for music lovers")
+    return embed
+
+help_embeds = EmbedCache(build_help_embed)
 
 @commands.guild_only() # Music commands should only work in a server
 class MusicCog(commands.Cog):
@@ -197,7 +395,7 @@ class MusicCog(commands.Cog):
         
         # Get the voice channel the user is in
         if not ctx.user.voice or not ctx.user.voice.channel:
-            await ctx.response.send_message("❌ You must be in a voice channel to use music commands!", ephemeral=True)
+            await reply(ctx, "❌ You must be in a voice channel to use music commands!", ephemeral=True)
             return None
             
         voice_channel = ctx.user.voice.channel
@@ -205,11 +403,11 @@ class MusicCog(commands.Cog):
         # Check bot permissions
         me = ctx.guild.me
         if not voice_channel.permissions_for(me).connect:
-            await ctx.response.send_message("❌ I don't have permission to connect to that voice channel!", ephemeral=True)
+            await reply(ctx, "❌ I don't have permission to connect to that voice channel!", ephemeral=True)
             return None
         
         if not voice_channel.permissions_for(me).speak:
-            await ctx.response.send_message("❌ I don't have permission to speak in that voice channel!", ephemeral=True)
+            await reply(ctx, "❌ I don't have permission to speak in that voice channel!", ephemeral=True)
             return None
         
         # Get the Wavelink player for this guild
@@ -218,22 +416,30 @@ class MusicCog(commands.Cog):
         if not player:
             # Bot is not connected, connect it now
             player = await voice_channel.connect(cls=RenifyPlayer)
-            player.home_channel = ctx.channel # Set the text channel
+            await apply_settings(player, ctx.channel) # Home channel, volume and queue modes saved for this server
+            idle_manager.mark_idle(player, FINISHED) # Reaped if nothing ever plays; track start clears it
             
         elif player.channel != voice_channel:
+            if idle_manager.is_parked(ctx.guild.id) and not player.playing:
+                # Reuse the idle connection rather than paying for a new handshake
+                await player.move_to(voice_channel)
+                player.home_channel = home_channel(ctx.guild, ctx.channel)
+                return player
             # Bot is in a different channel
-            await ctx.response.send_message(f"❌ I'm already playing music in {player.channel.mention}!", ephemeral=True)
+            await reply(ctx, f"❌ I'm already playing music in {player.channel.mention}!", ephemeral=True)
             return None
             
         return player
 
     @discord.app_commands.command(name="play", description="Search for a song/playlist or paste a URL to play.")
     @discord.app_commands.describe(query="The song title, artist, or URL (YouTube/Spotify link).")
+    @traced("play")
     async def play_command(self, interaction: discord.Interaction, query: str):
         """The main play command with security enhancements."""
         
         # Input validation
-        is_valid, result = validate_query(query)
+        with span("validate"):
+            is_valid, result = validate_query(query)
         if not is_valid:
             await interaction.response.send_message(result, ephemeral=True)
             return
@@ -241,23 +447,51 @@ class MusicCog(commands.Cog):
         query = result
         
         # Rate limiting
-        if rate_limiter.is_rate_limited(interaction.user.id):
+        with span("rate_limit"):
+            limited = rate_limiter.is_rate_limited(interaction.user.id)
+        if limited:
             await interaction.response.send_message("⏱️ You're sending commands too fast! Please wait a moment.", ephemeral=True)
             logger.warning(f"Rate limit hit for user {interaction.user.id}")
             return
         
-        await interaction.response.defer() # Acknowledge the command immediately
+        with span("defer"):
+            await interaction.response.defer() # Acknowledge the command immediately
 
-        player = await self.get_player(interaction)
-        if not player:
+        # Take this guild's next turn now so queue changes land in the order the commands arrived
+        try:
+            turn = guild_lanes.reserve(interaction.guild_id)
+        except LaneBusy as e:
+            logger.warning(f"Busy: {e}")
+            await send_busy(interaction)
             return
+        async with turn:
+            await self._play(interaction, query, turn)
 
+    async def _play(self, interaction: discord.Interaction, query: str, turn: Turn):
+        """Search (overlapping with other /play calls), then wait for the guild's turn to touch the player."""
         # Log command usage
         logger.info(f"User {interaction.user.name} ({interaction.user.id}) requested /play with query: {query[:100]}")
+        user_tier = get_user_tier(interaction.user.id)
 
         try:
-            # Search for tracks using Wavelink's search function
-            tracks = await wavelink.Playable.search(query)
+            # A picked autocomplete suggestion already carries the track, so skip the search
+            suggested = autocomplete_index.resolve(interaction.guild_id, query)
+            if suggested is not None:
+                tracks = [suggested]
+            elif query.startswith(TOKEN_PREFIX):
+                # The suggestion was evicted (or the bot restarted); searching for the token itself finds nothing useful
+                await interaction.followup.send("⌛ That suggestion has expired. Please type your search again.", ephemeral=True)
+                return
+            else:
+                # Pasted links go straight to their source's loader in canonical form
+                parsed = classify(query)
+                query = parsed.query
+                with span("search"):
+                    tracks = await search_admission.run(parsed.search, weight=get_tier_weight(user_tier), tier=user_tier)
+        except SearchOverloaded as e:
+            logger.warning(f"Search rejected for user {interaction.user.id}: {e}")
+            await interaction.followup.send(BUSY_SEARCH_MESSAGE, ephemeral=True)
+            return
         except Exception as e:
             logger.error(f"Search failed for user {interaction.user.id}: {e}", exc_info=True)
             await interaction.followup.send("❌ Could not search for that track. Please try again.", ephemeral=True)
@@ -266,47 +500,76 @@ class MusicCog(commands.Cog):
         if not tracks:
             await interaction.followup.send(f"🧐 Couldn't find any results for: **`{query[:50]}`**", ephemeral=True)
             return
+
+        try:
+            with span("lane_wait"):
+                await turn.wait(DEFERRED_WAIT_TIMEOUT)
+        except LaneBusy as e:
+            logger.warning(f"Busy: {e}")
+            await send_busy(interaction)
+            return
+
+        with span("get_player"):
+            player = await self.get_player(interaction)
+        if not player:
+            return
         
-        # Get user tier and queue limit
-        user_tier = get_user_tier(interaction.user.id)
+        # Get queue limit for the user's tier
         queue_limit = get_queue_limit(user_tier)
+        tier_emoji = TIER_EMOJI.get(user_tier, "")
         current_queue_size = len(player.queue)
         
         # Check queue size limits based on tier
         if isinstance(tracks, wavelink.Playlist):
             # Handle playlists (e.g., Spotify/YouTube playlists)
             playlist = tracks
+            to_add = playlist.tracks
+            skipped = 0
+
+            # Drop tracks that are already queued or playing before they count against the limit
+            if player.queue.no_duplicates:
+                to_add, skipped = player.queue.filter_new(to_add, exclude=[player.current])
+                if not to_add:
+                    await interaction.followup.send("♻️ Every track in that playlist is already queued.", ephemeral=True)
+                    return
             
             if queue_limit is not None:
-                if len(playlist.tracks) + current_queue_size > queue_limit:
-                    tier_emoji = {"FREE": "🆓", "PREMIUM": "⭐", "DIAMOND": "💎"}.get(user_tier, "")
+                if len(to_add) + current_queue_size > queue_limit:
                     await interaction.followup.send(
                         f"❌ {tier_emoji} Your {user_tier} tier allows {queue_limit} tracks. "
-                        f"Adding this playlist ({len(playlist.tracks)} tracks) would exceed the limit. "
+                        f"Adding this playlist ({len(to_add)} tracks) would exceed the limit. "
                         f"Upgrade to increase your limit!",
                         ephemeral=True
                     )
                     return
             
-            player.queue.extend(playlist.tracks)
+            playlist.track_extras(extras={'requester_id': interaction.user.id})
+            player.queue.put(to_add)
             
             # Start playing if not already playing
-            if not player.is_playing() and not player.paused:
-                await player.play(player.queue.get())
+            if not player.playing and not player.paused:
+                with span("play"):
+                    await player.play(player.queue.get())
 
-            tier_emoji = {"FREE": "🆓", "PREMIUM": "⭐", "DIAMOND": "💎"}.get(user_tier, "")
-            await interaction.followup.send(
-                f"{tier_emoji} 🎶 Loaded **{len(playlist.tracks)}** tracks from playlist **[{playlist.name[:50]}]({query[:100]})**. "
-                f"({current_queue_size}/{queue_limit if queue_limit else '∞'} in queue)"
-            )
-            logger.info(f"Loaded playlist with {len(playlist.tracks)} tracks for {user_tier} tier user")
+            with span("followup"):
+                await interaction.followup.send(
+                    f"{tier_emoji} 🎶 Loaded **{len(to_add)}** tracks from playlist **[{playlist.name[:50]}]({query[:100]})**. "
+                    + (f"Skipped {skipped} already queued. " if skipped else "")
+                    + f"({current_queue_size}/{queue_limit if queue_limit else '∞'} in queue)"
+                )
+            logger.info(f"Loaded playlist with {len(to_add)} tracks for {user_tier} tier user")
 
         else:
             # Handle single tracks (take the best result)
             track = tracks[0]
+            track.extras = {'requester_id': interaction.user.id}
+
+            if player.queue.no_duplicates and (player.queue.is_queued(track) or
+                                               (player.current and track_key(player.current) == track_key(track))):
+                await interaction.followup.send(f"♻️ **{track_title(track)}** is already in the queue.", ephemeral=True)
+                return
             
             if queue_limit is not None and len(player.queue) >= queue_limit:
-                tier_emoji = {"FREE": "🆓", "PREMIUM": "⭐", "DIAMOND": "💎"}.get(user_tier, "")
                 await interaction.followup.send(
                     f"❌ {tier_emoji} Queue is full (max {queue_limit} tracks for {user_tier} tier). "
                     f"Upgrade for a higher limit!",
@@ -314,29 +577,77 @@ class MusicCog(commands.Cog):
                 )
                 return
             
-            if player.is_playing() or player.paused:
+            if player.playing or player.paused:
                 # Add to queue if something is already playing
                 player.queue.put(track)
-                await interaction.followup.send(
-                    f"🎧 Queued **[{track.title[:50]}]({track.uri})** by `{track.author}`."
-                )
+                with span("followup"):
+                    await interaction.followup.send(
+                        f"🎧 Queued **[{track_title(track)}]({track.uri})** by `{escape_author(track.author)}`."
+                    )
             else:
                 # Start playing immediately
-                await player.play(track)
+                with span("play"):
+                    await player.play(track)
                 # The 'Now Playing' message is sent by the on_wavelink_track_start event
-                await interaction.followup.send(f"🎶 Found it! Playing now...")
+                with span("followup"):
+                    await interaction.followup.send(f"🎶 Found it! Playing now...")
                 logger.info(f"Playing track: {track.title}")
-                
+
+    @play_command.autocomplete('query')
+    async def play_autocomplete(self, interaction: discord.Interaction, current: str) -> list[discord.app_commands.Choice[str]]:
+        """Suggest tracks from local history only; never searches Lavalink on a keystroke."""
+        return [
+            discord.app_commands.Choice(name=name, value=value)
+            for name, value in autocomplete_index.suggest(interaction.guild_id, current)
+        ]
+
+    @commands.Cog.listener()
+    async def on_wavelink_track_start(self, payload: wavelink.TrackStartEventPayload):
+        """Feed started tracks into the guild's autocomplete and play history."""
+        if payload.player and payload.player.guild:
+            guild_id = payload.player.guild.id
+            fleet_stats.track_started(payload.player)
+            idle_manager.mark_active(guild_id)
+            autocomplete_index.record(guild_id, payload.track)
+            autoplay_index.record(guild_id, payload.track)
+            history_store.record(guild_id, payload.track, getattr(payload.track.extras, 'requester_id', None))
+
+    @commands.Cog.listener()
+    async def on_wavelink_track_end(self, payload: wavelink.TrackEndEventPayload):
+        """Autoplay or start the idle countdown once the queue has run dry."""
+        player: RenifyPlayer = payload.player
+        if player:
+            fleet_stats.track_ended(player, payload.reason)
+        if not player or player.queue:
+            return
+        if (getattr(player, 'autoplay_next', False) and payload.reason == 'finished' and payload.track
+                and has_listeners(player.channel) and await play_next(player, payload.track)):
+            return
+        idle_manager.mark_idle(player, FINISHED)
+
+    @commands.Cog.listener()
+    async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState):
+        """Start the empty-channel countdown when the last listener leaves."""
+        player: RenifyPlayer = member.guild.voice_client
+        if not player or member.bot or before.channel == after.channel:
+            return
+        if before.channel == player.channel and not has_listeners(player.channel):
+            idle_manager.mark_idle(player, EMPTY)
+        elif after.channel == player.channel:
+            idle_manager.mark_active(member.guild.id, EMPTY)
+            if not player.playing:
+                idle_manager.mark_idle(player, FINISHED)
                 
     @discord.app_commands.command(name="skip", description="Skips the current track.")
-    @discord.app_commands.checks.has_permissions(manage_messages=True)
+    @dj_or_permissions(manage_messages=True)
+    @serialized
     async def skip_command(self, interaction: discord.Interaction):
         """Skips the current track."""
         player = await self.get_player(interaction)
         if not player:
             return
             
-        if not player.is_playing():
+        if not player.playing:
             await interaction.response.send_message("🤷 I'm not playing anything right now!", ephemeral=True)
             return
         
@@ -346,6 +657,7 @@ class MusicCog(commands.Cog):
         await interaction.response.send_message("⏭️ Skipped! Next track coming up...")
 
     @discord.app_commands.command(name="pause", description="Pauses the music.")
+    @serialized
     async def pause_command(self, interaction: discord.Interaction):
         """Pauses the music."""
         player = await self.get_player(interaction)
@@ -360,6 +672,7 @@ class MusicCog(commands.Cog):
         await interaction.response.send_message("⏸️ Paused the music. Take a breather.")
 
     @discord.app_commands.command(name="resume", description="Resumes the music.")
+    @serialized
     async def resume_command(self, interaction: discord.Interaction):
         """Resumes the music."""
         player = await self.get_player(interaction)
@@ -374,26 +687,22 @@ class MusicCog(commands.Cog):
         await interaction.response.send_message("▶️ Back to the music!")
 
     @discord.app_commands.command(name="stop", description="Stops the music and clears the queue.")
-    @discord.app_commands.checks.has_permissions(manage_messages=True)
+    @dj_or_permissions(manage_messages=True)
+    @serialized
     async def stop_command(self, interaction: discord.Interaction):
         """Stops the music and clears the queue."""
         player = await self.get_player(interaction)
         if not player:
             return
             
-        if not player.is_playing() and player.queue.is_empty:
+        if not player.playing and player.queue.is_empty:
              await interaction.response.send_message("Nothing to stop.", ephemeral=True)
              return
         
         logger.info(f"User {interaction.user.name} stopped the music")
-        # Clear the queue
-        player.queue.clear()
-        
-        # Stop the player (triggers TrackEnd and disconnects if queue is empty)
-        await player.stop()
-        
-        # Disconnect immediately
-        await player.disconnect()
+        # Clear the queue and stop, but stay connected so the next /play starts instantly;
+        # the idle reaper disconnects if nothing is played within the grace period
+        await idle_manager.park(player)
         
         await interaction.response.send_message("⏹️ Music stopped and queue cleared. Thanks for letting me handle the vibe!")
 
@@ -413,96 +722,491 @@ class MusicCog(commands.Cog):
                 ephemeral=True
             )
 
-    @discord.app_commands.command(name="help", description="Shows a helpful guide for using Renify Bot.")
-    async def help_command(self, interaction: discord.Interaction):
-        """Shows help information for first-time users."""
-        embed = discord.Embed(
-            title="🎵 Renify Bot - Help & Guide",
-            description="Welcome to **Renify**, your music bot! Here's everything you need to know.",
-            color=0x1DB954
+    @discord.app_commands.command(name="stats", description="Players, playback and queued tracks across all servers (Admin only).")
+    @discord.app_commands.default_permissions(administrator=True)
+    async def stats_command(self, interaction: discord.Interaction):
+        """Shows the event-maintained fleet counters."""
+        stats = fleet_stats.snapshot()
+        embed = discord.Embed(title="📊 Renify Stats", color=discord.Color.blurple())
+        embed.add_field(name="🔊 Players", value=f"{stats['players']:,} connected\n{stats['playing']:,} playing", inline=True)
+        by_tier = "\n".join(f"{tier}: {count:,}" for tier, count in sorted(stats['queued_by_tier'].items()))
+        embed.add_field(name="📜 Queued", value=f"{stats['queued']:,} tracks" + (f"\n{by_tier}" if by_tier else ""), inline=True)
+        embed.add_field(name="🎵 Tracks", value=f"{stats['started']:,} started\n{stats['ended']:,} ended", inline=True)
+        scanned = f"<t:{int(stats['last_scan'])}:R>" if stats['last_scan'] else "not yet"
+        embed.set_footer(text=f"Servers: {len(self.bot.guilds):,} • Drift corrections: {stats['corrections']}")
+        embed.add_field(name="🔍 Last full scan", value=scanned, inline=False)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @discord.app_commands.command(name="traces", description="Show the slowest recent command traces (Admin only).")
+    @discord.app_commands.describe(limit="How many traces to show (1-10).")
+    @discord.app_commands.default_permissions(administrator=True)
+    async def traces_command(self, interaction: discord.Interaction, limit: int = 5):
+        """Shows a per-stage breakdown of the slowest traced interactions."""
+        slowest = tracer.slowest(max(1, min(limit, 10)))
+        if not slowest:
+            await interaction.response.send_message("No traces recorded yet.", ephemeral=True)
+            return
+
+        report = "\n\n".join(format_trace(t) for t in slowest)
+        await interaction.response.send_message(f"🐢 **Slowest recent traces**\n```\n{report[:1900]}\n```", ephemeral=True)
+
+    @discord.app_commands.command(name="memory", description="Memory diagnostics with tracemalloc (Admin only).")
+    @discord.app_commands.describe(action="status, start tracing, top allocation sites, growth since the last snapshot, or stop")
+    @discord.app_commands.choices(action=[
+        discord.app_commands.Choice(name="Status", value="status"),
+        discord.app_commands.Choice(name="Start tracing", value="start"),
+        discord.app_commands.Choice(name="Top allocations", value="top"),
+        discord.app_commands.Choice(name="Diff since last snapshot", value="diff"),
+        discord.app_commands.Choice(name="Stop tracing", value="stop"),
+    ])
+    @discord.app_commands.default_permissions(administrator=True)
+    async def memory_command(self, interaction: discord.Interaction, action: str = "status"):
+        """Starts/stops tracemalloc and attaches allocation and object-count reports."""
+        if action == "start":
+            started = memory_diagnostics.start()
+            await interaction.response.send_message(
+                "🔬 Memory tracing started. Use `/memory top` now and `/memory diff` later to see what grew."
+                if started else "🔬 Memory tracing is already running.", ephemeral=True)
+            return
+        if action == "stop":
+            memory_diagnostics.stop()
+            await interaction.response.send_message("🔬 Memory tracing stopped and snapshots freed.", ephemeral=True)
+            return
+        if action == "status" or not memory_diagnostics.tracing:
+            hint = "" if memory_diagnostics.tracing or action == "status" else "\nTracing is off; use `/memory start` first."
+            await interaction.response.send_message(f"```\n{memory_diagnostics.status()}\n```{hint}", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        report = await memory_diagnostics.report(
+            diff=action == "diff",
+            classes={'RenifyPlayer': RenifyPlayer, 'wavelink.Playable': wavelink.Playable, 'discord.Message': discord.Message},
+            extra={'RateLimiter entries': len(rate_limiter.users), 'Idle players': len(idle_manager)},
         )
-        
-        # Commands section
-        commands_text = """
-**🎵 Music Commands:**
-`/play <song name>` - Play music or add to queue
-`/pause` - Pause the current song
-`/resume` - Resume paused music
-`/queue` - View your music queue
+        file = discord.File(io.BytesIO(report.encode()), filename=f"renify-memory-{action}-{int(time())}.txt")
+        await interaction.followup.send(f"🔬 Memory report ({action})", file=file, ephemeral=True)
 
-**⚙️ Control Commands (Requires Permissions):**
-`/skip` - Skip to next song
-`/stop` - Stop music and disconnect bot
+    @discord.app_commands.command(name="profile", description="Sample the bot's CPU usage for a few seconds (Admin only).")
+    @discord.app_commands.describe(seconds="How long to profile (1-60 seconds)")
+    @discord.app_commands.default_permissions(administrator=True)
+    async def profile_command(self, interaction: discord.Interaction, seconds: int = 10):
+        """Runs the sampling profiler and attaches flamegraph-ready collapsed stacks."""
+        if profiler.running:
+            await interaction.response.send_message("🔥 A profile is already running. Try again when it finishes.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        try:
+            result = await profiler.profile(seconds)
+        except ProfilerBusy:
+            await interaction.followup.send("🔥 A profile is already running. Try again when it finishes.", ephemeral=True)
+            return
+
+        file = discord.File(io.BytesIO(result.folded().encode()), filename=f"renify-profile-{int(time())}.folded")
+        await interaction.followup.send(f"🔥 **CPU profile**\n```\n{result.summary()[:1800]}\n```", file=file, ephemeral=True)
+
+    @discord.app_commands.command(name="history", description="Shows what has been played in this server.")
+    @discord.app_commands.describe(view="Recently played tracks or this week's most played")
+    @discord.app_commands.choices(view=[
+        discord.app_commands.Choice(name="Recently played", value="recent"),
+        discord.app_commands.Choice(name="Most played this week", value="top"),
+    ])
+    async def history_command(self, interaction: discord.Interaction, view: str = "recent"):
+        """Lists recent or most played tracks from the play history store."""
+        if view == "top":
+            entries = await history_store.most_played(interaction.guild_id)
+            title = "🏆 Most Played This Week"
+            lines = [f"`{i}.` **{escape_title(e.title)}** by `{escape_author(e.author)}` — {e.plays} plays" for i, e in enumerate(entries, 1)]
+        else:
+            entries = await history_store.recent(interaction.guild_id)
+            title = "🕘 Recently Played"
+            lines = [f"`{i}.` **{escape_title(e.title)}** by `{escape_author(e.author)}` — <t:{int(e.played_at)}:R>" for i, e in enumerate(entries, 1)]
+
+        if not entries:
+            await interaction.response.send_message("📭 Nothing has been played here yet.", ephemeral=True)
+            return
+
+        embed = discord.Embed(title=title, description="\n".join(lines), color=0x1DB954)
+        embed.set_footer(text="Use /replay <number> to play a recent track again")
+        await interaction.response.send_message(embed=fit_embed(embed))
+
+    @discord.app_commands.command(name="replay", description="Plays a recently played track again.")
+    @discord.app_commands.describe(position="Position in /history (1 = last played)")
+    @serialized
+    async def replay_command(self, interaction: discord.Interaction, position: int = 1):
+        """Re-queues a track from the play history without searching Lavalink."""
+        if rate_limiter.is_rate_limited(interaction.user.id):
+            await interaction.response.send_message("⏱️ You're sending commands too fast! Please wait a moment.", ephemeral=True)
+            return
+
+        await interaction.response.defer()  # The history read and a voice connect can outlast the 3 s deadline
+
+        entries = await history_store.recent(interaction.guild_id, limit=max(1, min(position, 25)))
+        if len(entries) < position or position < 1:
+            await interaction.followup.send("❌ There's no track at that position in the history.", ephemeral=True)
+            return
+
+        player = await self.get_player(interaction)
+        if not player:
+            return
+
+        queue_limit = get_queue_limit(get_user_tier(interaction.user.id))
+        if queue_limit is not None and len(player.queue) >= queue_limit:
+            await interaction.followup.send(f"❌ Queue is full (max {queue_limit} tracks).", ephemeral=True)
+            return
+
+        track = entries[position - 1].to_track()
+        track.extras = {'requester_id': interaction.user.id}
+        if player.playing or player.paused:
+            player.queue.put(track)
+            await interaction.followup.send(f"🔁 Queued **[{track_title(track)}]({track.uri})** again.")
+        else:
+            await player.play(track)
+            await interaction.followup.send(f"🔁 Replaying **[{track_title(track)}]({track.uri})**.")
+
+    # --- SAVED PLAYLISTS ---
+
+    playlist_group = discord.app_commands.Group(name="playlist", description="Save the queue and load it again later.")
+
+    @playlist_group.command(name="save", description="Saves the current queue (and the playing track) as a playlist.")
+    @discord.app_commands.describe(name="A name for the playlist")
+    async def playlist_save(self, interaction: discord.Interaction, name: str):
+        """Stores the queue as encoded tracks so it can be loaded without searching."""
+        if rate_limiter.is_rate_limited(interaction.user.id):
+            await interaction.response.send_message("⏱️ You're sending commands too fast! Please wait a moment.", ephemeral=True)
+            return
+
+        player: RenifyPlayer = interaction.guild.voice_client
+        tracks = ([player.current] if player and player.current else []) + (list(player.queue) if player else [])
+        if not tracks:
+            await interaction.response.send_message("📭 There's nothing queued to save.", ephemeral=True)
+            return
+
+        name = name.strip()[:PLAYLIST_NAME_LENGTH]
+        try:
+            replaced = await playlist_store.save(interaction.user.id, name, tracks)
+        except PlaylistFull:
+            await interaction.response.send_message(
+                f"❌ You can save up to {MAX_PLAYLISTS} playlists. Delete one with `/playlist delete` first.", ephemeral=True)
+            return
+        except Exception as e:
+            logger.error(f"Failed to save playlist for user {interaction.user.id}: {e}", exc_info=True)
+            await interaction.response.send_message("❌ Could not save that playlist. Please try again.", ephemeral=True)
+            return
+
+        await interaction.response.send_message(
+            f"💾 {'Updated' if replaced else 'Saved'} playlist **{name}** with **{len(tracks)}** tracks. "
+            f"Load it any time with `/playlist load`.", ephemeral=True)
+
+    @playlist_group.command(name="load", description="Queues one of your saved playlists.")
+    @discord.app_commands.describe(name="The saved playlist to load")
+    @traced("playlist load")
+    @serialized
+    async def playlist_load(self, interaction: discord.Interaction, name: str):
+        """Decodes the saved tracks locally and queues them; no Lavalink searches."""
+        if rate_limiter.is_rate_limited(interaction.user.id):
+            await interaction.response.send_message("⏱️ You're sending commands too fast! Please wait a moment.", ephemeral=True)
+            return
+
+        with span("defer"):
+            await interaction.response.defer()  # Loading, decoding and connecting can outlast the 3 s deadline
+
+        try:
+            with span("decode"):
+                saved = await playlist_store.load(interaction.user.id, name.strip())
+        except Exception as e:
+            logger.error(f"Failed to load playlist for user {interaction.user.id}: {e}", exc_info=True)
+            await interaction.followup.send("❌ Could not load that playlist. Please try again.", ephemeral=True)
+            return
+        if saved is None:
+            await interaction.followup.send(f"🧐 You don't have a playlist called **{name[:50]}**.", ephemeral=True)
+            return
+        name, to_add = saved
+        if not to_add:
+            await interaction.followup.send(f"❌ None of the tracks in **{name}** could be loaded.", ephemeral=True)
+            return
+
+        with span("get_player"):
+            player = await self.get_player(interaction)
+        if not player:
+            return
 
-**❓ Help:**
-`/help` - Show this guide
-        """
-        embed.add_field(name="📜 Commands", value=commands_text, inline=False)
-        
-        # Queue limits
         user_tier = get_user_tier(interaction.user.id)
         queue_limit = get_queue_limit(user_tier)
-        tier_emoji = {"FREE": "🆓", "PREMIUM": "⭐", "DIAMOND": "💎"}.get(user_tier, "")
-        limit_text = f"{queue_limit:,} tracks" if queue_limit else "Unlimited tracks"
-        
-        tier_info = f"""
-**Your Tier:** {tier_emoji} {user_tier}
-**Queue Limit:** {limit_text}
-**Current Plan:** Free (All users start here)
-        """
-        embed.add_field(name="💎 Your Subscription", value=tier_info, inline=False)
-        
-        # Quick start
-        quick_start = """
-1. **Join a voice channel** in this server
-2. Use `/play <song name>` to start playing music
-3. Queue up to 500 songs (your free tier limit)
-4. Enjoy! The bot will auto-disconnect when queue ends
-        """
-        embed.add_field(name="🚀 Quick Start", value=quick_start, inline=False)
-        
-        # Tips
-        tips = """
-• You can search for songs by name or paste YouTube URLs
-• Add playlists with `/play <playlist url>`
-• Queue fills up! Check `/queue` to see what's next
-• Bot needs to be in your voice channel to work
-        """
-        embed.add_field(name="💡 Tips & Tricks", value=tips, inline=False)
-        
-        embed.set_footer(text="Renify Bot v1.0 | Made with ❤️ for music lovers")
-        
-        await interaction.response.send_message(embed=embed)
+        current_queue_size = len(player.queue)
+        skipped = 0
+        if player.queue.no_duplicates:
+            to_add, skipped = player.queue.filter_new(to_add, exclude=[player.current])
+            if not to_add:
+                await interaction.followup.send(f"♻️ Every track in **{name}** is already queued.", ephemeral=True)
+                return
+
+        tier_emoji = TIER_EMOJI.get(user_tier, "")
+        if queue_limit is not None and len(to_add) + current_queue_size > queue_limit:
+            await interaction.followup.send(
+                f"❌ {tier_emoji} Your {user_tier} tier allows {queue_limit} tracks. "
+                f"Adding this playlist ({len(to_add)} tracks) would exceed the limit. "
+                f"Upgrade to increase your limit!",
+                ephemeral=True
+            )
+            return
+
+        for track in to_add:
+            track.extras = {'requester_id': interaction.user.id}
+        player.queue.put(to_add)
+        if not player.playing and not player.paused:
+            with span("play"):
+                await player.play(player.queue.get())
+
+        await interaction.followup.send(
+            f"{tier_emoji} 💾 Loaded **{len(to_add)}** tracks from your playlist **{name}**. "
+            + (f"Skipped {skipped} already queued. " if skipped else "")
+            + f"({current_queue_size}/{queue_limit if queue_limit else '∞'} in queue)"
+        )
+        logger.info(f"Loaded saved playlist with {len(to_add)} tracks for {user_tier} tier user")
+
+    @playlist_group.command(name="list", description="Lists your saved playlists.")
+    async def playlist_list(self, interaction: discord.Interaction):
+        """Shows the caller's saved playlists."""
+        try:
+            saved = await playlist_store.saved(interaction.user.id)
+        except Exception as e:
+            logger.error(f"Failed to list playlists for user {interaction.user.id}: {e}", exc_info=True)
+            await interaction.response.send_message("❌ Could not read your playlists. Please try again.", ephemeral=True)
+            return
+        if not saved:
+            await interaction.response.send_message("📭 You haven't saved any playlists yet. Try `/playlist save`.", ephemeral=True)
+            return
+
+        lines = [f"`{i}.` **{p.name}** — {p.tracks} tracks, {p.length // 60000} min · saved <t:{int(p.saved_at)}:R>"
+                 for i, p in enumerate(saved, 1)]
+        embed = discord.Embed(title="💾 Your Playlists", description="\n".join(lines), color=0x1DB954)
+        embed.set_footer(text=f"{len(saved)}/{MAX_PLAYLISTS} saved · /playlist load <name> to queue one")
+        await interaction.response.send_message(embed=fit_embed(embed), ephemeral=True)
+
+    @playlist_group.command(name="delete", description="Deletes one of your saved playlists.")
+    @discord.app_commands.describe(name="The saved playlist to delete")
+    async def playlist_delete(self, interaction: discord.Interaction, name: str):
+        """Removes a saved playlist."""
+        try:
+            deleted = await playlist_store.delete(interaction.user.id, name.strip())
+        except Exception as e:
+            logger.error(f"Failed to delete playlist for user {interaction.user.id}: {e}", exc_info=True)
+            await interaction.response.send_message("❌ Could not delete that playlist. Please try again.", ephemeral=True)
+            return
+        if deleted:
+            await interaction.response.send_message(f"🗑️ Deleted playlist **{name[:50]}**.", ephemeral=True)
+        else:
+            await interaction.response.send_message(f"🧐 You don't have a playlist called **{name[:50]}**.", ephemeral=True)
+
+    @playlist_load.autocomplete('name')
+    @playlist_delete.autocomplete('name')
+    async def playlist_autocomplete(self, interaction: discord.Interaction, current: str) -> list[discord.app_commands.Choice[str]]:
+        """Suggest the caller's own saved playlist names."""
+        try:
+            saved = await playlist_store.saved(interaction.user.id)
+        except Exception:
+            return []
+        current = current.lower()
+        return [
+            discord.app_commands.Choice(name=p.name, value=p.name)
+            for p in saved if current in p.name.lower()
+        ][:25]
+
+    @discord.app_commands.command(name="help", description="Shows a helpful guide for using Renify Bot.")
+    async def help_command(self, interaction: discord.Interaction):
+        """Shows help information for first-time users."""
+        user_tier = get_user_tier(interaction.user.id)
+        await interaction.response.send_message(embed=help_embeds.get(user_tier, get_queue_limit(user_tier)))
 
     @discord.app_commands.command(name="queue", description="Shows the current music queue.")
-    async def queue_command(self, interaction: discord.Interaction):
-        """Shows the current music queue."""
+    @discord.app_commands.describe(page="Page of the queue to show")
+    async def queue_command(self, interaction: discord.Interaction, page: int = 1):
+        """Shows one page of the current music queue."""
         player = await self.get_player(interaction)
         if not player:
             return
 
         if not player.queue.is_empty:
-            queue_list = "\n".join(
-                [
-                    f"**{i+1}.** [{track.title}]({track.uri}) by `{track.author}`"
-                    for i, track in enumerate(player.queue)
-                ]
-            )
-            
-            queue_embed = discord.Embed(
-                title="📜 Current Queue",
-                description=queue_list,
-                color=0x1DB954
-            )
-            
-            # Add currently playing track to the embed header
-            if player.current:
-                queue_embed.set_author(name=f"Currently Playing: {player.current.title}", url=player.current.uri)
-            
-            await interaction.response.send_message(embed=queue_embed)
+            await interaction.response.send_message(embed=queue_embed(player, page))
         else:
             await interaction.response.send_message("The queue is empty. Use `/play` to add some tracks!", ephemeral=True)
 
+    @discord.app_commands.command(name="remove", description="Removes a track, or a range of tracks, from the queue.")
+    @discord.app_commands.describe(position="Queue position to remove (1 = next up)", to="Also remove everything up to this position")
+    @dj_or_permissions(manage_messages=True)
+    @serialized
+    async def remove_command(self, interaction: discord.Interaction, position: int, to: int | None = None):
+        """Removes one track or positions position..to (inclusive) from the queue."""
+        player = await self.get_player(interaction)
+        if not player:
+            return
+
+        last = to if to is not None else position
+        if not 1 <= position <= last <= len(player.queue):
+            await interaction.response.send_message(f"❌ Pick positions between 1 and {len(player.queue)}.", ephemeral=True)
+            return
+
+        if last == position:
+            track = player.queue[position - 1]
+            player.queue.delete(position - 1)
+            await interaction.response.send_message(f"🗑️ Removed **{track_title(track)}** from the queue.")
+        else:
+            removed = player.queue.remove_range(position - 1, last)
+            await interaction.response.send_message(f"🗑️ Removed **{removed}** tracks (positions {position}–{last}) from the queue.")
+        logger.info(f"User {interaction.user.name} removed queue positions {position}-{last}")
+
+    @discord.app_commands.command(name="move", description="Moves a track to a different position in the queue.")
+    @discord.app_commands.describe(position="Current queue position of the track", to="New queue position")
+    @dj_or_permissions(manage_messages=True)
+    @serialized
+    async def move_command(self, interaction: discord.Interaction, position: int, to: int):
+        """Moves a queued track from one position to another."""
+        player = await self.get_player(interaction)
+        if not player:
+            return
+
+        size = len(player.queue)
+        if not (1 <= position <= size and 1 <= to <= size):
+            await interaction.response.send_message(f"❌ Pick positions between 1 and {size}.", ephemeral=True)
+            return
+
+        track = player.queue.move(position - 1, to - 1)
+        await interaction.response.send_message(f"↕️ Moved **{track_title(track)}** to position **{to}**.")
+
+    @discord.app_commands.command(name="skipto", description="Skips ahead to a position in the queue.")
+    @discord.app_commands.describe(position="Queue position to jump to (tracks before it are dropped)")
+    @dj_or_permissions(manage_messages=True)
+    @serialized
+    async def skipto_command(self, interaction: discord.Interaction, position: int):
+        """Drops everything before a queue position and plays that track now."""
+        player = await self.get_player(interaction)
+        if not player:
+            return
+
+        if not 1 <= position <= len(player.queue):
+            await interaction.response.send_message(f"❌ Pick a position between 1 and {len(player.queue)}.", ephemeral=True)
+            return
+
+        track = player.queue.skip_to(position - 1)
+        await player.play(track)
+        await interaction.response.send_message(f"⏭️ Skipped to **{track_title(track)}** ({position - 1} tracks dropped).")
+        logger.info(f"User {interaction.user.name} skipped to queue position {position}")
+
+    @discord.app_commands.command(name="fairqueue", description="Takes turns between requesters instead of first come, first served.")
+    @discord.app_commands.describe(enabled="Interleave tracks round-robin by requester (weighted by tier)")
+    @discord.app_commands.checks.has_permissions(manage_guild=True)
+    @serialized
+    async def fairqueue_command(self, interaction: discord.Interaction, enabled: bool):
+        """Switches the player's queue between fair (round-robin) and first-in-first-out order."""
+        player = await self.get_player(interaction)
+        if not player:
+            return
+
+        player.queue.set_fair(enabled)
+        await guild_settings.update(interaction.guild_id, fair_queue=enabled)
+        if enabled:
+            await interaction.response.send_message(
+                f"⚖️ Fair queue on: requesters now take turns ({len(player.queue)} queued tracks re-ordered).")
+        else:
+            await interaction.response.send_message("➡️ Fair queue off: new tracks go to the end of the queue.")
+        logger.info(f"User {interaction.user.name} set fair queue to {enabled} in guild {interaction.guild_id}")
+
+    @discord.app_commands.command(name="nodupes", description="Skips tracks that are already in the queue.")
+    @discord.app_commands.describe(enabled="Ignore songs and playlist entries that are already queued or playing")
+    @discord.app_commands.checks.has_permissions(manage_guild=True)
+    @serialized
+    async def nodupes_command(self, interaction: discord.Interaction, enabled: bool):
+        """Turns the no-duplicates policy on or off for this player."""
+        player = await self.get_player(interaction)
+        if not player:
+            return
+
+        player.queue.no_duplicates = enabled
+        await guild_settings.update(interaction.guild_id, no_duplicates=enabled)
+        if enabled:
+            await interaction.response.send_message("♻️ Duplicates off: tracks already in the queue will be skipped.")
+        else:
+            await interaction.response.send_message("➕ Duplicates allowed again.")
+
+    @discord.app_commands.command(name="autoplay", description="Keeps the music going with related tracks when the queue runs out.")
+    @discord.app_commands.describe(enabled="Play what this server's listeners usually play next once the queue is empty")
+    @discord.app_commands.checks.has_permissions(manage_guild=True)
+    @serialized
+    async def autoplay_command(self, interaction: discord.Interaction, enabled: bool):
+        """Turns co-occurrence autoplay on or off for this player."""
+        player = await self.get_player(interaction)
+        if not player:
+            return
+
+        player.autoplay_next = enabled
+        await guild_settings.update(interaction.guild_id, autoplay=enabled)
+        if enabled:
+            await interaction.response.send_message("🔮 Autoplay on: I'll keep playing related tracks when the queue runs out.")
+        else:
+            await interaction.response.send_message("⏹️ Autoplay off: playback stops when the queue runs out.")
+
+    @discord.app_commands.command(name="settings", description="Shows or changes this server's music settings.")
+    @discord.app_commands.describe(
+        home_channel="Text channel for 'Now Playing' messages",
+        dj_role="Members with this role can use the control commands",
+        volume=f"Volume the bot joins with (1-{MAX_VOLUME})",
+        clear="Forget the home channel or DJ role",
+    )
+    @discord.app_commands.choices(clear=[
+        discord.app_commands.Choice(name="Home channel", value="home_channel_id"),
+        discord.app_commands.Choice(name="DJ role", value="dj_role_id"),
+    ])
+    @discord.app_commands.checks.has_permissions(manage_guild=True)
+    async def settings_command(self, interaction: discord.Interaction,
+                               home_channel: discord.TextChannel | None = None, dj_role: discord.Role | None = None,
+                               volume: discord.app_commands.Range[int, 1, MAX_VOLUME] | None = None,
+                               clear: str | None = None):
+        """Updates the guild settings (saved in the background) and shows them."""
+        changes = {}
+        if home_channel is not None:
+            changes['home_channel_id'] = home_channel.id
+        if dj_role is not None:
+            changes['dj_role_id'] = dj_role.id
+        if volume is not None:
+            changes['volume'] = volume
+        if clear:
+            changes[clear] = None
+        if changes:
+            settings = await guild_settings.update(interaction.guild_id, **changes)
+            logger.info(f"User {interaction.user.name} changed {', '.join(changes)} in guild {interaction.guild_id}")
+        else:
+            settings = await guild_settings.get(interaction.guild_id)
+
+        embed = discord.Embed(title="⚙️ Server Settings", color=discord.Color.blurple())
+        embed.add_field(name="🏠 Home channel",
+                        value=f"<#{settings.home_channel_id}>" if settings.home_channel_id else "Where /play is used", inline=True)
+        embed.add_field(name="🎧 DJ role",
+                        value=f"<@&{settings.dj_role_id}>" if settings.dj_role_id else "None", inline=True)
+        embed.add_field(name="🔊 Volume", value=f"{settings.volume}%", inline=True)
+        embed.add_field(name="📜 Queue", value=f"Fair queue {'on' if settings.fair_queue else 'off'} • "
+                        f"Duplicates {'skipped' if settings.no_duplicates else 'allowed'} • "
+                        f"Autoplay {'on' if settings.autoplay else 'off'}", inline=False)
+        if changes:
+            embed.set_footer(text="Home channel and volume changes apply the next time I join a voice channel.")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @discord.app_commands.command(name="shuffle", description="Shuffles the queue.")
+    @dj_or_permissions(manage_messages=True)
+    @serialized
+    async def shuffle_command(self, interaction: discord.Interaction):
+        """Shuffles the upcoming tracks."""
+        player = await self.get_player(interaction)
+        if not player:
+            return
+
+        if len(player.queue) < 2:
+            await interaction.response.send_message("Not enough tracks in the queue to shuffle.", ephemeral=True)
+            return
+
+        player.queue.shuffle()
+        await interaction.response.send_message(f"🔀 Shuffled **{len(player.queue)}** tracks.")
+
 # --- BOT RUNNING ---
 async def main():
     """Main function to run the bot."""
@@ -534,9 +1238,11 @@ if __name__ == "__main__":
     # Use asyncio.run for a cleaner shutdown
     import asyncio
     try:
-        asyncio.run(main())
+        # Runs on uvloop with orjson when RENIFY_SPEEDUPS=true and they are installed
+        run_with_speedups(main())
     except KeyboardInterrupt:
         logger.info("Bot shutting down...")
         print("\n👋 Renify shutting down...")
-
-        
\ No newline at end of file
+    finally:
+        history_store.close()
+        guild_settings.close()
@@ -0,0 +1,132 @@
+"""
+Renify – Hedged text searches for tail-latency control.
+
+A plain-text search goes to its primary source first. If no answer arrives
+within the recent ``HEDGE_PERCENTILE`` latency of that source, the same
+query is also sent to a secondary source (``HEDGE_SOURCE``), or to another
+Lavalink node when no secondary source is configured. The first non-empty
+result wins and the other request is cancelled. Fired and won hedges and
+the current hedge delay are exported through ``renify_metrics``. A hedge
+needs a search slot of its own; when admission control has none free it is
+skipped rather than adding load to an already busy node.
+"""
+import asyncio
+import logging
+import os
+from collections import deque
+from time import perf_counter
+
+import wavelink
+
+from renify_admission import search_admission
+from renify_metrics import metrics
+
+logger = logging.getLogger('RenifyBot.hedge')
+
+# --- CONFIGURATION ---
+HEDGE_ENABLED = os.getenv("RENIFY_HEDGE", "false").lower() in ("1", "true", "yes")
+HEDGE_SOURCE = os.getenv("RENIFY_HEDGE_SOURCE", "scsearch")      # Empty = same source on another Lavalink node
+HEDGE_PERCENTILE = float(os.getenv("RENIFY_HEDGE_PERCENTILE", 95))
+INITIAL_DELAY = 1.0   # Seconds, used until enough primary latencies have been seen
+MIN_DELAY = 0.25      # Never hedge sooner than this, even when the primary is usually fast
+MIN_SAMPLES = 20
+SAMPLE_WINDOW = 500
+
+
+class HedgedSearch:
+    """Sends a backup search when the primary is slower than its recent percentile."""
+
+    def __init__(self, enabled: bool = HEDGE_ENABLED, hedge_source: str = HEDGE_SOURCE,
+                 percentile: float = HEDGE_PERCENTILE, admission=search_admission):
+        self.enabled = enabled
+        self.admission = admission
+        self.hedge_source = hedge_source
+        self.percentile = percentile
+        self.samples: deque[float] = deque(maxlen=SAMPLE_WINDOW)
+        self._hedges = metrics.counter('renify_search_hedges_total', "Hedged searches by outcome (fired, won, skipped)")
+        self._delay = metrics.gauge('renify_search_hedge_delay_seconds', "Current delay before a search is hedged")
+
+    @property
+    def fired(self) -> int:
+        return int(self._hedges.get(outcome='fired'))
+
+    @property
+    def won(self) -> int:
+        return int(self._hedges.get(outcome='won'))
+
+    @property
+    def skipped(self) -> int:
+        return int(self._hedges.get(outcome='skipped'))
+
+    def delay(self) -> float:
+        """The primary source's recent latency at ``percentile``, floored at MIN_DELAY."""
+        if len(self.samples) < MIN_SAMPLES:
+            return INITIAL_DELAY
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(len(ordered) * self.percentile / 100))
+        return max(MIN_DELAY, ordered[index])
+
+    def _plan(self, source: str) -> tuple | None:
+        """Return (primary_node, hedge_source, hedge_node), or None if there is nothing different to hedge to."""
+        if self.hedge_source and self.hedge_source != source:
+            return None, self.hedge_source, None
+        nodes = [n for n in wavelink.Pool.nodes.values() if n.status is wavelink.NodeStatus.CONNECTED]
+        if len(nodes) < 2:
+            return None
+        primary = wavelink.Pool.get_node()
+        return primary, source, next(n for n in nodes if n is not primary)
+
+    async def search(self, query: str, source: str) -> wavelink.Search:
+        plan = self._plan(source) if self.enabled else None
+        if plan is None:
+            return await wavelink.Playable.search(query, source=source)
+        primary_node, hedge_source, hedge_node = plan
+
+        start = perf_counter()
+        delay = self.delay()
+        self._delay.set(delay)
+        primary = asyncio.create_task(wavelink.Playable.search(query, source=source, node=primary_node))
+        tasks = {primary}
+        hedge_slot = False
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                self.samples.append(perf_counter() - start)
+                return primary.result()
+
+            # The caller holds one slot for the primary; the hedge needs its own or it doesn't run
+            hedge_slot = self.admission.try_acquire()
+            if not hedge_slot:
+                self._hedges.inc(outcome='skipped')
+                await asyncio.wait(tasks)
+                self.samples.append(perf_counter() - start)
+                return primary.result()
+
+            self._hedges.inc(outcome='fired')
+            logger.info(f"Hedging search after {delay * 1000:.0f} ms ({source} -> {hedge_source})")
+            hedge = asyncio.create_task(wavelink.Playable.search(query, source=hedge_source, node=hedge_node))
+            tasks.add(hedge)
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                if primary in done:
+                    self.samples.append(perf_counter() - start)
+                for task in done:
+                    if task.exception() is None and task.result():
+                        if task is hedge:
+                            self._hedges.inc(outcome='won')
+                        return task.result()
+            # Neither produced tracks: report the primary's outcome
+            return primary.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    if task is primary:
+                        # Slower than the hedge; still counts towards the primary's latency percentile
+                        self.samples.append(perf_counter() - start)
+                    task.cancel()
+            if hedge_slot:
+                self.admission.release()
+
+
+hedged_search = HedgedSearch()
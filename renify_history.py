@@ -0,0 +1,286 @@
+"""
+Renify – Per-guild play history stored in a local SQLite database.
+
+Every track that starts is queued in memory and written in batches from a
+background thread, so the event loop never waits on disk. Plays are indexed by
+guild, user and track; a per-day rollup answers "most played this week"
+without scanning raw plays. Old plays are dropped after a retention window
+and the file is compacted periodically.
+"""
+import asyncio
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+from time import time
+
+import wavelink
+
+logger = logging.getLogger('RenifyBot.history')
+
+# --- CONFIGURATION ---
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///renify.db")  # Empty = history disabled
+RETENTION_DAYS = int(os.getenv("RENIFY_HISTORY_RETENTION_DAYS", 90))
+COMPACT_INTERVAL = 6 * 3600
+BATCH_SIZE = 512
+DELETE_CHUNK = 10_000
+DAY = 86400
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracks (
+    track_id   INTEGER PRIMARY KEY,
+    source     TEXT NOT NULL,
+    identifier TEXT NOT NULL,
+    title      TEXT NOT NULL,
+    author     TEXT NOT NULL,
+    uri        TEXT,
+    length     INTEGER NOT NULL,
+    payload    TEXT NOT NULL,
+    UNIQUE (source, identifier)
+);
+CREATE TABLE IF NOT EXISTS plays (
+    guild_id  INTEGER NOT NULL,
+    user_id   INTEGER,
+    track_id  INTEGER NOT NULL REFERENCES tracks (track_id),
+    played_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS plays_by_guild ON plays (guild_id, played_at);
+CREATE INDEX IF NOT EXISTS plays_by_user ON plays (user_id, played_at);
+CREATE INDEX IF NOT EXISTS plays_by_track ON plays (track_id, guild_id, played_at);
+CREATE INDEX IF NOT EXISTS plays_by_time ON plays (played_at);
+CREATE TABLE IF NOT EXISTS daily_plays (
+    guild_id INTEGER NOT NULL,
+    day      INTEGER NOT NULL,
+    track_id INTEGER NOT NULL,
+    plays    INTEGER NOT NULL,
+    PRIMARY KEY (guild_id, day, track_id)
+) WITHOUT ROWID;
+"""
+
+
+def sqlite_path(url: str) -> str | None:
+    """Turn ``sqlite:///relative.db`` / ``sqlite:////abs/path.db`` into a file path."""
+    if not url:
+        return None
+    if not url.startswith("sqlite:///"):
+        logger.error(f"Unsupported DATABASE_URL {url.split(':', 1)[0]}://...; play history is disabled")
+        return None
+    return url[len("sqlite:///"):]
+
+
+class HistoryEntry:
+    """One play as returned by lookups."""
+    __slots__ = ('title', 'author', 'uri', 'length', 'payload', 'user_id', 'played_at', 'plays')
+
+    def __init__(self, title, author, uri, length, payload, user_id=None, played_at=None, plays=1):
+        self.title = title
+        self.author = author
+        self.uri = uri
+        self.length = length
+        self.payload = payload
+        self.user_id = user_id
+        self.played_at = played_at
+        self.plays = plays
+
+    def to_track(self) -> wavelink.Playable:
+        return wavelink.Playable(json.loads(self.payload))
+
+
+class HistoryStore:
+    """Batched, off-loop writer plus thread-pooled indexed readers."""
+
+    def __init__(self, url: str = DATABASE_URL, retention_days: int = RETENTION_DAYS):
+        self.path = sqlite_path(url)
+        self.enabled = self.path is not None
+        self.retention = retention_days * DAY
+        self.last_compact = time()
+        self._writes: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer: threading.Thread | None = None
+        self._local = threading.local()
+        self._schema_ready = threading.Event()
+
+    # --- WRITES ---
+
+    def record(self, guild_id: int, track: wavelink.Playable, user_id: int | None = None, at: float | None = None):
+        """Queue a play; returns immediately."""
+        if not self.enabled:
+            return
+        info = (track.source, track.identifier, track.title, track.author, track.uri, track.length,
+                json.dumps(track.raw_data, separators=(',', ':')))
+        self._ensure_writer()
+        self._writes.put((guild_id, user_id, at or time(), info))
+
+    def close(self, timeout: float = 5.0):
+        """Flush pending writes and stop the writer thread."""
+        if self._writer is not None and self._writer.is_alive():
+            self._writes.put(None)
+            self._writer.join(timeout)
+
+    def _ensure_writer(self):
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(target=self._write_loop, name='renify-history-writer', daemon=True)
+            self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        # auto_vacuum only takes effect on a fresh database, so it must come before anything is written
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _init_schema(self, conn: sqlite3.Connection):
+        conn.executescript(SCHEMA)
+        self._schema_ready.set()
+
+    def _write_loop(self):
+        try:
+            conn = self._connect()
+            self._init_schema(conn)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to open play history at {self.path}: {e}")
+            self.enabled = False
+            self._schema_ready.set()
+            return
+
+        while True:
+            batch = [self._writes.get()]
+            while not self._writes.empty() and len(batch) < BATCH_SIZE:
+                batch.append(self._writes.get())
+            stop = None in batch
+            batch = [item for item in batch if item is not None]
+            try:
+                if batch:
+                    self._write_batch(conn, batch)
+                if time() - self.last_compact >= COMPACT_INTERVAL:
+                    self.compact(conn)
+            except sqlite3.Error as e:
+                logger.error(f"Failed to write {len(batch)} plays to history: {e}")
+            if stop:
+                conn.close()
+                return
+
+    def _write_batch(self, conn: sqlite3.Connection, batch: list[tuple]):
+        with conn:
+            track_ids: dict[tuple, int] = {}
+            for _, _, _, info in batch:
+                key = info[:2]
+                if key in track_ids:
+                    continue
+                row = conn.execute(
+                    "INSERT INTO tracks (source, identifier, title, author, uri, length, payload) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (source, identifier) DO UPDATE SET title = excluded.title, author = excluded.author, "
+                    "uri = excluded.uri, length = excluded.length, payload = excluded.payload "
+                    "RETURNING track_id", info).fetchone()
+                track_ids[key] = row[0]
+
+            conn.executemany(
+                "INSERT INTO plays (guild_id, user_id, track_id, played_at) VALUES (?, ?, ?, ?)",
+                [(guild_id, user_id, track_ids[info[:2]], at) for guild_id, user_id, at, info in batch])
+            conn.executemany(
+                "INSERT INTO daily_plays (guild_id, day, track_id, plays) VALUES (?, ?, ?, 1) "
+                "ON CONFLICT (guild_id, day, track_id) DO UPDATE SET plays = plays + 1",
+                [(guild_id, int(at // DAY), track_ids[info[:2]]) for guild_id, user_id, at, info in batch])
+
+    # --- RETENTION ---
+
+    def compact(self, conn: sqlite3.Connection, now: float | None = None):
+        """Drop plays older than the retention window and give the space back."""
+        now = now or time()
+        self.last_compact = now
+        cutoff = now - self.retention
+        removed = 0
+        # Delete in chunks so readers and the next batch aren't locked out for long
+        while True:
+            with conn:
+                count = conn.execute(
+                    "DELETE FROM plays WHERE rowid IN "
+                    "(SELECT rowid FROM plays WHERE played_at < ? LIMIT ?)", (cutoff, DELETE_CHUNK)).rowcount
+            removed += count
+            if count < DELETE_CHUNK:
+                break
+        with conn:
+            conn.execute("DELETE FROM daily_plays WHERE day < ?", (int(cutoff // DAY),))
+            conn.execute("DELETE FROM tracks WHERE NOT EXISTS "
+                         "(SELECT 1 FROM plays WHERE plays.track_id = tracks.track_id)")
+        conn.executescript("PRAGMA incremental_vacuum;")  # execute() would stop after freeing one page
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("PRAGMA optimize")
+        if removed:
+            logger.info(f"🧹 Compacted play history: removed {removed} plays older than {self.retention // DAY} days")
+
+    # --- READS ---
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    def _query(self, sql: str, params: tuple) -> list[tuple]:
+        if not self._schema_ready.is_set():
+            self._ensure_writer()
+            self._schema_ready.wait(5)
+        if not self.enabled:
+            return []
+        return self._reader().execute(sql, params).fetchall()
+
+    async def _fetch(self, sql: str, params: tuple) -> list[tuple]:
+        if not self.enabled:
+            return []
+        return await asyncio.to_thread(self._query, sql, params)
+
+    async def recent(self, guild_id: int, limit: int = 10) -> list[HistoryEntry]:
+        """Most recent plays in a guild, newest first."""
+        rows = await self._fetch(
+            "SELECT t.title, t.author, t.uri, t.length, t.payload, p.user_id, p.played_at "
+            "FROM plays p JOIN tracks t USING (track_id) "
+            "WHERE p.guild_id = ? ORDER BY p.played_at DESC LIMIT ?", (guild_id, limit))
+        return [HistoryEntry(*row) for row in rows]
+
+    async def recent_for_user(self, user_id: int, limit: int = 10) -> list[HistoryEntry]:
+        """Most recent plays requested by a user across all guilds."""
+        rows = await self._fetch(
+            "SELECT t.title, t.author, t.uri, t.length, t.payload, p.user_id, p.played_at "
+            "FROM plays p JOIN tracks t USING (track_id) "
+            "WHERE p.user_id = ? ORDER BY p.played_at DESC LIMIT ?", (user_id, limit))
+        return [HistoryEntry(*row) for row in rows]
+
+    async def most_played(self, guild_id: int, days: int = 7, limit: int = 10) -> list[HistoryEntry]:
+        """Top tracks in a guild over the last few days, from the per-day rollup."""
+        since = int(time() // DAY) - days + 1
+        rows = await self._fetch(
+            "SELECT t.title, t.author, t.uri, t.length, t.payload, d.total "
+            "FROM (SELECT track_id, SUM(plays) AS total FROM daily_plays "
+            "      WHERE guild_id = ? AND day >= ? GROUP BY track_id ORDER BY total DESC LIMIT ?) d "
+            "JOIN tracks t USING (track_id) ORDER BY d.total DESC", (guild_id, since, limit))
+        return [HistoryEntry(*row[:5], plays=row[5]) for row in rows]
+
+    async def last_played(self, guild_id: int, track: wavelink.Playable) -> float | None:
+        """When a track was last played in a guild, if ever."""
+        rows = await self._fetch(
+            "SELECT MAX(p.played_at) FROM plays p JOIN tracks t USING (track_id) "
+            "WHERE t.source = ? AND t.identifier = ? AND p.guild_id = ?",
+            (track.source, track.identifier, guild_id))
+        return rows[0][0] if rows else None
+
+    def _sequences(self, since: float, limit: int) -> list[tuple[int, float, dict]]:
+        rows = self._query(
+            "SELECT p.guild_id, p.played_at, t.payload FROM "
+            "(SELECT guild_id, played_at, track_id FROM plays WHERE played_at >= ? ORDER BY played_at DESC LIMIT ?) p "
+            "JOIN tracks t USING (track_id) ORDER BY p.played_at", (since, limit))
+        payloads: dict[str, dict] = {}
+        return [(guild_id, at, payloads.get(payload) or payloads.setdefault(payload, json.loads(payload)))
+                for guild_id, at, payload in rows]
+
+    async def sequences(self, days: int, limit: int = 500_000) -> list[tuple[int, float, dict]]:
+        """Recent ``(guild_id, played_at, track payload)`` rows across all guilds, oldest first."""
+        if not self.enabled:
+            return []
+        return await asyncio.to_thread(self._sequences, time() - days * DAY, limit)
+
+
+history_store = HistoryStore()
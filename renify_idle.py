@@ -0,0 +1,126 @@
+"""
+Renify – Warm voice-connection retention and idle player reaper.
+
+Stopping the music parks the player instead of disconnecting it, so a
+``/play`` shortly afterwards reuses the live voice connection and Lavalink
+player. Parked players, players whose queue ran dry and players left alone
+in a channel get a deadline; a periodic sweep pops only expired deadlines
+from a heap (at most ``REAP_BUDGET`` per tick), re-checks them and
+disconnects the ones that are still idle.
+"""
+import asyncio
+import heapq
+import logging
+import os
+from time import monotonic
+
+logger = logging.getLogger('RenifyBot.idle')
+
+# --- CONFIGURATION ---
+IDLE_GRACE = float(os.getenv("RENIFY_IDLE_GRACE", 180))                    # Seconds a stopped/finished player stays connected
+EMPTY_CHANNEL_GRACE = float(os.getenv("RENIFY_EMPTY_CHANNEL_GRACE", 60))   # Seconds before leaving a channel with no listeners
+SCAN_INTERVAL = float(os.getenv("RENIFY_IDLE_SCAN_INTERVAL", 15))
+REAP_BUDGET = 50  # Max players disconnected per sweep, so one sweep never stalls the loop
+
+STOPPED, FINISHED, EMPTY = 'stopped', 'finished', 'empty'
+
+
+def has_listeners(channel) -> bool:
+    return any(not member.bot for member in getattr(channel, 'members', ()))
+
+
+class IdleManager:
+    """Deadline heap of idle players with lazy invalidation."""
+
+    def __init__(self, grace: float = IDLE_GRACE, empty_grace: float = EMPTY_CHANNEL_GRACE, clock=monotonic):
+        self.grace = grace
+        self.empty_grace = empty_grace
+        self.clock = clock
+        self.idle: dict[int, tuple[float, str, object]] = {}  # guild_id -> (deadline, reason, player)
+        self._heap: list[tuple[float, int]] = []
+        self._task: asyncio.Task | None = None
+        self.reaped = 0
+
+    def __len__(self) -> int:
+        return len(self.idle)
+
+    def mark_idle(self, player, reason: str = FINISHED):
+        """Give a player a deadline; it is disconnected if still idle when the deadline passes."""
+        guild_id = player.guild.id
+        current = self.idle.get(guild_id)
+        if current is not None and current[1] == STOPPED and reason != EMPTY:
+            return  # A parked player keeps its original deadline
+        deadline = self.clock() + (self.empty_grace if reason == EMPTY else self.grace)
+        if current is not None and current[0] <= deadline and reason != STOPPED:
+            return
+        self.idle[guild_id] = (deadline, reason, player)
+        heapq.heappush(self._heap, (deadline, guild_id))
+        if len(self._heap) > 2 * len(self.idle) + 64:
+            # Drop superseded entries so repeated marks can't grow the heap without bound
+            self._heap = list({(d, g) for d, g in self._heap if self.idle.get(g, (None,))[0] == d})
+            heapq.heapify(self._heap)
+
+    def mark_active(self, guild_id: int, reason: str | None = None):
+        """Clear a guild's deadline (only if it was set for ``reason``, when given)."""
+        current = self.idle.get(guild_id)
+        if current is not None and (reason is None or current[1] == reason):
+            del self.idle[guild_id]
+
+    def is_parked(self, guild_id: int) -> bool:
+        """Whether the guild's player was stopped or ran out of tracks, so it can be reused elsewhere.
+
+        A player that is only waiting out an empty channel may still hold a paused queue, so it doesn't count.
+        """
+        current = self.idle.get(guild_id)
+        return current is not None and current[1] in (STOPPED, FINISHED)
+
+    async def park(self, player):
+        """Stop playback and clear the queue but stay connected for the grace period."""
+        player.queue.clear()
+        await player.stop()
+        self.mark_idle(player, STOPPED)
+
+    async def reap(self) -> int:
+        """Disconnect players whose deadline has passed; returns how many were disconnected."""
+        now = self.clock()
+        reaped = 0
+        while self._heap and self._heap[0][0] <= now and reaped < REAP_BUDGET:
+            deadline, guild_id = heapq.heappop(self._heap)
+            current = self.idle.get(guild_id)
+            if current is None or current[0] != deadline:
+                continue  # Superseded or cleared
+            del self.idle[guild_id]
+            _, reason, player = current
+
+            if not getattr(player, 'connected', False):
+                continue
+            if reason == EMPTY:
+                if has_listeners(player.channel):
+                    continue
+            elif player.playing or (reason == FINISHED and player.queue):
+                continue
+
+            try:
+                await player.disconnect()
+                reaped += 1
+                logger.info(f"💤 Disconnected idle player in guild {guild_id} ({reason})")
+            except Exception as e:
+                logger.error(f"Failed to disconnect idle player in guild {guild_id}: {e}")
+        self.reaped += reaped
+        return reaped
+
+    def start(self, interval: float = SCAN_INTERVAL):
+        """Start the periodic sweep on the running loop (idempotent)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(interval))
+
+    async def _run(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reap()
+            except Exception as e:
+                logger.error(f"Idle sweep failed: {e}", exc_info=True)
+
+
+idle_manager = IdleManager()
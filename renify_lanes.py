@@ -0,0 +1,128 @@
+"""
+Renify – Per-guild serialized command lanes with bounded mailboxes.
+
+Commands that touch a guild's player take a numbered turn in that guild's
+lane when they arrive and run their state-changing part only after every
+earlier turn has finished, so concurrent ``/play`` calls can no longer race
+on the tier-limit check or on who starts playback. Slow work (e.g. a Lavalink
+search) may happen before waiting for the turn, so searches still overlap
+while queue mutations stay in arrival order. Different guilds never wait on
+each other. Each lane holds at most ``LANE_CAPACITY`` turns; beyond that, or
+after waiting ``LANE_WAIT_TIMEOUT`` seconds, the command gets a busy reply.
+"""
+import asyncio
+import functools
+import logging
+import os
+
+import discord
+
+logger = logging.getLogger('RenifyBot.lanes')
+
+# --- CONFIGURATION ---
+LANE_CAPACITY = int(os.getenv("RENIFY_LANE_CAPACITY", 8))                 # Pending commands per guild
+LANE_WAIT_TIMEOUT = float(os.getenv("RENIFY_LANE_WAIT_TIMEOUT", 2.0))     # Seconds; Discord expects a reply within 3
+DEFERRED_WAIT_TIMEOUT = 30.0  # Deferred interactions (e.g. /play) may wait longer for their turn
+
+BUSY_MESSAGE = "⏳ I'm still working through earlier commands in this server. Please try again in a moment."
+
+
+class LaneBusy(Exception):
+    """The guild's mailbox is full or the turn did not come up in time."""
+
+
+class Turn:
+    """One reserved slot in a guild lane; use as ``async with`` and call ``wait()`` before mutating state."""
+
+    def __init__(self, lanes: 'GuildLanes', guild_id: int, previous: asyncio.Future | None):
+        self.lanes = lanes
+        self.guild_id = guild_id
+        self.previous = previous
+        self.done: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    async def wait(self, timeout: float | None = LANE_WAIT_TIMEOUT):
+        """Wait until every earlier command in this guild has finished."""
+        if self.previous is None or self.previous.done():
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(self.previous), timeout)
+        except asyncio.TimeoutError:
+            raise LaneBusy(f"guild {self.guild_id} lane did not clear within {timeout}s") from None
+
+    async def __aenter__(self) -> 'Turn':
+        return self
+
+    async def __aexit__(self, *exc):
+        # Hand over only once everything before us is done, even if we bailed out early
+        if self.previous is None or self.previous.done():
+            self._finish()
+        else:
+            self.previous.add_done_callback(lambda _: self._finish())
+
+    def _finish(self):
+        if not self.done.done():
+            self.done.set_result(None)
+        self.lanes._release(self.guild_id, self)
+
+
+class GuildLanes:
+    """Per-guild FIFO of turns; a lane exists only while it has pending turns."""
+
+    def __init__(self, capacity: int = LANE_CAPACITY):
+        self.capacity = capacity
+        self._tails: dict[int, Turn] = {}
+        self._pending: dict[int, int] = {}
+        self.rejected = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def pending(self, guild_id: int) -> int:
+        return self._pending.get(guild_id, 0)
+
+    def reserve(self, guild_id: int) -> Turn:
+        """Take the next turn in a guild's lane, or raise LaneBusy if its mailbox is full."""
+        pending = self._pending.get(guild_id, 0)
+        if pending >= self.capacity:
+            self.rejected += 1
+            raise LaneBusy(f"guild {guild_id} has {pending} pending commands")
+        tail = self._tails.get(guild_id)
+        turn = Turn(self, guild_id, tail.done if tail else None)
+        self._tails[guild_id] = turn
+        self._pending[guild_id] = pending + 1
+        return turn
+
+    def _release(self, guild_id: int, turn: Turn):
+        remaining = self._pending.get(guild_id, 1) - 1
+        if remaining:
+            self._pending[guild_id] = remaining
+        else:
+            self._pending.pop(guild_id, None)
+        if self._tails.get(guild_id) is turn:
+            del self._tails[guild_id]
+
+
+async def send_busy(interaction: discord.Interaction):
+    if interaction.response.is_done():
+        await interaction.followup.send(BUSY_MESSAGE, ephemeral=True)
+    else:
+        await interaction.response.send_message(BUSY_MESSAGE, ephemeral=True)
+
+
+def serialized(func):
+    """Run a command or button callback ``(self, interaction, ...)`` in its guild's lane."""
+    @functools.wraps(func)
+    async def wrapper(self, interaction: discord.Interaction, *args, **kwargs):
+        if interaction.guild_id is None:
+            return await func(self, interaction, *args, **kwargs)
+        try:
+            async with guild_lanes.reserve(interaction.guild_id) as turn:
+                await turn.wait()
+                return await func(self, interaction, *args, **kwargs)
+        except LaneBusy as e:
+            logger.warning(f"Busy: {e}")
+            await send_busy(interaction)
+    return wrapper
+
+
+guild_lanes = GuildLanes()
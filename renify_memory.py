@@ -0,0 +1,146 @@
+"""
+Renify – On-demand memory diagnostics backed by tracemalloc.
+
+Nothing is traced until an admin starts it, so there is no overhead while
+it is off. Once started, snapshots report the top allocation sites or the
+growth since the previous snapshot, together with live object counts for
+the types that usually leak (players, tracks, messages) and any extra
+table sizes the caller passes in. Snapshots are taken and formatted in a
+worker thread.
+"""
+import asyncio
+import gc
+import linecache
+import logging
+import os
+import sys
+import tracemalloc
+from collections import Counter
+from time import time
+
+logger = logging.getLogger('RenifyBot.memory')
+
+# --- CONFIGURATION ---
+TRACE_FRAMES = int(os.getenv("RENIFY_TRACEMALLOC_FRAMES", 10))  # Stack depth recorded per allocation
+TOP_SITES = 25
+TOP_TYPES = 20
+
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, linecache.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def rss_bytes() -> int | None:
+    """Current resident set size (peak RSS where /proc is unavailable); None if the platform can't tell."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        pass
+    try:
+        import resource  # POSIX only
+    except ImportError:
+        try:
+            import psutil  # Optional; the only way to read RSS on Windows
+        except ImportError:
+            return None
+        return psutil.Process().memory_info().rss
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _mb(size: int) -> str:
+    return f"{size / 1024 / 1024:.1f} MB"
+
+
+def count_objects(classes: dict[str, type]) -> tuple[dict[str, int], list[tuple[str, int]]]:
+    """Live instances of each class (subclasses included) and the most common types overall."""
+    gc.collect()
+    by_type = Counter(type(obj) for obj in gc.get_objects())
+    counts = {name: sum(n for t, n in by_type.items() if issubclass(t, cls)) for name, cls in classes.items()}
+    common = [(f"{t.__module__}.{t.__qualname__}", n) for t, n in by_type.most_common(TOP_TYPES)]
+    return counts, common
+
+
+class MemoryDiagnostics:
+    """Starts/stops tracemalloc and keeps the previous snapshot for diffs."""
+
+    def __init__(self, frames: int = TRACE_FRAMES):
+        self.frames = frames
+        self.previous: tracemalloc.Snapshot | None = None
+        self.previous_at: float | None = None
+        self.started_at: float | None = None
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self) -> bool:
+        """Begin tracing; returns False if it was already running."""
+        if self.tracing:
+            return False
+        tracemalloc.start(self.frames)
+        self.started_at = time()
+        self.previous = self.previous_at = None
+        logger.info(f"🔬 tracemalloc started ({self.frames} frames)")
+        return True
+
+    def stop(self):
+        """Stop tracing and free every trace and snapshot."""
+        tracemalloc.stop()
+        self.previous = self.previous_at = self.started_at = None
+        logger.info("🔬 tracemalloc stopped")
+
+    def status(self) -> str:
+        rss = rss_bytes()
+        lines = [f"RSS: {_mb(rss) if rss is not None else 'unknown (install psutil)'}"]
+        if self.tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            lines.append(f"tracemalloc: on for {time() - self.started_at:.0f}s, traced {_mb(current)} "
+                         f"(peak {_mb(peak)}), overhead {_mb(tracemalloc.get_tracemalloc_memory())}")
+        else:
+            lines.append("tracemalloc: off")
+        return "\n".join(lines)
+
+    def _take(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(_IGNORED)
+
+    def _report(self, diff: bool, classes: dict[str, type], extra: dict[str, int]) -> str:
+        snapshot = self._take()
+        lines = [f"Renify memory report ({'diff' if diff else 'top'}) at {time():.0f}", self.status(), ""]
+
+        if diff and self.previous is not None:
+            lines.append(f"Top {TOP_SITES} allocation sites by growth since {time() - self.previous_at:.0f}s ago:")
+            for stat in snapshot.compare_to(self.previous, 'traceback')[:TOP_SITES]:
+                lines.append(f"{stat.size_diff / 1024:+10.1f} KiB {stat.count_diff:+8d} blocks "
+                             f"(now {stat.size / 1024:.1f} KiB)")
+                lines.extend(f"        {line}" for line in stat.traceback.format(limit=self.frames, most_recent_first=True))
+        else:
+            if diff:
+                lines.append("No earlier snapshot to diff against; showing top sites instead.")
+            lines.append(f"Top {TOP_SITES} allocation sites:")
+            for stat in snapshot.statistics('traceback')[:TOP_SITES]:
+                lines.append(f"{stat.size / 1024:10.1f} KiB {stat.count:8d} blocks")
+                lines.extend(f"        {line}" for line in stat.traceback.format(limit=self.frames, most_recent_first=True))
+        self.previous, self.previous_at = snapshot, time()
+
+        counts, common = count_objects(classes)
+        lines += ["", "Live objects:"]
+        lines += [f"{n:10d}  {name}" for name, n in {**counts, **extra}.items()]
+        lines += ["", "Most common types:"]
+        lines += [f"{n:10d}  {name}" for name, n in common]
+        return "\n".join(lines) + "\n"
+
+    async def report(self, diff: bool = False, classes: dict[str, type] | None = None,
+                     extra: dict[str, int] | None = None) -> str:
+        """Take a snapshot (the baseline for the next diff) and render it as text."""
+        if not self.tracing:
+            raise RuntimeError("tracemalloc is not running")
+        return await asyncio.to_thread(self._report, diff, classes or {}, extra or {})
+
+
+memory_diagnostics = MemoryDiagnostics()
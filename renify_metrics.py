@@ -0,0 +1,147 @@
+"""
+Renify – In-process metrics with a Prometheus text endpoint.
+
+Counters, gauges and histograms are plain in-memory numbers updated on the
+event loop, so recording one costs a dict lookup. When ``RENIFY_METRICS_PORT``
+is set, ``/metrics`` on that port serves them in the Prometheus text format
+(using aiohttp, which discord.py already depends on).
+"""
+import bisect
+import logging
+import os
+
+logger = logging.getLogger('RenifyBot.metrics')
+
+# --- CONFIGURATION ---
+METRICS_PORT = os.getenv("RENIFY_METRICS_PORT", "")      # Empty = no HTTP endpoint
+METRICS_HOST = os.getenv("RENIFY_METRICS_HOST", "127.0.0.1")
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key: tuple, extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in key]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        return self.values.get(_label_key(labels), 0)
+
+    def render(self) -> list[str]:
+        return [f"{self.name}{_format_labels(key)} {value}" for key, value in self.values.items()]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        self.values[_label_key(labels)] = value
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name: str, help: str, buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.values: dict[tuple, list] = {}  # key -> [per-bucket counts..., +Inf count, sum]
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        row = self.values.get(key)
+        if row is None:
+            row = self.values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        row[bisect.bisect_left(self.buckets, value)] += 1
+        row[-1] += value
+
+    def count(self, **labels) -> int:
+        row = self.values.get(_label_key(labels))
+        return sum(row[:-1]) if row else 0
+
+    def render(self) -> list[str]:
+        lines = []
+        for key, row in self.values.items():
+            cumulative = 0
+            for bound, n in zip(self.buckets + ('+Inf',), row[:-1]):
+                cumulative += n
+                le = f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {row[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Named metrics, created on first use so modules can share them without import order concerns."""
+
+    def __init__(self):
+        self.metrics: dict[str, Counter | Gauge | Histogram] = {}
+        self._runner = None
+
+    def _get(self, cls, name: str, help: str, **kwargs):
+        metric = self.metrics.get(name)
+        if metric is None:
+            metric = self.metrics[name] = cls(name, help, **kwargs)
+        return metric
+
+    def counter(self, name: str, help: str = "") -> Counter:
+        return self._get(Counter, name, help)
+
+    def gauge(self, name: str, help: str = "") -> Gauge:
+        return self._get(Gauge, name, help)
+
+    def histogram(self, name: str, help: str = "", buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, buckets=buckets)
+
+    def render(self) -> str:
+        """Prometheus text exposition format."""
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    async def serve(self, port: str = METRICS_PORT, host: str = METRICS_HOST):
+        """Start the /metrics HTTP endpoint if a port is configured (idempotent)."""
+        if not port or self._runner is not None:
+            return
+        from aiohttp import web
+
+        async def handle(request):
+            return web.Response(text=self.render(), content_type='text/plain', charset='utf-8')
+
+        app = web.Application()
+        app.router.add_get('/metrics', handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        try:
+            await web.TCPSite(self._runner, host, int(port)).start()
+        except OSError as e:
+            logger.error(f"Failed to serve metrics on {host}:{port}: {e}")
+            await self._runner.cleanup()
+            self._runner = None
+            return
+        logger.info(f"📈 Serving metrics on http://{host}:{port}/metrics")
+
+
+metrics = Registry()
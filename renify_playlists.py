@@ -0,0 +1,252 @@
+"""
+Renify – Saved playlists stored as Lavalink encoded tracks.
+
+``/playlist save`` keeps the current queue as the encoded track strings
+Lavalink already handed us, zlib-compressed into one row of the local SQLite
+database. Loading decodes Lavalink's binary track format locally, so a saved
+playlist comes back without a single search or load round trip; only tracks
+in a format this decoder doesn't know are sent to ``/v4/decodetracks``, in
+one bulk request.
+"""
+import asyncio
+import base64
+import binascii
+import logging
+import os
+import sqlite3
+import struct
+import threading
+import zlib
+from time import time
+
+import wavelink
+
+from renify_history import DATABASE_URL, sqlite_path
+
+logger = logging.getLogger('RenifyBot.playlists')
+
+# --- CONFIGURATION ---
+MAX_PLAYLISTS = int(os.getenv("RENIFY_MAX_PLAYLISTS", 25))  # Saved playlists per user
+NAME_LENGTH = 50
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS playlists (
+    user_id  INTEGER NOT NULL,
+    name     TEXT NOT NULL COLLATE NOCASE,
+    tracks   INTEGER NOT NULL,
+    length   INTEGER NOT NULL,
+    saved_at REAL NOT NULL,
+    data     BLOB NOT NULL,
+    PRIMARY KEY (user_id, name)
+);
+"""
+
+_TRACK_INFO_VERSIONED = 1
+_DECODE_ERRORS = (binascii.Error, struct.error, IndexError, UnicodeDecodeError, ValueError)
+
+
+class PlaylistFull(Exception):
+    """The user already has the maximum number of saved playlists."""
+
+
+# --- TRACK DECODING ---
+
+def _read_utf(raw: bytes, pos: int) -> tuple[str, int]:
+    """Read a Java ``DataOutput.writeUTF`` string (modified UTF-8)."""
+    size = int.from_bytes(raw[pos:pos + 2], 'big')
+    end = pos + 2 + size
+    if end > len(raw):
+        raise IndexError("string runs past the end of the track")
+    data = raw[pos + 2:end]
+    try:
+        return data.decode('utf-8'), end
+    except UnicodeDecodeError:
+        # Java writes NUL as C0 80 and characters outside the BMP as two 3-byte surrogates
+        text = data.replace(b'\xc0\x80', b'\x00').decode('utf-8', 'surrogatepass')
+        return text.encode('utf-16', 'surrogatepass').decode('utf-16'), end
+
+
+def _read_optional(raw: bytes, pos: int) -> tuple[str | None, int]:
+    if raw[pos]:
+        return _read_utf(raw, pos + 1)
+    return None, pos + 1
+
+
+def decode_track(encoded: str) -> dict | None:
+    """Decode a Lavalink encoded track into a ``/v4/decodetrack`` style payload, or None if unknown."""
+    try:
+        raw = base64.b64decode(encoded, validate=True)
+        header = int.from_bytes(raw[:4], 'big')
+        if header & 0x3FFFFFFF != len(raw) - 4:
+            return None
+        pos, version = 4, 1
+        if header >> 30 & _TRACK_INFO_VERSIONED:
+            version, pos = raw[4], 5
+        if not 1 <= version <= 3:
+            return None
+        title, pos = _read_utf(raw, pos)
+        author, pos = _read_utf(raw, pos)
+        length, = struct.unpack_from('>q', raw, pos)
+        identifier, pos = _read_utf(raw, pos + 8)
+        is_stream = raw[pos] != 0
+        uri = artwork = isrc = None
+        pos += 1
+        if version >= 2:
+            uri, pos = _read_optional(raw, pos)
+        if version >= 3:
+            artwork, pos = _read_optional(raw, pos)
+            isrc, pos = _read_optional(raw, pos)
+        source, pos = _read_utf(raw, pos)
+        # Source-specific fields sit between the source name and the position, which is always last
+        if pos + 8 > len(raw):
+            return None
+        position, = struct.unpack_from('>q', raw, len(raw) - 8)
+    except _DECODE_ERRORS:
+        return None
+
+    return {
+        'encoded': encoded,
+        'info': {
+            'identifier': identifier,
+            'isSeekable': not is_stream,
+            'author': author,
+            'length': length,
+            'isStream': is_stream,
+            'position': position,
+            'title': title,
+            'uri': uri,
+            'artworkUrl': artwork,
+            'isrc': isrc,
+            'sourceName': source,
+        },
+        'pluginInfo': {},
+        'userData': {},
+    }
+
+
+def pack(encoded: list[str]) -> bytes:
+    return zlib.compress("\n".join(encoded).encode('ascii'), 9)
+
+
+def unpack(data: bytes) -> list[str]:
+    text = zlib.decompress(data).decode('ascii')
+    return text.split("\n") if text else []
+
+
+class SavedPlaylist:
+    """A saved playlist as listed by ``/playlist list``."""
+    __slots__ = ('name', 'tracks', 'length', 'saved_at')
+
+    def __init__(self, name, tracks, length, saved_at):
+        self.name = name
+        self.tracks = tracks
+        self.length = length
+        self.saved_at = saved_at
+
+
+class PlaylistStore:
+    """Per-user saved playlists in SQLite, read and written from worker threads."""
+
+    def __init__(self, url: str = DATABASE_URL, max_playlists: int = MAX_PLAYLISTS):
+        self.path = sqlite_path(url)
+        self.enabled = self.path is not None
+        self.max_playlists = max_playlists
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    async def _run(self, func, *args):
+        if not self.enabled:
+            raise RuntimeError("saved playlists need DATABASE_URL")
+        return await asyncio.to_thread(func, *args)
+
+    # --- WRITES ---
+
+    def _save(self, user_id: int, name: str, encoded: list[str], length: int) -> bool:
+        conn = self._conn()
+        with conn:
+            exists = conn.execute("SELECT 1 FROM playlists WHERE user_id = ? AND name = ?", (user_id, name)).fetchone()
+            if not exists:
+                count = conn.execute("SELECT COUNT(*) FROM playlists WHERE user_id = ?", (user_id,)).fetchone()[0]
+                if count >= self.max_playlists:
+                    raise PlaylistFull(f"user {user_id} already has {count} playlists")
+            conn.execute(
+                "INSERT INTO playlists (user_id, name, tracks, length, saved_at, data) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (user_id, name) DO UPDATE SET name = excluded.name, tracks = excluded.tracks, "
+                "length = excluded.length, saved_at = excluded.saved_at, data = excluded.data",
+                (user_id, name, len(encoded), length, time(), pack(encoded)))
+        return bool(exists)
+
+    async def save(self, user_id: int, name: str, tracks: list[wavelink.Playable]) -> bool:
+        """Save (or overwrite) a playlist; returns True if it replaced one. Raises PlaylistFull."""
+        encoded = [track.encoded for track in tracks]
+        length = sum(track.length for track in tracks if not track.is_stream)
+        return await self._run(self._save, user_id, name[:NAME_LENGTH], encoded, length)
+
+    def _delete(self, user_id: int, name: str) -> bool:
+        conn = self._conn()
+        with conn:
+            return conn.execute("DELETE FROM playlists WHERE user_id = ? AND name = ?", (user_id, name)).rowcount > 0
+
+    async def delete(self, user_id: int, name: str) -> bool:
+        return await self._run(self._delete, user_id, name)
+
+    # --- READS ---
+
+    def _saved(self, user_id: int) -> list[SavedPlaylist]:
+        rows = self._conn().execute(
+            "SELECT name, tracks, length, saved_at FROM playlists WHERE user_id = ? ORDER BY name", (user_id,)).fetchall()
+        return [SavedPlaylist(*row) for row in rows]
+
+    async def saved(self, user_id: int) -> list[SavedPlaylist]:
+        """A user's playlists, by name."""
+        return await self._run(self._saved, user_id)
+
+    def _read(self, user_id: int, name: str) -> tuple[str, list[dict], list[str]] | None:
+        row = self._conn().execute(
+            "SELECT name, data FROM playlists WHERE user_id = ? AND name = ?", (user_id, name)).fetchone()
+        if row is None:
+            return None
+        payloads, unknown = [], []
+        for encoded in unpack(row[1]):
+            payload = decode_track(encoded)
+            if payload is None:
+                unknown.append(encoded)
+            payloads.append(payload or encoded)
+        return row[0], payloads, unknown
+
+    async def load(self, user_id: int, name: str) -> tuple[str, list[wavelink.Playable]] | None:
+        """The saved name and its tracks in order, or None if there is no such playlist."""
+        found = await self._run(self._read, user_id, name)
+        if found is None:
+            return None
+        name, payloads, unknown = found
+
+        decoded = {}
+        if unknown:
+            # One bulk request for whatever the local decoder couldn't read
+            try:
+                results = await wavelink.Pool.get_node().send("POST", path="v4/decodetracks", data=unknown)
+                decoded = {encoded: payload for encoded, payload in zip(unknown, results)}
+            except Exception as e:
+                logger.warning(f"Could not decode {len(unknown)} tracks of playlist {name!r}: {e}")
+
+        tracks = []
+        for payload in payloads:
+            if isinstance(payload, str):
+                payload = decoded.get(payload)
+                if payload is None:
+                    continue
+            tracks.append(wavelink.Playable(payload))
+        return name, tracks
+
+
+playlist_store = PlaylistStore()
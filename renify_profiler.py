@@ -0,0 +1,144 @@
+"""
+Renify – On-demand sampling CPU profiler for the live process.
+
+An admin starts a profile for a few seconds; a background thread samples
+every thread's stack with ``sys._current_frames()`` at ``PROFILE_HZ`` and
+folds identical stacks together. The result is in the collapsed-stack format
+read by flamegraph.pl, speedscope and inferno, with the event-loop thread
+labelled so coroutine hot spots (``play_command``, embed building, the
+gateway) stand out. Only one profile can run at a time and nothing is
+sampled outside a profile.
+"""
+import asyncio
+import logging
+import os
+import sys
+import threading
+from collections import Counter
+from time import perf_counter, sleep
+
+logger = logging.getLogger('RenifyBot.profiler')
+
+# --- CONFIGURATION ---
+PROFILE_HZ = int(os.getenv("RENIFY_PROFILE_HZ", 100))   # Samples per second while profiling
+MAX_SECONDS = 60
+MAX_DEPTH = 128
+SWITCH_INTERVAL = 0.0002  # GIL switch interval while sampling, restored afterwards
+IDLE_FUNCTIONS = {'select'}  # Leaf frame of an event loop waiting for I/O (selectors / proactor)
+
+
+class ProfilerBusy(Exception):
+    """A profile is already running."""
+
+
+def _label(code) -> str:
+    name = getattr(code, 'co_qualname', code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)})".replace(';', ':')
+
+
+class Profile:
+    """Folded stacks from one run."""
+
+    def __init__(self, seconds: float, hz: int):
+        self.seconds = seconds
+        self.hz = hz
+        self.samples = 0
+        self.stacks: Counter[str] = Counter()
+        self.leaves: Counter[str] = Counter()  # Event-loop self time by function
+
+    def folded(self) -> str:
+        """One ``root;caller;...;leaf count`` line per distinct stack."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def summary(self, limit: int = 10) -> str:
+        busy = sum(self.leaves.values())
+        lines = [f"{self.samples} samples over {self.seconds:.1f}s at {self.hz} Hz; "
+                 f"event loop busy in {busy * 100 // max(1, self.samples)}% of them"]
+        for label, count in self.leaves.most_common(limit):
+            lines.append(f"{count * 100 / max(1, self.samples):5.1f}%  {label}")
+        return "\n".join(lines)
+
+
+class SamplingProfiler:
+    """Samples all thread stacks from a helper thread; one run at a time."""
+
+    def __init__(self, hz: int = PROFILE_HZ):
+        self.hz = hz
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def _sample(self, seconds: float, loop_thread: int) -> Profile:
+        # The sampler needs the GIL to look at other threads; with the default 5 ms switch interval it
+        # would mostly get it while the loop is idle in select() and miss short bursts of work
+        switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(switch_interval, SWITCH_INTERVAL))
+        try:
+            return self._collect(seconds, loop_thread)
+        finally:
+            sys.setswitchinterval(switch_interval)
+
+    def _collect(self, seconds: float, loop_thread: int) -> Profile:
+        profile = Profile(seconds, self.hz)
+        me = threading.get_ident()
+        interval = 1.0 / self.hz
+        next_at = perf_counter()
+        deadline = next_at + seconds
+        while perf_counter() < deadline:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                labels = []
+                while frame is not None and len(labels) < MAX_DEPTH:
+                    labels.append(_label(frame.f_code))
+                    frame = frame.f_back
+                if not labels:
+                    continue
+                root = 'event-loop' if ident == loop_thread else names.get(ident, f"thread-{ident}").replace(';', ':')
+                labels.append(root)
+                labels.reverse()
+                profile.stacks[';'.join(labels)] += 1
+                if ident == loop_thread and labels[-1].split(' (')[0].rsplit('.', 1)[-1] not in IDLE_FUNCTIONS:
+                    profile.leaves[labels[-1]] += 1
+            profile.samples += 1
+            # Skip missed ticks instead of bursting to catch up
+            next_at = max(next_at + interval, perf_counter())
+            sleep(max(0.0, next_at - perf_counter()))
+        return profile
+
+    async def profile(self, seconds: float) -> Profile:
+        """Profile the running process for ``seconds``; raises ProfilerBusy if one is already running."""
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("a profile is already running")
+        seconds = max(1.0, min(float(seconds), MAX_SECONDS))
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+        loop_thread = threading.get_ident()
+
+        def run():
+            # The lock is held until sampling really ends, even if the awaiting command is cancelled
+            try:
+                outcome = (self._sample(seconds, loop_thread), None)
+            except Exception as e:
+                outcome = (None, e)
+            finally:
+                self._lock.release()
+            loop.call_soon_threadsafe(lambda: done.done() or done.set_result(outcome))
+
+        logger.info(f"🔥 Profiling for {seconds:.0f}s at {self.hz} Hz")
+        try:
+            # A dedicated thread so a busy executor can't delay or skew the samples
+            threading.Thread(target=run, name='renify-profiler', daemon=True).start()
+        except RuntimeError:
+            self._lock.release()
+            raise
+        profile, error = await done
+        if error is not None:
+            raise error
+        return profile
+
+
+profiler = SamplingProfiler()
@@ -0,0 +1,493 @@
+"""
+Renify – Indexable queue for very large player queues.
+
+``ChunkedList`` stores items in chunks of up to ``2 * LOAD`` and keeps a
+Fenwick tree over the chunk lengths, so positional lookup, insert and delete
+cost O(log n + chunk) instead of O(n) for a flat list. Below about 8,000
+items a flat list wins (its memmove is cheaper than the tree walk), so a list
+that fits in one chunk takes single-chunk fast paths and behaves like one.
+``RenifyQueue`` is a drop-in ``wavelink.Queue`` backed by it, adding the
+range, move, skip-to and shuffle operations behind ``/remove``, ``/move``,
+``/skipto`` and ``/shuffle``.
+
+In fair mode tracks are ordered by weighted fair queuing: each track gets a
+virtual finish tag of ``max(now, requester's last tag) + 1 / weight`` and is
+inserted at its tag's position, so requesters take turns (weighted by tier)
+and picking the next track stays a pop from the front.
+"""
+import bisect
+import os
+import random
+from collections.abc import Callable, Iterable, MutableSequence
+from itertools import chain, islice
+
+import wavelink
+
+# --- CONFIGURATION ---
+FAIR_QUEUE = os.getenv("RENIFY_FAIR_QUEUE", "false").lower() == "true"  # Default for new players
+NO_DUPLICATES = os.getenv("RENIFY_NO_DUPLICATES", "false").lower() == "true"  # Default for new players
+
+
+def requester_of(track: wavelink.Playable) -> int | None:
+    return getattr(track.extras, 'requester_id', None)
+
+
+def _fair_tag(track: wavelink.Playable) -> float:
+    return getattr(track, 'fair_tag', 0.0)
+
+
+class ChunkedList(MutableSequence):
+    """List split into chunks of at most ``2 * LOAD`` items with a Fenwick tree over chunk lengths."""
+
+    LOAD = 4096  # Chunks are built full (2 * LOAD) and split in half when an insert overflows one
+
+    def __init__(self, iterable: Iterable = ()):
+        self._chunks: list[list] = []
+        self._tree: list[int] = [0]
+        self._len = 0
+        self.extend(iterable)
+
+    # --- INDEX ---
+
+    def _rebuild(self):
+        """Recompute the Fenwick tree after chunks were added, removed, split or merged."""
+        if not all(self._chunks):
+            self._chunks = [chunk for chunk in self._chunks if chunk]
+        tree = [0]
+        tree.extend(map(len, self._chunks))
+        self._len = sum(tree)
+        size = len(tree)
+        for i in range(1, size):
+            parent = i + (i & -i)
+            if parent < size:
+                tree[parent] += tree[i]
+        self._tree = tree
+
+    def _update(self, chunk_index: int, delta: int):
+        tree = self._tree
+        i = chunk_index + 1
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+        self._len += delta
+
+    def _prefix(self, count: int) -> int:
+        """Total length of the first ``count`` chunks."""
+        tree = self._tree
+        total = 0
+        while count:
+            total += tree[count]
+            count -= count & -count
+        return total
+
+    def _append_chunk(self, chunk: list):
+        """Add a chunk at the end, extending the Fenwick tree in O(log chunks)."""
+        i = len(self._tree)
+        self._chunks.append(chunk)
+        self._tree.append(len(chunk) + self._prefix(i - 1) - self._prefix(i - (i & -i)))
+        self._len += len(chunk)
+
+    def _locate(self, index: int) -> tuple[int, int]:
+        """Map a valid flat index to (chunk index, offset) in O(log chunks)."""
+        tree = self._tree
+        pos = 0
+        step = 1 << (len(tree) - 1).bit_length()
+        while step:
+            nxt = pos + step
+            if nxt < len(tree) and tree[nxt] <= index:
+                pos = nxt
+                index -= tree[nxt]
+            step >>= 1
+        return pos, index
+
+    def _normalize(self, index: int) -> int:
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("ChunkedList index out of range")
+        return index
+
+    def _maybe_merge(self, chunk_index: int):
+        """Fold a chunk that has shrunk a lot into its neighbour so chunk count tracks length."""
+        chunks = self._chunks
+        chunk = chunks[chunk_index]
+        if not chunk:
+            del chunks[chunk_index]
+            self._rebuild()
+        elif len(chunk) < self.LOAD // 4 and chunk_index + 1 < len(chunks) \
+                and len(chunk) + len(chunks[chunk_index + 1]) <= self.LOAD:
+            chunk.extend(chunks.pop(chunk_index + 1))
+            self._rebuild()
+
+    # --- SEQUENCE ---
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self):
+        return chain.from_iterable(self._chunks)
+
+    def __reversed__(self):
+        for chunk in reversed(self._chunks):
+            yield from reversed(chunk)
+
+    def __getitem__(self, index):
+        chunks = self._chunks
+        if len(chunks) == 1 and index.__class__ is int:
+            return chunks[0][index]
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._len)
+            if step != 1:
+                return list(self)[index]
+            if start >= stop:
+                return []
+            chunk_index, offset = self._locate(start)
+            items = chain([self._chunks[chunk_index][offset:]], islice(self._chunks, chunk_index + 1, None))
+            return list(islice(chain.from_iterable(items), stop - start))
+        chunk_index, offset = self._locate(self._normalize(index))
+        return self._chunks[chunk_index][offset]
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            items = list(self)
+            items[index] = value
+            self.clear()
+            self.extend(items)
+            return
+        chunk_index, offset = self._locate(self._normalize(index))
+        self._removed((self._chunks[chunk_index][offset],))
+        self._chunks[chunk_index][offset] = value
+        self._added((value,))
+
+    def __delitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._len)
+            if step != 1:
+                items = list(self)
+                del items[index]
+                self.clear()
+                self.extend(items)
+            elif start < stop:
+                self._delete_range(start, stop)
+            return
+        self.pop(index)
+
+    def _delete_range(self, start: int, stop: int):
+        chunks = self._chunks
+        first, offset = self._locate(start)
+        last, end = self._locate(stop - 1)
+        if first == last:
+            chunk = chunks[first]
+            self._removed(chunk[offset:end + 1])
+            del chunk[offset:end + 1]
+            if chunk:
+                self._update(first, start - stop)
+                return
+            del chunks[first]
+        else:
+            # Trim the two end chunks and drop the whole ones between, then rebuild the tree once
+            self._removed(chain(chunks[first][offset:], chain.from_iterable(chunks[first + 1:last]),
+                                chunks[last][:end + 1]))
+            del chunks[first][offset:]
+            del chunks[last][:end + 1]
+            del chunks[first + 1:last]
+        self._rebuild()
+
+    def insert(self, index: int, value):
+        if index < 0:
+            index = max(0, index + self._len)
+        if index >= self._len:
+            self.append(value)
+            return
+        chunk_index, offset = self._locate(index)
+        chunk = self._chunks[chunk_index]
+        chunk.insert(offset, value)
+        self._added((value,))
+        if len(chunk) > 2 * self.LOAD:
+            half = len(chunk) // 2
+            self._chunks[chunk_index:chunk_index + 1] = [chunk[:half], chunk[half:]]
+            self._rebuild()
+        else:
+            self._update(chunk_index, 1)
+
+    def append(self, value):
+        self._added((value,))
+        chunks = self._chunks
+        if len(chunks) == 1 and len(chunks[0]) < 2 * self.LOAD:
+            chunks[0].append(value)
+            self._tree[1] += 1
+            self._len += 1
+        elif chunks and len(chunks[-1]) < 2 * self.LOAD:
+            chunks[-1].append(value)
+            self._update(len(chunks) - 1, 1)
+        else:
+            self._append_chunk([value])
+
+    def extend(self, values: Iterable):
+        values = list(values)
+        if not values:
+            return
+        self._added(values)
+        size = 2 * self.LOAD
+        if self._chunks:
+            room = size - len(self._chunks[-1])
+            if room > 0:
+                self._chunks[-1].extend(values[:room])
+                self._update(len(self._chunks) - 1, min(room, len(values)))
+                values = values[room:]
+        for i in range(0, len(values), size):
+            self._append_chunk(values[i:i + size])
+
+    def pop(self, index: int = -1):
+        chunks = self._chunks
+        if len(chunks) == 1:
+            value = chunks[0].pop(index)
+            self._tree[1] -= 1
+            self._len -= 1
+            self._removed((value,))
+            if not chunks[0]:
+                self._rebuild()
+            return value
+        chunk_index, offset = self._locate(self._normalize(index))
+        value = chunks[chunk_index].pop(offset)
+        self._removed((value,))
+        self._update(chunk_index, -1)
+        self._maybe_merge(chunk_index)
+        return value
+
+    def bisect_right(self, value, key: Callable | None = None) -> int:
+        """Insertion point after any items equal to ``value``, for a list sorted by ``key``."""
+        chunks = self._chunks
+        lo, hi = 0, len(chunks)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            last = chunks[mid][-1]
+            if value < (key(last) if key else last):
+                hi = mid
+            else:
+                lo = mid + 1
+        if lo == len(chunks):
+            return self._len
+        return self._prefix(lo) + bisect.bisect_right(chunks[lo], value, key=key)
+
+    def index(self, value, start: int = 0, stop: int | None = None) -> int:
+        for i, item in enumerate(islice(self, start, stop), start):
+            if item == value:
+                return i
+        raise ValueError(f"{value!r} is not in list")
+
+    def clear(self):
+        self._chunks = []
+        self._tree = [0]
+        self._len = 0
+        self._cleared()
+
+    def copy(self) -> 'ChunkedList':
+        return type(self)(self)
+
+    # Hooks for subclasses that index the contents; every mutation goes through these
+    def _added(self, values: Iterable):
+        pass
+
+    def _removed(self, values: Iterable):
+        pass
+
+    def _cleared(self):
+        pass
+
+    def _reorder(self, items: list):
+        """Replace the contents with a permutation of themselves; the hooks don't run since nothing was added or removed."""
+        size = 2 * self.LOAD
+        self._chunks = [items[i:i + size] for i in range(0, len(items), size)]
+        self._rebuild()
+
+    def reverse(self):
+        items = list(self)
+        items.reverse()
+        self._reorder(items)
+
+    def shuffle(self, rng: random.Random | None = None):
+        """Shuffle in O(n): flatten once, shuffle, re-chunk."""
+        items = list(self)
+        (rng or random).shuffle(items)
+        self._reorder(items)
+
+    def __repr__(self) -> str:
+        return f"ChunkedList({list(self)!r})"
+
+
+def track_key(track: wavelink.Playable) -> tuple[str, str]:
+    return track.source, track.identifier
+
+
+class TrackList(ChunkedList):
+    """ChunkedList of tracks that keeps a count per track identifier for O(1) duplicate checks."""
+
+    def __init__(self, iterable: Iterable = ()):
+        self.counts: dict[tuple[str, str], int] = {}
+        self.tally = None  # Fleet stats for a live player's queue (see renify_stats); copies aren't counted
+        super().__init__(iterable)
+
+    def _added(self, values: Iterable):
+        counts = self.counts
+        for track in values:
+            key = track.source, track.identifier  # track_key, inlined: this runs for every queued track
+            counts[key] = counts.get(key, 0) + 1
+        if self.tally is not None:
+            self.tally.added(values)
+
+    def _removed(self, values: Iterable):
+        counts = self.counts
+        for track in values:
+            key = track.source, track.identifier
+            if counts[key] == 1:
+                del counts[key]
+            else:
+                counts[key] -= 1
+        if self.tally is not None:
+            self.tally.removed(values)
+
+    def _cleared(self):
+        self.counts.clear()
+        if self.tally is not None:
+            self.tally.cleared()
+
+
+class RenifyQueue(wavelink.Queue):
+    """``wavelink.Queue`` with a chunked backing store, range/move/skip-to operations and fair mode."""
+
+    def __init__(self, *, history: bool = True, fair: bool = FAIR_QUEUE,
+                 weight_for: Callable[[int | None], int] | None = None):
+        super().__init__(history=history)
+        self._items = TrackList()
+        self.no_duplicates = NO_DUPLICATES
+        self.fair = fair
+        self.weight_for = weight_for or (lambda requester_id: 1)
+        self._vtime = 0.0
+        self._finish: dict[int | None, float] = {}  # requester -> tag of their last queued track
+
+    def copy(self) -> 'RenifyQueue':
+        queue = RenifyQueue(history=self.history is not None, fair=self.fair, weight_for=self.weight_for)
+        queue._items = self._items.copy()
+        queue.no_duplicates = self.no_duplicates
+        queue._vtime = self._vtime
+        queue._finish = self._finish.copy()
+        return queue
+
+    # --- DUPLICATES ---
+
+    def is_queued(self, track: wavelink.Playable) -> bool:
+        """Whether a track with the same source and identifier is already queued, in O(1)."""
+        return track_key(track) in self._items.counts
+
+    def filter_new(self, tracks: Iterable[wavelink.Playable],
+                   exclude: Iterable[wavelink.Playable | None] = ()) -> tuple[list[wavelink.Playable], int]:
+        """Split off tracks that are already queued (or repeated within ``tracks``) in linear time.
+
+        Returns the tracks to add and how many duplicates were dropped.
+        """
+        queued = self._items.counts
+        seen = {track_key(track) for track in exclude if track is not None}
+        fresh = []
+        dropped = 0
+        for track in tracks:
+            key = track_key(track)
+            if key in queued or key in seen:
+                dropped += 1
+                continue
+            seen.add(key)
+            fresh.append(track)
+        return fresh, dropped
+
+    # --- FAIR MODE ---
+
+    def set_fair(self, enabled: bool):
+        """Switch fair mode; turning it on re-interleaves what is already queued."""
+        self.fair = enabled
+        if enabled:
+            self._rebalance()
+
+    def _tag(self, track: wavelink.Playable) -> float:
+        requester = requester_of(track)
+        tag = max(self._vtime, self._finish.get(requester, 0.0)) + 1.0 / max(1, self.weight_for(requester))
+        self._finish[requester] = tag
+        track.fair_tag = tag
+        return tag
+
+    def _rebalance(self, shuffle: bool = False):
+        """Re-tag every queued track from the current virtual time, keeping each requester's order."""
+        lanes: dict[int | None, list[wavelink.Playable]] = {}
+        for track in self._items:
+            lanes.setdefault(requester_of(track), []).append(track)
+        self._finish.clear()
+        for lane in lanes.values():
+            if shuffle:
+                random.shuffle(lane)
+            for track in lane:
+                self._tag(track)
+        items = sorted(chain.from_iterable(lanes.values()), key=_fair_tag)
+        self._items.clear()
+        self._items.extend(items)
+
+    def put(self, item, /, *, atomic: bool = True) -> int:
+        if not self.fair:
+            return super().put(item, atomic=atomic)
+        tracks = list(item) if isinstance(item, Iterable) else [item]
+        if atomic:
+            self._check_atomic(tracks)
+        else:
+            tracks = [track for track in tracks if isinstance(track, wavelink.Playable)]
+        for track in tracks:
+            self._items.insert(self._items.bisect_right(self._tag(track), key=_fair_tag), track)
+        self._wakeup_next()
+        return len(tracks)
+
+    def get(self) -> wavelink.Playable:
+        track = super().get()
+        self._advance(track)
+        return track
+
+    def _advance(self, track: wavelink.Playable):
+        if not self.fair:
+            return  # set_fair re-tags from scratch, so the clock only has to move while fair mode is on
+        self._vtime = max(self._vtime, _fair_tag(track))
+        if not self._items:
+            self._finish.clear()
+
+    def clear(self) -> None:
+        super().clear()
+        self._finish.clear()
+
+    # --- EDITING ---
+
+    def shuffle(self) -> None:
+        if self.fair:
+            # Shuffle within each requester's tracks but keep taking turns
+            self._rebalance(shuffle=True)
+        else:
+            self._items.shuffle()
+
+    def remove_range(self, start: int, stop: int) -> int:
+        """Delete items [start, stop) and return how many were removed."""
+        start, stop, _ = slice(start, stop).indices(len(self._items))
+        removed = max(0, stop - start)
+        del self._items[start:stop]
+        return removed
+
+    def move(self, source: int, destination: int) -> wavelink.Playable:
+        """Move the item at ``source`` so it ends up at ``destination``."""
+        track = self._items.pop(source)
+        self._items.insert(destination, track)
+        if self.fair:
+            # Take the slot's tag so later fair inserts still land in order
+            track.fair_tag = _fair_tag(self._items[destination - 1]) if destination > 0 else self._vtime
+        return track
+
+    def skip_to(self, index: int) -> wavelink.Playable:
+        """Drop everything before ``index`` and return (and remove) the item at ``index``."""
+        if not 0 <= index < len(self._items):
+            raise IndexError("skip_to index out of range")
+        track = self._items[index]
+        del self._items[:index + 1]
+        self._advance(track)
+        return track
@@ -0,0 +1,172 @@
+"""
+Renify – Response rendering within Discord's message limits.
+
+Track text is formatted once per track and kept on the track, so listing a
+queue only joins strings that already exist. Static embeds such as ``/help``
+are built once per key (e.g. tier and queue limit) and reused. Every embed
+goes through ``fit_embed``, which clips the title, author, footer,
+description and fields to their own limits and to the 6,000-character total
+in a single pass, so a long title can't get a message rejected.
+"""
+from collections.abc import Callable, Hashable
+
+import discord
+import wavelink
+
+from renify_queue import requester_of
+
+# Discord's limits (https://discord.com/developers/docs/resources/message#embed-object-embed-limits)
+MESSAGE_LIMIT = 2000
+EMBED_TOTAL = 6000
+EMBED_TITLE = 256
+EMBED_DESCRIPTION = 4096
+EMBED_FIELDS = 25
+FIELD_NAME = 256
+FIELD_VALUE = 1024
+FOOTER_TEXT = 2048
+AUTHOR_NAME = 256
+
+TITLE_LENGTH = 50   # Track titles in replies and lists
+AUTHOR_LENGTH = 30
+QUEUE_PAGE_SIZE = 15
+
+TIER_EMOJI = {"FREE": "🆓", "PREMIUM": "⭐", "DIAMOND": "💎"}
+
+
+def clip(text: str, limit: int) -> str:
+    """``text`` cut to ``limit`` characters, ending in an ellipsis if anything was cut."""
+    if len(text) <= limit:
+        return text
+    return text[:limit - 1].rstrip() + "…" if limit > 0 else ""
+
+
+# --- TRACKS ---
+
+def escape_title(text: str, limit: int = TITLE_LENGTH) -> str:
+    """``text`` clipped and escaped so it is safe inside bold or link text."""
+    return discord.utils.escape_markdown(clip(text, limit)).replace('[', '\\[').replace(']', '\\]')
+
+
+def escape_author(text: str, limit: int = AUTHOR_LENGTH) -> str:
+    """``text`` clipped and safe inside an inline code span."""
+    return clip(text, limit).replace('`', "'")
+
+
+def _rendered(track: wavelink.Playable) -> tuple[str, str]:
+    cached = getattr(track, 'rendered', None)
+    if cached is None:
+        title = escape_title(track.title)
+        author = escape_author(track.author)
+        link = f"[{title}]({track.uri})" if track.uri else title
+        cached = track.rendered = (title, f"{link} by `{author}`")
+    return cached
+
+
+def track_title(track: wavelink.Playable) -> str:
+    """The track's title, clipped and escaped for bold or link text."""
+    return _rendered(track)[0]
+
+
+def track_line(track: wavelink.Playable) -> str:
+    """``[title](uri) by `author` `` for lists, formatted once per track."""
+    return _rendered(track)[1]
+
+
+def join_lines(lines: list[str], limit: int = EMBED_DESCRIPTION) -> str:
+    """Join as many whole lines as fit in ``limit``, noting how many were left out."""
+    if sum(map(len, lines)) + len(lines) - 1 <= limit:
+        return "\n".join(lines)
+    kept, size = [], 0
+    for i, line in enumerate(lines):
+        if size + len(line) + 1 + len(f"…and {len(lines) - i} more") > limit:
+            break
+        kept.append(line)
+        size += len(line) + 1
+    kept.append(f"…and {len(lines) - len(kept)} more")
+    return "\n".join(kept)
+
+
+# --- EMBEDS ---
+
+def fit_embed(embed: discord.Embed) -> discord.Embed:
+    """Clip an embed in place to Discord's per-part and total limits and return it."""
+    budget = EMBED_TOTAL
+
+    def take(text, limit: int):
+        nonlocal budget
+        if not text:
+            return text
+        text = str(text)
+        if len(text) > limit or len(text) > budget:
+            text = clip(text, min(limit, budget))
+        budget -= len(text)
+        return text
+
+    def placeholder():
+        nonlocal budget
+        budget -= 1
+        return "\u200b"
+
+    # Works on the embed's own dicts rather than its proxies, so a message that already fits costs next to nothing.
+    # The frame goes first, so a huge description is what gets cut rather than the title.
+    if embed.title:
+        embed.title = take(embed.title, EMBED_TITLE)
+    author = getattr(embed, '_author', None)
+    if author and author.get('name'):
+        author['name'] = take(author['name'], AUTHOR_NAME)
+    footer = getattr(embed, '_footer', None)
+    if footer and footer.get('text'):
+        footer['text'] = take(footer['text'], FOOTER_TEXT)
+    if embed.description:
+        embed.description = take(embed.description, EMBED_DESCRIPTION)
+
+    fields = getattr(embed, '_fields', None)
+    if fields:
+        del fields[EMBED_FIELDS:]
+        for i, field in enumerate(fields):
+            # A field needs at least one character each for its name and value (a placeholder counts too),
+            # so the name leaves one for the value and nothing is written to a field that can't fit
+            if budget < 2:
+                del fields[i:]
+                break
+            field['name'] = take(field['name'], min(FIELD_NAME, budget - 1)) or placeholder()
+            field['value'] = take(field['value'], FIELD_VALUE) or placeholder()
+    return embed
+
+
+class EmbedCache:
+    """Embeds built once per key by ``build(*key)``, fitted to the limits, then reused."""
+
+    def __init__(self, build: Callable[..., discord.Embed]):
+        self.build = build
+        self._embeds: dict[Hashable, discord.Embed] = {}
+
+    def get(self, *key) -> discord.Embed:
+        embed = self._embeds.get(key)
+        if embed is None:
+            embed = self._embeds[key] = fit_embed(self.build(*key))
+        return embed
+
+    def clear(self):
+        self._embeds.clear()
+
+
+# --- QUEUE ---
+
+def queue_embed(player: wavelink.Player, page: int = 1, page_size: int = QUEUE_PAGE_SIZE) -> discord.Embed:
+    """One page of the queue; only the tracks on that page are rendered."""
+    queue = player.queue
+    pages = max(1, -(-len(queue) // page_size))
+    page = min(max(page, 1), pages)
+    start = (page - 1) * page_size
+    lines = []
+    for i in range(start, min(start + page_size, len(queue))):
+        track = queue[i]
+        requester = requester_of(track)
+        lines.append(f"**{i + 1}.** {track_line(track)}" + (f" · <@{requester}>" if requester else ""))
+
+    embed = discord.Embed(title="📜 Current Queue", description=join_lines(lines), color=0x1DB954)
+    if player.current:
+        embed.set_author(name=f"Currently Playing: {player.current.title}", url=player.current.uri)
+    embed.set_footer(text=f"Page {page}/{pages} · {len(queue):,} tracks")
+    return fit_embed(embed)
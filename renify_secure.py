@@ -35,9 +35,12 @@ class RateLimiter:
     """Simple in-memory rate limiter"""
     def __init__(self):
         self.users = defaultdict(list)
+        self.last_sweep = time()
     
     def is_rate_limited(self, user_id: int, max_calls: int = MAX_CALLS_PER_WINDOW, window: int = COMMAND_COOLDOWN) -> bool:
         now = time()
+        if now - self.last_sweep >= window:
+            self.sweep(now, window)
         self.users[user_id] = [
             call_time for call_time in self.users[user_id] 
             if now - call_time < window
@@ -51,6 +54,14 @@ class RateLimiter:
         """Reset rate limit for a user"""
         self.users[user_id] = []
 
+    def sweep(self, now: float, window: int = COMMAND_COOLDOWN):
+        """Forget users whose calls have all expired so the table doesn't grow forever"""
+        self.users = defaultdict(list, {
+            user_id: calls for user_id, calls in self.users.items()
+            if calls and now - calls[-1] < window
+        })
+        self.last_sweep = now
+
 rate_limiter = RateLimiter()
 
 # --- INPUT VALIDATION ---
@@ -241,9 +252,9 @@ class MusicCog(commands.Cog):
                 return
             
             playlist = tracks
-            player.queue.extend(playlist.tracks)
+            player.queue.put(playlist.tracks)
             
-            if not player.is_playing() and not player.paused:
+            if not player.playing and not player.paused:
                 await player.play(player.queue.get())
 
             await interaction.followup.send(
@@ -261,7 +272,7 @@ class MusicCog(commands.Cog):
                 )
                 return
             
-            if player.is_playing() or player.paused:
+            if player.playing or player.paused:
                 player.queue.put(track)
                 await interaction.followup.send(
                     f"🎧 Queued **[{track.title[:50]}]({track.uri})** by `{track.author}`."
@@ -278,7 +289,7 @@ class MusicCog(commands.Cog):
         if not player:
             return
             
-        if not player.is_playing():
+        if not player.playing:
             await interaction.response.send_message(
                 "🤷 I'm not playing anything right now!", 
                 ephemeral=True
@@ -330,7 +341,7 @@ class MusicCog(commands.Cog):
         if not player:
             return
             
-        if not player.is_playing() and player.queue.is_empty:
+        if not player.playing and player.queue.is_empty:
             await interaction.response.send_message("Nothing to stop.", ephemeral=True)
             return
             
@@ -0,0 +1,236 @@
+"""
+Renify – Per-guild settings with an in-memory cache and write-behind persistence.
+
+A guild's settings (home channel, DJ role, default volume, fair queue,
+duplicates and autoplay) are read from the local SQLite database the first
+time the guild is used and then served from memory. Changes update the cache
+at once and are written by a background thread, coalesced per guild and
+batched into one transaction, so a command never waits on disk. Without a
+``DATABASE_URL`` the settings still work but only last until a restart.
+"""
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+from time import time
+
+import discord
+import wavelink
+
+from renify_autoplay import AUTOPLAY
+from renify_history import DATABASE_URL, sqlite_path
+from renify_queue import FAIR_QUEUE, NO_DUPLICATES
+
+logger = logging.getLogger('RenifyBot.settings')
+
+# --- CONFIGURATION ---
+DEFAULT_VOLUME = int(os.getenv("RENIFY_DEFAULT_VOLUME", 100))
+FLUSH_DELAY = float(os.getenv("RENIFY_SETTINGS_FLUSH_DELAY", 2.0))  # Seconds changes are held to batch them
+MAX_VOLUME = 200
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS guild_settings (
+    guild_id        INTEGER PRIMARY KEY,
+    home_channel_id INTEGER,
+    dj_role_id      INTEGER,
+    volume          INTEGER NOT NULL,
+    fair_queue      INTEGER NOT NULL,
+    no_duplicates   INTEGER NOT NULL,
+    autoplay        INTEGER NOT NULL,
+    updated_at      REAL NOT NULL
+);
+"""
+
+FIELDS = ('home_channel_id', 'dj_role_id', 'volume', 'fair_queue', 'no_duplicates', 'autoplay')
+
+
+class GuildSettings:
+    """One guild's preferences; change them through ``GuildSettingsStore.update``."""
+    __slots__ = ('guild_id',) + FIELDS
+
+    def __init__(self, guild_id: int, home_channel_id: int | None = None, dj_role_id: int | None = None,
+                 volume: int = DEFAULT_VOLUME, fair_queue: bool = FAIR_QUEUE, no_duplicates: bool = NO_DUPLICATES,
+                 autoplay: bool = AUTOPLAY):
+        self.guild_id = guild_id
+        self.home_channel_id = home_channel_id
+        self.dj_role_id = dj_role_id
+        self.volume = volume
+        self.fair_queue = bool(fair_queue)
+        self.no_duplicates = bool(no_duplicates)
+        self.autoplay = bool(autoplay)
+
+    def row(self) -> tuple:
+        return (self.guild_id, self.home_channel_id, self.dj_role_id, self.volume,
+                int(self.fair_queue), int(self.no_duplicates), int(self.autoplay), time())
+
+
+class GuildSettingsStore:
+    """Lazily loaded, cached guild settings written behind by a background thread."""
+
+    def __init__(self, url: str = DATABASE_URL, flush_delay: float = FLUSH_DELAY):
+        self.path = sqlite_path(url)
+        self.enabled = self.path is not None
+        self.flush_delay = flush_delay
+        self._cache: dict[int, GuildSettings] = {}
+        self._loading: dict[int, asyncio.Future] = {}
+        self._dirty: dict[int, tuple] = {}  # guild_id -> latest row; later changes replace earlier ones
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closing = threading.Event()
+        self._writer: threading.Thread | None = None
+        self._local = threading.local()
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    # --- READS ---
+
+    def cached(self, guild_id: int) -> GuildSettings | None:
+        """A guild's settings if they are already loaded; never touches disk."""
+        return self._cache.get(guild_id)
+
+    def _load(self, guild_id: int) -> GuildSettings:
+        row = self._conn().execute(
+            f"SELECT {', '.join(FIELDS)} FROM guild_settings WHERE guild_id = ?", (guild_id,)).fetchone()
+        return GuildSettings(guild_id, *row) if row else GuildSettings(guild_id)
+
+    async def _read(self, guild_id: int) -> GuildSettings:
+        try:
+            return await asyncio.to_thread(self._load, guild_id)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to load settings for guild {guild_id}: {e}")
+            return GuildSettings(guild_id)
+
+    async def get(self, guild_id: int) -> GuildSettings:
+        """A guild's settings, read from disk only the first time the guild is used."""
+        settings = self._cache.get(guild_id)
+        if settings is not None:
+            return settings
+        if not self.enabled:
+            return self._cache.setdefault(guild_id, GuildSettings(guild_id))
+
+        # Concurrent first uses of a guild share one read
+        pending = self._loading.get(guild_id)
+        if pending is None:
+            pending = self._loading[guild_id] = asyncio.ensure_future(self._read(guild_id))
+            pending.add_done_callback(lambda _: self._loading.pop(guild_id, None))
+        return self._cache.setdefault(guild_id, await asyncio.shield(pending))
+
+    # --- WRITES ---
+
+    async def update(self, guild_id: int, **changes) -> GuildSettings:
+        """Change settings in the cache now and queue them for writing; returns the settings."""
+        unknown = set(changes) - set(FIELDS)
+        if unknown:
+            raise TypeError(f"unknown guild setting(s): {', '.join(sorted(unknown))}")
+        settings = await self.get(guild_id)
+        for name, value in changes.items():
+            setattr(settings, name, value)
+        if self.enabled:
+            with self._lock:
+                self._dirty[guild_id] = settings.row()
+            self._ensure_writer()
+            self._wake.set()
+        return settings
+
+    def _ensure_writer(self):
+        if self._writer is None or not self._writer.is_alive():
+            self._closing.clear()
+            self._writer = threading.Thread(target=self._write_loop, name='renify-settings-writer', daemon=True)
+            self._writer.start()
+
+    def _take(self) -> list[tuple]:
+        with self._lock:
+            rows, self._dirty = list(self._dirty.values()), {}
+        return rows
+
+    def _write(self, rows: list[tuple]):
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "INSERT INTO guild_settings (guild_id, home_channel_id, dj_role_id, volume, fair_queue, "
+                "no_duplicates, autoplay, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (guild_id) DO UPDATE SET home_channel_id = excluded.home_channel_id, "
+                "dj_role_id = excluded.dj_role_id, volume = excluded.volume, fair_queue = excluded.fair_queue, "
+                "no_duplicates = excluded.no_duplicates, autoplay = excluded.autoplay, "
+                "updated_at = excluded.updated_at", rows)
+
+    def _flush(self):
+        rows = self._take()
+        if not rows:
+            return
+        try:
+            self._write(rows)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to save settings for {len(rows)} guilds: {e}")
+            with self._lock:
+                for row in rows:
+                    self._dirty.setdefault(row[0], row)  # Retry on the next flush unless a newer change exists
+
+    def _write_loop(self):
+        while True:
+            self._wake.wait()
+            # Hold the first change briefly so a burst of changes goes out as one transaction
+            self._closing.wait(self.flush_delay)
+            self._wake.clear()
+            self._flush()
+            if self._closing.is_set():
+                return
+
+    def close(self, timeout: float = 5.0):
+        """Write pending changes and stop the writer thread."""
+        if self._writer is not None and self._writer.is_alive():
+            self._closing.set()
+            self._wake.set()
+            self._writer.join(timeout)
+        elif self._dirty:
+            self._flush()
+
+
+guild_settings = GuildSettingsStore()
+
+
+def dj_or_permissions(**perms: bool):
+    """Like ``app_commands.checks.has_permissions``, but members with the guild's DJ role pass too."""
+    async def predicate(interaction: discord.Interaction) -> bool:
+        permissions = interaction.permissions
+        missing = [perm for perm, value in perms.items() if getattr(permissions, perm) != value]
+        if not missing:
+            return True
+        settings = await guild_settings.get(interaction.guild_id) if interaction.guild_id else None
+        if settings and settings.dj_role_id and any(role.id == settings.dj_role_id
+                                                   for role in getattr(interaction.user, 'roles', ())):
+            return True
+        raise discord.app_commands.MissingPermissions(missing)
+
+    return discord.app_commands.check(predicate)
+
+
+async def apply_settings(player: wavelink.Player, channel: discord.abc.Messageable):
+    """Give a newly connected player its guild's saved preferences."""
+    settings = await guild_settings.get(player.guild.id)
+    player.home_channel = home_channel(player.guild, channel)
+    player.queue.set_fair(settings.fair_queue)
+    player.queue.no_duplicates = settings.no_duplicates
+    player.autoplay_next = settings.autoplay
+    if settings.volume != player.volume:
+        await player.set_volume(settings.volume)
+
+
+def home_channel(guild: discord.Guild, fallback: discord.abc.Messageable) -> discord.abc.Messageable:
+    """The guild's saved home channel if it still exists, else ``fallback`` (from the cache only)."""
+    settings = guild_settings.cached(guild.id)
+    if settings is None or settings.home_channel_id is None:
+        return fallback
+    return guild.get_channel(settings.home_channel_id) or fallback
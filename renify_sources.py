@@ -0,0 +1,155 @@
+"""
+Renify – Query classification, direct source routing and URL canonicalization.
+
+``classify`` looks at a validated ``/play`` query once and decides where it
+should go: links to YouTube, YouTube Music, Spotify, SoundCloud and Bandcamp
+are rewritten to one canonical form (tracking parameters dropped, hosts
+normalized, share links and ``spotify:`` URIs expanded) and loaded directly;
+queries that already carry a Lavalink search prefix are passed through
+untouched; everything else is searched on ``DEFAULT_SEARCH_SOURCE``. The
+canonical form doubles as a cache key, so the same song pasted from a phone
+share sheet and from a desktop browser resolves to the same entry.
+"""
+import os
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import wavelink
+
+from renify_hedge import hedged_search
+
+# --- CONFIGURATION ---
+DEFAULT_SEARCH_SOURCE = os.getenv("RENIFY_SEARCH_SOURCE", "ytmsearch")  # Prefix for plain-text searches
+
+TEXT, TRACK, PLAYLIST, SEARCH = 'text', 'track', 'playlist', 'search'
+
+SEARCH_PREFIXES = ('ytsearch', 'ytmsearch', 'scsearch', 'spsearch', 'sprec', 'amsearch', 'dzsearch', 'dzisrc', 'bcsearch')
+
+# Parameters that only identify who shared a link or where it was clicked (known sources are rebuilt from scratch)
+TRACKING_PARAMS = frozenset({'si', 'fbclid', 'gclid', 'igshid', 'mc_cid', 'mc_eid'})
+
+_YOUTUBE_HOSTS = {'youtube.com', 'm.youtube.com', 'youtube-nocookie.com', 'music.youtube.com'}
+_YOUTUBE_ID = re.compile(r'^[A-Za-z0-9_-]{11}$')
+_SPOTIFY_PATH = re.compile(r'^/(?:intl-[a-z]{2}(?:-[a-z]{2})?/)?(track|album|playlist|artist|episode|show)/([A-Za-z0-9]+)')
+_SPOTIFY_URI = re.compile(r'^spotify:(track|album|playlist|artist|episode|show):([A-Za-z0-9]+)$')
+_SPOTIFY_COLLECTIONS = {'album', 'playlist', 'artist', 'show'}
+_BARE_LINK = re.compile(r'^(?:www\.|m\.)?[a-z0-9-]+(?:\.[a-z0-9-]+)*\.[a-z]{2,}/\S*$')
+
+
+class ParsedQuery:
+    """Where a query should be sent and what to call it."""
+    __slots__ = ('kind', 'source', 'query', 'search_source')
+
+    def __init__(self, kind: str, source: str, query: str, search_source: str | None = None):
+        self.kind = kind                    # TEXT, TRACK, PLAYLIST or SEARCH (already prefixed)
+        self.source = source                # youtube, spotify, soundcloud, bandcamp, url or the search prefix
+        self.query = query                  # Canonical URL or the search text
+        self.search_source = search_source  # Prefix wavelink should add, None for direct loads
+
+    @property
+    def key(self) -> str:
+        """Stable cache key: equal for every spelling of the same link or search."""
+        if self.kind == TEXT:
+            return f"{self.search_source}:{' '.join(self.query.lower().split())}"
+        return self.query
+
+    @property
+    def is_url(self) -> bool:
+        return self.kind in (TRACK, PLAYLIST)
+
+    def __repr__(self) -> str:
+        return f"<ParsedQuery {self.kind} {self.source} {self.query!r}>"
+
+    async def search(self) -> wavelink.Search:
+        """Send the query straight to the right Lavalink loader; plain text may be hedged."""
+        if self.kind == TEXT:
+            return await hedged_search.search(self.query, self.search_source)
+        return await wavelink.Playable.search(self.query, source=self.search_source)
+
+
+def _strip_tracking(query: str) -> str:
+    return urlencode([(k, v) for k, v in parse_qsl(query)
+                      if k.lower() not in TRACKING_PARAMS and not k.lower().startswith('utm_')])
+
+
+def _youtube(host: str, path: str, params: dict) -> ParsedQuery | None:
+    video = None
+    if host == 'youtu.be':
+        video = path.strip('/').split('/')[0]
+    elif path == '/watch':
+        video = params.get('v')
+    elif path.startswith(('/shorts/', '/embed/', '/live/', '/v/')):
+        video = path.split('/')[2]
+
+    playlist = params.get('list')
+    if playlist and playlist.startswith('RD'):
+        playlist = None  # Auto-generated mixes are endless radio; load the video itself
+    base = 'https://music.youtube.com' if host == 'music.youtube.com' else 'https://www.youtube.com'
+
+    if video and _YOUTUBE_ID.match(video):
+        if playlist:
+            return ParsedQuery(PLAYLIST, 'youtube', f"{base}/watch?{urlencode({'v': video, 'list': playlist})}")
+        return ParsedQuery(TRACK, 'youtube', f"{base}/watch?v={video}")
+    if playlist and path in ('/playlist', '/watch'):
+        return ParsedQuery(PLAYLIST, 'youtube', f"{base}/playlist?list={playlist}")
+    return None
+
+
+def _spotify(kind: str, ident: str) -> ParsedQuery:
+    return ParsedQuery(PLAYLIST if kind in _SPOTIFY_COLLECTIONS else TRACK, 'spotify',
+                       f"https://open.spotify.com/{kind}/{ident}")
+
+
+def canonical_url(url: str) -> ParsedQuery:
+    """Rebuild links to known sources from their IDs; elsewhere lowercase the host and drop tracking parameters."""
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower() if parts.scheme.lower() in ('http', 'https') else 'https'
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    path = re.sub(r'/{2,}', '/', parts.path or '/')
+    params = dict(parse_qsl(parts.query))
+
+    if host in _YOUTUBE_HOSTS or host == 'youtu.be':
+        parsed = _youtube(host, path, params)
+        if parsed is not None:
+            return parsed
+    elif host == 'open.spotify.com':
+        match = _SPOTIFY_PATH.match(path)
+        if match:
+            return _spotify(*match.groups())
+    elif host in ('soundcloud.com', 'm.soundcloud.com'):
+        path = path.rstrip('/')
+        return ParsedQuery(PLAYLIST if '/sets/' in path or path.endswith(('/likes', '/tracks')) else TRACK,
+                           'soundcloud', f"https://soundcloud.com{path}")
+    elif host.endswith('.bandcamp.com'):
+        path = path.rstrip('/')
+        return ParsedQuery(PLAYLIST if path.startswith('/album/') or path in ('', '/music') else TRACK,
+                           'bandcamp', f"https://{host}{path}")
+
+    # Unknown hosts may serve different content with or without www., so keep it as given
+    netloc = (parts.hostname or '').lower() + (f":{parts.port}" if parts.port else '')
+    query = _strip_tracking(parts.query)
+    return ParsedQuery(TRACK, 'url', urlunsplit((scheme, netloc, path, query, '')))
+
+
+def classify(query: str) -> ParsedQuery:
+    """Decide how a validated /play query should be loaded."""
+    query = query.strip().strip('<>')  # Discord wraps links in <> to suppress embeds
+    lowered = query.lower()
+
+    match = _SPOTIFY_URI.match(query)
+    if match:
+        return _spotify(*match.groups())
+
+    if lowered.startswith(('http://', 'https://')) or _BARE_LINK.match(lowered):
+        if not lowered.startswith(('http://', 'https://')):
+            query = 'https://' + query
+        if ' ' not in query:
+            return canonical_url(query)
+
+    prefix, sep, rest = query.partition(':')
+    if sep and prefix.lower() in SEARCH_PREFIXES and rest.strip():
+        return ParsedQuery(SEARCH, prefix.lower(), f"{prefix.lower()}:{rest.strip()}")
+
+    return ParsedQuery(TEXT, DEFAULT_SEARCH_SOURCE, ' '.join(query.split()), DEFAULT_SEARCH_SOURCE)
@@ -0,0 +1,94 @@
+"""
+Renify – Opt-in speedups: uvloop, orjson and transport compression.
+
+With ``RENIFY_SPEEDUPS=true`` the bot runs on uvloop and decodes/encodes
+gateway and Lavalink JSON with orjson. Each piece is used only if its
+package is installed and silently falls back to the standard library
+otherwise. Compression needs no patching: discord.py negotiates zstd-stream
+on the gateway when ``zstandard`` is installed (zlib-stream otherwise) and
+aiohttp asks for brotli on REST calls when ``brotli`` is installed.
+"""
+import asyncio
+import importlib.util
+import logging
+import os
+
+import aiohttp
+import discord
+
+logger = logging.getLogger('RenifyBot.speedups')
+
+# --- CONFIGURATION ---
+SPEEDUPS = os.getenv("RENIFY_SPEEDUPS", "false").lower() in ("1", "true", "yes")
+
+_installed: dict[str, str] | None = None
+
+
+def loop_factory():
+    """uvloop's loop constructor if it is installed, else None (the default asyncio loop)."""
+    try:
+        import uvloop
+    except ImportError:
+        return None
+    return uvloop.new_event_loop
+
+
+def install_json() -> str:
+    """Route discord.py and aiohttp (wavelink) JSON through orjson; returns the codec in use."""
+    try:
+        import orjson
+    except ImportError:
+        return 'json'
+
+    def to_json(obj) -> str:
+        return orjson.dumps(obj).decode('utf-8')
+
+    discord.utils._to_json = to_json
+    discord.utils._from_json = orjson.loads
+
+    # wavelink parses every REST response and websocket event with aiohttp's .json(), which defaults to json.loads
+    response_json = aiohttp.ClientResponse.json
+    message_json = aiohttp.WSMessage.json
+    if not getattr(response_json, '_renify_orjson', False):
+        async def fast_response_json(self, *, loads=orjson.loads, **kwargs):
+            return await response_json(self, loads=loads, **kwargs)
+
+        def fast_message_json(self, *, loads=orjson.loads):
+            return message_json(self, loads=loads)
+
+        fast_response_json._renify_orjson = True
+        aiohttp.ClientResponse.json = fast_response_json
+        aiohttp.WSMessage.json = fast_message_json
+    return 'orjson'
+
+
+def compression() -> dict[str, str]:
+    """Which compression the gateway and REST calls will negotiate with what is installed."""
+    # Only checks that a brotli package is installed; aiohttp imports it itself (either binding works)
+    has_brotli = any(importlib.util.find_spec(name) for name in ('brotli', 'brotlicffi'))
+    http = 'br, gzip, deflate' if has_brotli else 'gzip, deflate'
+    gateway = getattr(discord.utils._ActiveDecompressionContext, 'COMPRESSION_TYPE', 'zlib-stream')
+    return {'gateway': gateway, 'http': http}
+
+
+def install(enabled: bool = SPEEDUPS) -> dict[str, str]:
+    """Apply the JSON speedups (idempotent) and report what each component uses."""
+    global _installed
+    if _installed is not None:
+        return _installed
+    if not enabled:
+        return {'loop': 'asyncio', 'json': 'json', **compression()}
+    _installed = {
+        'loop': 'uvloop' if loop_factory() else 'asyncio',
+        'json': install_json(),
+        **compression(),
+    }
+    logger.info("⚡ Speedups: " + ", ".join(f"{k}={v}" for k, v in _installed.items()))
+    return _installed
+
+
+def run_with_speedups(main, enabled: bool = SPEEDUPS):
+    """``asyncio.run(main)``, on uvloop when speedups are enabled and it is installed."""
+    install(enabled)
+    with asyncio.Runner(loop_factory=loop_factory() if enabled else None) as runner:
+        return runner.run(main)
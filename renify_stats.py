@@ -0,0 +1,200 @@
+"""
+Renify – Fleet-wide player and queue statistics kept up to date by events.
+
+Counters change as things happen: players connect and disconnect, tracks
+are put on, taken off or cleared from a queue, and tracks start and end.
+Reading them (``/stats`` or ``/metrics``) is O(1) however many guilds there
+are. Each player's queue carries a small per-tier tally, so even clearing a
+5,000-track queue only touches a handful of numbers. A periodic full scan
+recounts everything from the live players and corrects any drift, e.g. from
+a player that was torn down without a disconnect.
+"""
+import asyncio
+import logging
+import os
+from collections.abc import Callable, Iterable
+from time import time
+
+import wavelink
+
+from renify_metrics import metrics
+
+logger = logging.getLogger('RenifyBot.stats')
+
+# --- CONFIGURATION ---
+SCAN_INTERVAL = float(os.getenv("RENIFY_STATS_SCAN_INTERVAL", 300))  # Seconds between drift-correcting scans
+NO_TIER = 'NONE'  # Tracks without a requester (e.g. autoplay)
+
+
+class QueueTally:
+    """Per-tier track counts for one player's queue, mirrored into the fleet totals."""
+    __slots__ = ('fleet', 'tiers')
+
+    def __init__(self, fleet: 'FleetStats'):
+        self.fleet = fleet
+        self.tiers: dict[str, int] = {}
+
+    def added(self, tracks: Iterable[wavelink.Playable]):
+        tier_of = self.fleet.tier_of
+        tiers = self.tiers
+        for track in tracks:
+            # Remember the tier the track was counted under, in case the requester's tier changes later
+            tier = track.stats_tier = tier_of(track)
+            tiers[tier] = tiers.get(tier, 0) + 1
+            self.fleet._queued(tier, 1)
+
+    def removed(self, tracks: Iterable[wavelink.Playable]):
+        tiers = self.tiers
+        for track in tracks:
+            tier = getattr(track, 'stats_tier', NO_TIER)
+            if tiers.get(tier, 0) > 0:
+                tiers[tier] -= 1
+                self.fleet._queued(tier, -1)
+
+    def cleared(self):
+        for tier, count in self.tiers.items():
+            self.fleet._queued(tier, -count)
+        self.tiers.clear()
+
+
+class FleetStats:
+    """Counters for every player in this process, maintained incrementally."""
+
+    def __init__(self, tier_of: Callable[[wavelink.Playable], str] | None = None):
+        self.tier_of = tier_of or (lambda track: NO_TIER)
+        self.players = 0
+        self.playing = 0
+        self.queued = 0
+        self.queued_by_tier: dict[str, int] = {}
+        self.started = 0
+        self.ended = 0
+        self.corrections = 0
+        self.last_scan: float | None = None
+        self._task: asyncio.Task | None = None
+        self._players = metrics.gauge('renify_players', "Connected players")
+        self._playing = metrics.gauge('renify_players_playing', "Players with a track loaded")
+        self._queued_gauge = metrics.gauge('renify_queued_tracks', "Tracks waiting in all queues, by requester tier")
+        self._started = metrics.counter('renify_tracks_started_total', "Tracks started")
+        self._ended = metrics.counter('renify_tracks_ended_total', "Tracks ended, by reason")
+        self._drift = metrics.counter('renify_stats_drift_total', "Scans that found and corrected drift")
+
+    # --- EVENTS ---
+
+    def _queued(self, tier: str, delta: int):
+        count = self.queued_by_tier.get(tier, 0) + delta
+        self.queued_by_tier[tier] = count
+        self.queued += delta
+        self._queued_gauge.set(count, tier=tier)
+
+    def attach(self, player: wavelink.Player):
+        """Count a new player and start tallying its queue."""
+        if getattr(player, 'stats_tally', None) is not None:
+            return
+        tally = player.stats_tally = QueueTally(self)
+        player.stats_playing = False
+        tally.added(player.queue._items)
+        player.queue._items.tally = tally
+        self.players += 1
+        self._players.set(self.players)
+
+    def detach(self, player: wavelink.Player):
+        """Stop counting a disconnected player and everything left in its queue."""
+        tally = getattr(player, 'stats_tally', None)
+        if tally is None:
+            return
+        tally.cleared()
+        player.queue._items.tally = None
+        player.stats_tally = None
+        if player.stats_playing:
+            player.stats_playing = False
+            self.playing -= 1
+            self._playing.set(self.playing)
+        self.players -= 1
+        self._players.set(self.players)
+
+    def track_started(self, player: wavelink.Player):
+        self.started += 1
+        self._started.inc()
+        if getattr(player, 'stats_tally', None) is not None and not player.stats_playing:
+            player.stats_playing = True
+            self.playing += 1
+            self._playing.set(self.playing)
+
+    def track_ended(self, player: wavelink.Player, reason: str):
+        self.ended += 1
+        self._ended.inc(reason=reason)
+        # A replaced track is followed by the new track's start, so the player stays busy
+        if reason != 'replaced' and getattr(player, 'stats_tally', None) is not None and player.stats_playing:
+            player.stats_playing = False
+            self.playing -= 1
+            self._playing.set(self.playing)
+
+    # --- READS ---
+
+    def snapshot(self) -> dict:
+        """Current totals; O(number of tiers)."""
+        return {
+            'players': self.players,
+            'playing': self.playing,
+            'queued': self.queued,
+            'queued_by_tier': {tier: n for tier, n in self.queued_by_tier.items() if n},
+            'started': self.started,
+            'ended': self.ended,
+            'corrections': self.corrections,
+            'last_scan': self.last_scan,
+        }
+
+    # --- DRIFT CORRECTION ---
+
+    def reconcile(self, players: Iterable[wavelink.Player]) -> bool:
+        """Recount from the live players, fix the totals and tallies, and report whether anything drifted."""
+        players = [p for p in players if p is not None]
+        before = (self.players, self.playing, {t: n for t, n in self.queued_by_tier.items() if n})
+        playing = 0
+        by_tier: dict[str, int] = {}
+        for player in players:
+            if getattr(player, 'stats_tally', None) is None:
+                self.attach(player)  # Connected without being counted
+            tiers: dict[str, int] = {}
+            for track in player.queue._items:
+                tier = getattr(track, 'stats_tier', None)
+                if tier is None:
+                    tier = track.stats_tier = self.tier_of(track)
+                tiers[tier] = tiers.get(tier, 0) + 1
+            player.stats_tally.tiers = tiers
+            player.stats_playing = player.current is not None
+            playing += player.stats_playing
+            for tier, n in tiers.items():
+                by_tier[tier] = by_tier.get(tier, 0) + n
+
+        drifted = before != (len(players), playing, by_tier)
+        if drifted:
+            self.corrections += 1
+            self._drift.inc()
+            logger.warning(f"📊 Stats drifted (players {before[0]}→{len(players)}, playing {before[1]}→{playing}, "
+                           f"queued {sum(before[2].values())}→{sum(by_tier.values())}); corrected")
+        self.players, self.playing = len(players), playing
+        for tier in set(self.queued_by_tier) | set(by_tier):
+            self.queued_by_tier[tier] = by_tier.get(tier, 0)
+            self._queued_gauge.set(self.queued_by_tier[tier], tier=tier)
+        self.queued = sum(by_tier.values())
+        self._players.set(self.players)
+        self._playing.set(self.playing)
+        self.last_scan = time()
+        return drifted
+
+    def start(self, players: Callable[[], Iterable[wavelink.Player]], interval: float = SCAN_INTERVAL):
+        """Run ``reconcile`` over ``players()`` every ``interval`` seconds (idempotent)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._scan_loop(players, interval))
+
+    async def _scan_loop(self, players: Callable[[], Iterable[wavelink.Player]], interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                self.reconcile(players())
+            except Exception as e:
+                logger.error(f"Stats scan failed: {e}", exc_info=True)
+
+
+fleet_stats = FleetStats()
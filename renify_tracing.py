@@ -0,0 +1,247 @@
+"""
+Renify – Lightweight per-interaction tracing.
+
+Records a span for each stage of a slash command (validate, rate-limit,
+defer, voice connect, search, play, followup) so slow interactions can be
+broken down after the fact. Finished traces are appended to a local JSONL
+file from a background thread and can optionally be exported through
+OpenTelemetry when the SDK is installed.
+"""
+import contextvars
+import functools
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import uuid
+from collections import deque
+from time import perf_counter, time
+
+logger = logging.getLogger('RenifyBot.tracing')
+
+# --- CONFIGURATION ---
+TRACE_SAMPLE_RATE = float(os.getenv("RENIFY_TRACE_SAMPLE_RATE", 0.05))  # 0.0 disables tracing
+TRACE_FILE = os.getenv("RENIFY_TRACE_FILE", "renify_traces.jsonl")
+TRACE_FILE_MAX_MB = float(os.getenv("RENIFY_TRACE_FILE_MAX_MB", 10))  # Rolled over to .1, .2, ... at this size
+TRACE_FILE_BACKUPS = int(os.getenv("RENIFY_TRACE_FILE_BACKUPS", 3))
+TRACE_OTEL = os.getenv("RENIFY_TRACE_OTEL", "false").lower() in ("1", "true", "yes")
+TRACE_RECENT = int(os.getenv("RENIFY_TRACE_RECENT", 500))  # Traces kept in memory for /traces
+
+_current_trace: contextvars.ContextVar = contextvars.ContextVar('renify_trace', default=None)
+
+
+class Span:
+    """A single timed stage inside a trace."""
+    __slots__ = ('trace', 'name', 'start', 'end', 'error')
+
+    def __init__(self, trace: 'Trace', name: str):
+        self.trace = trace
+        self.name = name
+        self.start = 0.0
+        self.end = 0.0
+        self.error = None
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end = perf_counter()
+        if exc_type is not None:
+            self.error = exc_type.__name__
+        self.trace.spans.append(self)
+        return False
+
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'offset_ms': round((self.start - self.trace.start) * 1000, 3),
+            'duration_ms': round((self.end - self.start) * 1000, 3),
+            'error': self.error,
+        }
+
+
+class _NoopSpan:
+    """Shared span used when the current interaction is not sampled."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """All spans recorded for one interaction."""
+
+    def __init__(self, command: str, guild_id: int | None, user_id: int | None):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.command = command
+        self.guild_id = guild_id
+        self.user_id = user_id
+        self.started_at = time()
+        self.start = perf_counter()
+        self.end = 0.0
+        self.error = None
+        self.spans: list[Span] = []
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end - self.start) * 1000
+
+    def span(self, name: str) -> Span:
+        return Span(self, name)
+
+    def to_dict(self) -> dict:
+        return {
+            'trace_id': self.trace_id,
+            'command': self.command,
+            'guild_id': self.guild_id,
+            'user_id': self.user_id,
+            'started_at': self.started_at,
+            'duration_ms': round(self.duration_ms, 3),
+            'error': self.error,
+            'spans': [s.to_dict() for s in self.spans],
+        }
+
+
+class Tracer:
+    """Samples interactions, keeps recent traces and ships them to the sinks."""
+
+    def __init__(self, sample_rate: float = TRACE_SAMPLE_RATE, path: str | None = TRACE_FILE,
+                 otel: bool = TRACE_OTEL, recent: int = TRACE_RECENT,
+                 max_bytes: int = int(TRACE_FILE_MAX_MB * 1024 * 1024), backups: int = TRACE_FILE_BACKUPS):
+        self.sample_rate = sample_rate
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.recent: deque[Trace] = deque(maxlen=recent)
+        self._writes: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer: threading.Thread | None = None
+        self._otel = self._setup_otel() if otel else None
+
+    def _setup_otel(self):
+        try:
+            from opentelemetry import trace as otel_trace
+        except ImportError:
+            logger.warning("RENIFY_TRACE_OTEL is set but opentelemetry is not installed; exporting to file only")
+            return None
+        return otel_trace
+
+    def start(self, command: str, guild_id: int | None = None, user_id: int | None = None) -> Trace | None:
+        """Start a trace for a command, or return None if it is not sampled."""
+        if self.sample_rate <= 0 or (self.sample_rate < 1 and random.random() >= self.sample_rate):
+            return None
+        return Trace(command, guild_id, user_id)
+
+    def finish(self, trace: Trace):
+        trace.end = perf_counter()
+        self.recent.append(trace)
+        if self.path:
+            self._ensure_writer()
+            self._writes.put(trace.to_dict())
+        if self._otel is not None:
+            self._export_otel(trace)
+
+    def slowest(self, limit: int = 5, command: str | None = None) -> list[Trace]:
+        """Return the slowest traces still held in memory."""
+        traces = [t for t in self.recent if command is None or t.command == command]
+        return sorted(traces, key=lambda t: t.duration_ms, reverse=True)[:limit]
+
+    # --- Sinks ---
+
+    def _ensure_writer(self):
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(target=self._write_loop, name='renify-trace-writer', daemon=True)
+            self._writer.start()
+
+    def _rotate(self):
+        """Shift ``path`` to ``path.1`` (and older files up by one), like ``RotatingFileHandler``."""
+        if self.backups <= 0:
+            os.remove(self.path)
+            return
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+    def _write_loop(self):
+        """Drain finished traces to the JSONL file off the event loop, rolling it over at ``max_bytes``."""
+        while True:
+            batch = [self._writes.get()]
+            while not self._writes.empty() and len(batch) < 256:
+                batch.append(self._writes.get())
+            data = ''.join(json.dumps(t, separators=(',', ':')) + '\n' for t in batch).encode()
+            try:
+                if self.max_bytes > 0 and os.path.exists(self.path) and \
+                        os.path.getsize(self.path) + len(data) > self.max_bytes:
+                    self._rotate()
+                with open(self.path, 'ab') as f:
+                    f.write(data)
+            except OSError as e:
+                logger.error(f"Failed to write traces to {self.path}: {e}")
+
+    def _export_otel(self, trace: Trace):
+        """Replay a finished trace as OpenTelemetry spans with their real timestamps."""
+        otel_tracer = self._otel.get_tracer('renify')
+        wall_offset_ns = int(trace.started_at * 1e9) - int(trace.start * 1e9)
+        root = otel_tracer.start_span(
+            f"/{trace.command}",
+            start_time=int(trace.start * 1e9) + wall_offset_ns,
+            attributes={'discord.guild_id': str(trace.guild_id), 'discord.user_id': str(trace.user_id)},
+        )
+        ctx = self._otel.set_span_in_context(root)
+        for s in trace.spans:
+            child = otel_tracer.start_span(s.name, context=ctx, start_time=int(s.start * 1e9) + wall_offset_ns)
+            if s.error:
+                child.set_attribute('error.type', s.error)
+            child.end(end_time=int(s.end * 1e9) + wall_offset_ns)
+        root.end(end_time=int(trace.end * 1e9) + wall_offset_ns)
+
+
+tracer = Tracer()
+
+
+def span(name: str):
+    """Time a stage of the interaction currently being traced."""
+    trace = _current_trace.get()
+    if trace is None:
+        return _NOOP_SPAN
+    return trace.span(name)
+
+
+def traced(command: str):
+    """Decorator for cog slash commands: wraps the call in a sampled trace."""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, interaction, *args, **kwargs):
+            trace = tracer.start(command, interaction.guild_id, interaction.user.id)
+            if trace is None:
+                return await func(self, interaction, *args, **kwargs)
+            token = _current_trace.set(trace)
+            try:
+                return await func(self, interaction, *args, **kwargs)
+            except Exception as e:
+                trace.error = type(e).__name__
+                raise
+            finally:
+                _current_trace.reset(token)
+                tracer.finish(trace)
+        return wrapper
+    return decorator
+
+
+def format_trace(trace: Trace) -> str:
+    """Render a trace as a compact per-stage breakdown."""
+    lines = [f"{trace.duration_ms:8.1f} ms  /{trace.command}  guild={trace.guild_id}  id={trace.trace_id}"]
+    for s in trace.spans:
+        d = s.to_dict()
+        flag = f"  !{s.error}" if s.error else ""
+        lines.append(f"    +{d['offset_ms']:7.1f}  {s.name:<12} {d['duration_ms']:8.1f} ms{flag}")
+    return "\n".join(lines)
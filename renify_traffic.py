@@ -0,0 +1,138 @@
+"""
+Renify – Opt-in recorder for incoming interaction traffic.
+
+Writes a privacy-scrubbed stream of slash commands and button presses
+(command, option shapes, guild and arrival time) to a compact gzip'd JSONL
+file that ``tools/replay.py`` can feed back through the cogs for capacity
+planning. Guild and user IDs are replaced by salted pseudonyms and free-text
+queries are reduced to their shape plus a salted hash, so repeated searches
+stay repeated without storing what anyone searched for.
+"""
+import gzip
+import hashlib
+import hmac
+import json
+import logging
+import os
+import queue
+import re
+import secrets
+import threading
+from time import time
+
+import discord
+
+logger = logging.getLogger('RenifyBot.traffic')
+
+# --- CONFIGURATION ---
+RECORD_TRAFFIC_FILE = os.getenv("RENIFY_RECORD_TRAFFIC", "")  # Empty = recording disabled
+
+_URL_KINDS = (
+    ('youtube_playlist', re.compile(r'(youtube\.com|youtu\.be)/.*[?&]list=', re.I)),
+    ('youtube', re.compile(r'(youtube\.com|youtu\.be)/', re.I)),
+    ('spotify_playlist', re.compile(r'open\.spotify\.com/(playlist|album)/', re.I)),
+    ('spotify', re.compile(r'open\.spotify\.com/', re.I)),
+    ('soundcloud_playlist', re.compile(r'soundcloud\.com/[^/]+/sets/', re.I)),
+    ('soundcloud', re.compile(r'soundcloud\.com/', re.I)),
+    ('bandcamp', re.compile(r'bandcamp\.com/', re.I)),
+)
+
+_SUBCOMMAND_TYPES = (discord.AppCommandOptionType.subcommand.value,
+                     discord.AppCommandOptionType.subcommand_group.value)
+
+
+class TrafficRecorder:
+    """Buffers scrubbed interaction records and appends them from a background thread."""
+
+    def __init__(self, path: str = RECORD_TRAFFIC_FILE):
+        self.path = path
+        self.enabled = bool(path)
+        self.started = time()
+        self._salt = secrets.token_bytes(16)  # New per run, so pseudonyms can't be joined across recordings
+        self._writes: queue.SimpleQueue = queue.SimpleQueue()
+        self._writer: threading.Thread | None = None
+        if self.enabled:
+            logger.info(f"🎙️ Recording scrubbed interaction traffic to {path}")
+
+    def pseudonym(self, value) -> str:
+        return hmac.new(self._salt, str(value).encode(), hashlib.sha256).hexdigest()[:10]
+
+    def scrub_query(self, query: str) -> dict:
+        """Reduce a /play query to its shape: kind, length and a salted hash."""
+        query = query.strip()
+        kind = 'text'
+        if query.lower().startswith(('http://', 'https://')):
+            kind = next((name for name, pattern in _URL_KINDS if pattern.search(query)), 'url')
+        return {'kind': kind, 'len': len(query), 'h': self.pseudonym(query.lower())}
+
+    def scrub_options(self, options: list[dict]) -> dict:
+        scrubbed = {}
+        for option in options:
+            name, value = option.get('name'), option.get('value')
+            if name == 'query' and isinstance(value, str):
+                scrubbed[name] = self.scrub_query(value)
+            elif isinstance(value, (bool, int, float)):
+                scrubbed[name] = value
+            else:
+                scrubbed[name] = {'kind': 'text', 'len': len(str(value)), 'h': self.pseudonym(value)}
+        return scrubbed
+
+    def record(self, interaction):
+        """Record one incoming interaction. Cheap no-op while recording is disabled."""
+        if not self.enabled:
+            return
+        # Autocomplete requests carry a command name too; replaying each keystroke as a /play would be wrong
+        if interaction.type not in (discord.InteractionType.application_command, discord.InteractionType.component):
+            return
+        data = interaction.data or {}
+        entry = {
+            't': round(time() - self.started, 3),
+            'g': self.pseudonym(interaction.guild_id) if interaction.guild_id else None,
+            'u': self.pseudonym(interaction.user.id),
+        }
+        if interaction.type is discord.InteractionType.component:
+            entry['k'] = 'button'
+            entry['n'] = data['custom_id']
+        elif 'name' in data:
+            # Store the full sub-command path ("playlist save") with that sub-command's own options
+            name, options = data['name'], data.get('options', [])
+            while options and options[0].get('type') in _SUBCOMMAND_TYPES:
+                name, options = f"{name} {options[0]['name']}", options[0].get('options', [])
+            entry['k'] = 'command'
+            entry['n'] = name
+            entry['o'] = self.scrub_options(options)
+        else:
+            return
+        self._ensure_writer()
+        self._writes.put(entry)
+
+    def _ensure_writer(self):
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(target=self._write_loop, name='renify-traffic-writer', daemon=True)
+            self._writer.start()
+
+    def _write_loop(self):
+        # Each batch is its own gzip member, so a crash never corrupts earlier records
+        while True:
+            batch = [self._writes.get()]
+            while not self._writes.empty() and len(batch) < 1024:
+                batch.append(self._writes.get())
+            try:
+                with gzip.open(self.path, 'at', encoding='utf-8') as f:
+                    f.writelines(json.dumps(e, separators=(',', ':')) + '\n' for e in batch)
+            except OSError as e:
+                logger.error(f"Failed to write traffic records to {self.path}: {e}")
+
+
+def read_traffic(path: str):
+    """Yield recorded entries in order, tolerating a truncated final batch."""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        try:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        except (EOFError, gzip.BadGzipFile):
+            logger.warning(f"{path} ends with a truncated batch; replaying what was complete")
+
+
+traffic_recorder = TrafficRecorder()
@@ -0,0 +1,86 @@
+"""
+Renify – Event-loop lag watchdog.
+
+A tiny coroutine wakes every ``TICK`` seconds and records how late it woke
+up; that lateness is the event-loop lag every interaction ack and gateway
+heartbeat also suffers, and it is exported as a metric. A watchdog thread
+checks the coroutine's last tick; once the loop has been stuck for
+``LAG_THRESHOLD`` seconds it logs the loop thread's current stack, i.e. the
+exact synchronous call that is blocking it, once per stall.
+"""
+import asyncio
+import logging
+import os
+import sys
+import threading
+import traceback
+from time import monotonic, sleep
+
+from renify_metrics import metrics
+
+logger = logging.getLogger('RenifyBot.watchdog')
+
+# --- CONFIGURATION ---
+LAG_THRESHOLD = float(os.getenv("RENIFY_LOOP_LAG_THRESHOLD", 0.5))  # Seconds blocked before the stack is logged; 0 disables
+TICK = 0.1
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class LoopWatchdog:
+    """Measures loop lag from the loop and reports blocking calls from a thread."""
+
+    def __init__(self, threshold: float = LAG_THRESHOLD, tick: float = TICK):
+        self.threshold = threshold
+        self.tick = tick
+        self.last_tick = monotonic()
+        self.stalls = 0
+        self._loop_thread: int | None = None
+        self._task: asyncio.Task | None = None
+        self._thread: threading.Thread | None = None
+        self._lag = metrics.histogram('renify_event_loop_lag_seconds', "How late the event loop ran a scheduled wake-up", LAG_BUCKETS)
+        self._max_lag = metrics.gauge('renify_event_loop_max_lag_seconds', "Worst event loop lag seen since start")
+        self._stalls = metrics.counter('renify_event_loop_stalls_total', "Times the loop was blocked past the threshold")
+
+    def start(self):
+        """Start measuring on the running loop (idempotent); a threshold of 0 disables the watchdog."""
+        if self.threshold <= 0 or (self._task is not None and not self._task.done()):
+            return
+        self._loop_thread = threading.get_ident()
+        self.last_tick = monotonic()
+        self._task = asyncio.create_task(self._measure())
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._watch, name='renify-loop-watchdog', daemon=True)
+            self._thread.start()
+
+    async def _measure(self):
+        worst = 0.0
+        while True:
+            expected = monotonic() + self.tick
+            await asyncio.sleep(self.tick)
+            now = monotonic()
+            lag = max(0.0, now - expected)
+            self.last_tick = now
+            self._lag.observe(lag)
+            if lag > worst:
+                worst = lag
+                self._max_lag.set(worst)
+
+    def _watch(self):
+        reported = None
+        while True:
+            sleep(self.tick)
+            last = self.last_tick
+            blocked = monotonic() - last
+            if blocked < self.threshold or reported == last or self._task is None or self._task.done():
+                continue
+            reported = last  # One report per stall
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            self.stalls += 1
+            self._stalls.inc()
+            stack = "".join(traceback.format_stack(frame))
+            logger.warning(f"🐌 Event loop blocked for {blocked:.2f}s; loop thread is at:\n{stack}")
+
+
+loop_watchdog = LoopWatchdog()
@@ -0,0 +1,60 @@
+"""AdmissionController: tier-ordered hand-over of search slots, timeouts and try_acquire."""
+import asyncio
+
+import pytest
+
+from renify_admission import HEADSTART, AdmissionController, SearchOverloaded
+
+
+def test_higher_tiers_get_a_head_start():
+    now = [0.0]
+    admission = AdmissionController(limit=1, max_wait=5, clock=lambda: now[0])
+    order = []
+
+    async def search(name: str, weight: int, arrival: float):
+        now[0] = arrival
+        await admission.acquire(weight)
+        order.append(name)
+        admission.release()
+
+    async def burst():
+        await admission.acquire()
+        waiters = []
+        for name, weight, arrival in (('free early', 1, 0.0), ('free late', 1, 1.0),
+                                      ('premium', 2, HEADSTART - 0.5), ('diamond', 3, 2 * HEADSTART + 1)):
+            waiters.append(asyncio.create_task(search(name, weight, arrival)))
+            await asyncio.sleep(0)  # Let it join the queue before the next one arrives
+        assert admission.waiting == 4
+        admission.release()
+        await asyncio.gather(*waiters)
+
+    asyncio.run(burst())
+    # Priorities are arrival minus the head start: premium -0.5, free 0.0, free 1.0, diamond 1.0 (queued later)
+    assert order == ['premium', 'free early', 'free late', 'diamond']
+    assert (admission.active, admission.waiting) == (0, 0)
+
+
+def test_queued_search_times_out():
+    admission = AdmissionController(limit=1, max_wait=0.01)
+
+    async def overloaded():
+        await admission.acquire()
+        with pytest.raises(SearchOverloaded):
+            await admission.acquire()
+        assert admission.waiting == 0
+        admission.release()
+
+    asyncio.run(overloaded())
+    # The timed-out waiter must not be handed the freed slot
+    assert admission.active == 0
+    assert admission.try_acquire()
+
+
+def test_try_acquire_never_queues():
+    admission = AdmissionController(limit=2)
+    assert admission.try_acquire()
+    assert admission.try_acquire()
+    assert not admission.try_acquire()
+    assert (admission.active, admission.waiting) == (2, 0)
+    admission.release()
+    assert admission.try_acquire(tier="PREMIUM")
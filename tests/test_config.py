@@ -0,0 +1,139 @@
+"""Runtime config overrides, and Lavalink node diffing in ``sync_nodes`` against a fake pool."""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+import wavelink
+
+import renify_config
+from renify_config import RuntimeConfig, sync_nodes
+
+A, B = "http://node-a:2333", "http://node-b:2333"
+
+
+def config(nodes, password="secret") -> RuntimeConfig:
+    return RuntimeConfig(tier_limits={'FREE': 50}, tier_weights={'FREE': 1}, command_cooldown=1.0,
+                         max_calls_per_window=5, max_query_length=200, lavalink_nodes=nodes,
+                         lavalink_password=password)
+
+
+def test_partial_tier_override_keeps_other_tiers():
+    defaults = RuntimeConfig(tier_limits={'FREE': 500, 'PREMIUM': 5000, 'DIAMOND': None},
+                             tier_weights={'FREE': 1, 'PREMIUM': 2, 'DIAMOND': 3}, command_cooldown=1.0,
+                             max_calls_per_window=5, max_query_length=200, lavalink_nodes=[A],
+                             lavalink_password="secret")
+    new = defaults.with_overrides({'tier_limits': {'FREE': 100}, 'tier_weights': {'DIAMOND': 5}})
+    assert new.tier_limits == {'FREE': 100, 'PREMIUM': 5000, 'DIAMOND': None}
+    assert new.tier_weights == {'FREE': 1, 'PREMIUM': 2, 'DIAMOND': 5}
+    assert defaults.tier_limits['FREE'] == 500
+
+
+class FakeNode:
+    """An already connected node in the pool."""
+
+    def __init__(self, pool: dict, identifier: str, uri: str):
+        self.pool = pool
+        self.identifier = identifier
+        self.uri = uri
+        self.status = wavelink.NodeStatus.CONNECTED
+        self.players = {}
+        self.closed = False
+
+    async def close(self, eject: bool = False):
+        self.closed = True
+        self.pool.pop(self.identifier, None)
+
+
+class FakePlayer:
+    def __init__(self, guild_id: int):
+        self.guild = SimpleNamespace(id=guild_id)
+        self.node = None
+
+    async def switch_node(self, node):
+        self.node = node
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    """Stands in for wavelink.Pool; ``pool.reachable`` decides whether new nodes connect."""
+    nodes: dict = {}
+    state = SimpleNamespace(nodes=nodes, reachable=True, connected=[])
+
+    async def connect(*, client, nodes: list):
+        for node in nodes:
+            node._status = wavelink.NodeStatus.CONNECTED if state.reachable else wavelink.NodeStatus.DISCONNECTED
+            if state.reachable:
+                state.nodes[node.identifier] = node
+            state.connected.append(node)
+        return state.nodes
+
+    monkeypatch.setattr(wavelink.Pool, '_Pool__nodes', nodes)
+    monkeypatch.setattr(wavelink.Pool, 'connect', connect)
+    monkeypatch.setattr(renify_config, '_retiring', {})
+    monkeypatch.setattr(renify_config, '_retry_task', None)
+    return state
+
+
+def run(pool, coro):
+    async def main():
+        try:
+            await coro
+        finally:
+            task = renify_config._retry_task
+            if task is not None:
+                task.cancel()
+            for node in pool.connected:
+                await node._session.close()
+    asyncio.run(main())
+
+
+def test_unchanged_config_does_nothing(pool):
+    node = pool.nodes['old'] = FakeNode(pool.nodes, 'old', A)
+    run(pool, sync_nodes(None, config([A]), config([A])))
+    assert pool.connected == [] and not node.closed
+
+
+def test_swapped_node_moves_players_then_closes(pool):
+    old = pool.nodes['old'] = FakeNode(pool.nodes, 'old', A)
+    player = old.players[1] = FakePlayer(1)
+    run(pool, sync_nodes(None, config([A]), config([B])))
+    assert [node.uri for node in pool.connected] == [B]
+    assert player.node is pool.connected[0]
+    assert old.closed and 'old' not in pool.nodes
+    assert renify_config._retiring == {}
+
+
+def test_added_node_keeps_existing(pool):
+    old = pool.nodes['old'] = FakeNode(pool.nodes, 'old', A)
+    run(pool, sync_nodes(None, config([A]), config([A, B])))
+    assert [node.uri for node in pool.connected] == [B]
+    assert not old.closed
+
+
+def test_password_change_replaces_every_node(pool):
+    old = pool.nodes['old'] = FakeNode(pool.nodes, 'old', A)
+    run(pool, sync_nodes(None, config([A]), config([A], password="rotated")))
+    replacement, = pool.connected
+    assert replacement.uri == A and replacement.password == "rotated"
+    assert old.closed and list(pool.nodes) == [replacement.identifier]
+
+
+def test_node_is_kept_until_a_replacement_connects(pool):
+    pool.reachable = False
+    old = pool.nodes['old'] = FakeNode(pool.nodes, 'old', A)
+
+    async def swap():
+        await sync_nodes(None, config([A]), config([B]))
+        assert renify_config._retry_task is not None
+
+    run(pool, swap())
+    assert not old.closed
+    assert renify_config._retiring == {'old': old}
+
+
+def test_node_added_back_is_no_longer_retired(pool):
+    old = pool.nodes['old'] = FakeNode(pool.nodes, 'old', A)
+    renify_config._retiring['old'] = old
+    run(pool, sync_nodes(None, config([B]), config([A, B])))
+    assert renify_config._retiring == {}
+    assert not old.closed
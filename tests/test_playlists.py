@@ -0,0 +1,51 @@
+"""Saved playlists: local track decoding and the packed row format."""
+import asyncio
+import base64
+
+from benchmarks.fakes import encode_track, make_track_payload, make_tracks
+from renify_playlists import PlaylistStore, decode_track, pack, unpack
+
+
+def test_decode_track_matches_lavalink_payload():
+    payload = make_track_payload(7, source="soundcloud")
+    decoded = decode_track(payload["encoded"])
+    assert decoded["encoded"] == payload["encoded"]
+    assert decoded["info"] == {**payload["info"], "isSeekable": True}
+
+
+def test_decode_track_reads_optional_fields_and_streams():
+    info = {**make_track_payload(1)["info"], "title": "Live – 日本 🎵", "isStream": True,
+            "artworkUrl": None, "isrc": "USRC17607839"}
+    decoded = decode_track(encode_track(info))["info"]
+    assert decoded["title"] == "Live – 日本 🎵"
+    assert (decoded["isStream"], decoded["isSeekable"]) == (True, False)
+    assert (decoded["artworkUrl"], decoded["isrc"]) == (None, "USRC17607839")
+
+
+def test_decode_track_rejects_what_it_cannot_read():
+    encoded = make_track_payload(1)["encoded"]
+    raw = base64.b64decode(encoded)
+    assert decode_track("not base64!") is None
+    assert decode_track(base64.b64encode(raw[:-10]).decode()) is None  # Length header no longer matches
+    assert decode_track(base64.b64encode(raw[:4] + bytes([9]) + raw[5:]).decode()) is None  # Unknown version
+
+
+def test_pack_round_trip():
+    encoded = [track.encoded for track in make_tracks(50)]
+    assert unpack(pack(encoded)) == encoded
+    assert unpack(pack([])) == []
+
+
+def test_store_save_and_load(tmp_path):
+    store = PlaylistStore(f"sqlite:///{tmp_path / 'playlists.db'}")
+    tracks = make_tracks(20)
+
+    async def round_trip():
+        replaced = await store.save(1, "Road Trip", tracks)
+        return replaced, await store.load(1, "road trip"), await store.load(2, "Road Trip")
+
+    replaced, (name, loaded), missing = asyncio.run(round_trip())
+    assert not replaced
+    assert name == "Road Trip"
+    assert [t.encoded for t in loaded] == [t.encoded for t in tracks]
+    assert missing is None
@@ -0,0 +1,220 @@
+"""ChunkedList against a plain list, and RenifyQueue's fair-mode ordering and editing."""
+import random
+from collections import Counter
+
+import pytest
+
+from benchmarks.fakes import make_tracks
+from renify_queue import ChunkedList, RenifyQueue, requester_of, track_key
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    # Tiny chunks so a few dozen items already span many chunks
+    monkeypatch.setattr(ChunkedList, 'LOAD', 8)
+
+
+def test_matches_list_under_random_edits(small_chunks):
+    rng = random.Random(0)
+    chunked, expected = ChunkedList(range(50)), list(range(50))
+    for step in range(2000):
+        op = rng.choice(('insert', 'pop', 'set', 'del_slice', 'append'))
+        if op == 'insert':
+            index = rng.randint(-len(expected) - 2, len(expected) + 2)
+            chunked.insert(index, step)
+            expected.insert(index, step)
+        elif op == 'pop' and expected:
+            index = rng.randrange(-len(expected), len(expected))
+            assert chunked.pop(index) == expected.pop(index)
+        elif op == 'set' and expected:
+            index = rng.randrange(len(expected))
+            chunked[index] = expected[index] = -step
+        elif op == 'del_slice':
+            start, stop = sorted(rng.randint(0, len(expected)) for _ in range(2))
+            del chunked[start:stop]
+            del expected[start:stop]
+        else:
+            chunked.append(step)
+            expected.append(step)
+        assert len(chunked) == len(expected)
+    assert list(chunked) == expected
+    assert list(reversed(chunked)) == expected[::-1]
+    assert [chunked[i] for i in range(-len(expected), len(expected))] == expected + expected
+
+
+def test_slices_and_index(small_chunks):
+    chunked = ChunkedList(range(20))
+    assert chunked[3:11:2] == list(range(20))[3:11:2]
+    assert chunked.index(7) == 7
+    with pytest.raises(ValueError):
+        chunked.index(99)
+    with pytest.raises(IndexError):
+        chunked[20]
+
+
+def test_bisect_right_with_key(small_chunks):
+    chunked = ChunkedList([1, 1, 2, 2, 2, 5, 8])
+    assert chunked.bisect_right(2) == 5
+    assert chunked.bisect_right(0) == 0
+    assert chunked.bisect_right(9) == 7
+    keyed = ChunkedList([(1, 'a'), (3, 'b'), (3, 'c'), (4, 'd')])
+    assert keyed.bisect_right(3, key=lambda item: item[0]) == 3
+
+
+def test_copy_is_independent(small_chunks):
+    chunked = ChunkedList(range(10))
+    copy = chunked.copy()
+    copy.append(10)
+    del chunked[0]
+    assert list(copy) == list(range(11))
+    assert list(chunked) == list(range(1, 10))
+
+
+# --- FAIR MODE ---
+
+def _requested(tracks, requester_id):
+    for track in tracks:
+        track.extras = {'requester_id': requester_id}
+    return tracks
+
+
+def _requesters(queue) -> list:
+    return [requester_of(track) for track in queue]
+
+
+def test_fair_queue_takes_turns():
+    queue = RenifyQueue(fair=True)
+    queue.put(_requested(make_tracks(3), 'a'))
+    queue.put(_requested(make_tracks(2, start=3), 'b'))
+    assert _requesters(queue) == ['a', 'b', 'a', 'b', 'a']
+
+
+def test_fair_queue_respects_weights():
+    queue = RenifyQueue(fair=True, weight_for=lambda requester: 2 if requester == 'vip' else 1)
+    queue.put(_requested(make_tracks(2), 'a'))
+    queue.put(_requested(make_tracks(4, start=2), 'vip'))
+    assert _requesters(queue) == ['vip', 'a', 'vip', 'vip', 'a', 'vip']
+
+
+def test_fair_queue_newcomer_starts_at_current_turn():
+    queue = RenifyQueue(fair=True)
+    queue.put(_requested(make_tracks(4), 'a'))
+    queue.get()
+    queue.get()
+    # Tags restart from the virtual time of what has played, not from zero
+    queue.put(_requested(make_tracks(1, start=4), 'b'))
+    assert _requesters(queue) == ['a', 'b', 'a']
+
+
+def test_set_fair_rebalances_keeping_each_requesters_order():
+    queue = RenifyQueue(fair=False)
+    a = _requested(make_tracks(3), 'a')
+    b = _requested(make_tracks(3, start=3), 'b')
+    queue.put(a)
+    queue.put(b)
+    queue.set_fair(True)
+    assert list(queue) == [a[0], b[0], a[1], b[1], a[2], b[2]]
+
+
+def test_fair_shuffle_keeps_taking_turns():
+    queue = RenifyQueue(fair=True)
+    a = _requested(make_tracks(3), 'a')
+    queue.put(a)
+    queue.put(_requested(make_tracks(3, start=3), 'b'))
+    queue.shuffle()
+    assert _requesters(queue) == ['a', 'b', 'a', 'b', 'a', 'b']
+    assert sorted(t.identifier for t in queue if requester_of(t) == 'a') == sorted(t.identifier for t in a)
+
+
+def test_fair_move_takes_the_tag_of_its_new_slot():
+    queue = RenifyQueue(fair=True)
+    queue.put(_requested(make_tracks(2), 'a'))
+    queue.put(_requested(make_tracks(2, start=2), 'b'))
+    moved = queue.move(3, 0)
+    assert moved.fair_tag == 0.0
+    moved = queue.move(1, 2)
+    assert moved.fair_tag == queue[1].fair_tag
+    # A newcomer still lands after everything tagged up to its own first turn
+    late = _requested(make_tracks(1, start=4), 'c')[0]
+    queue.put(late)
+    assert queue[3] is late
+
+
+# --- EDITING ---
+
+def _keys(queue) -> dict:
+    return dict(Counter(map(track_key, queue)))
+
+
+def test_remove_range(small_chunks):
+    tracks = make_tracks(40)
+    queue = RenifyQueue()
+    queue.put(tracks)
+    assert queue.remove_range(5, 30) == 25
+    assert list(queue) == tracks[:5] + tracks[30:]
+    assert queue.remove_range(10, 99) == 5
+    assert queue.remove_range(3, 3) == 0
+    assert list(queue) == tracks[:5] + tracks[30:35]
+    assert queue._items.counts == _keys(queue)
+
+
+def test_move(small_chunks):
+    tracks = make_tracks(30)
+    queue = RenifyQueue()
+    queue.put(tracks)
+    assert queue.move(2, 25) is tracks[2]
+    assert queue.move(29, 0) is tracks[29]
+    expected = tracks[:]
+    expected.insert(25, expected.pop(2))
+    expected.insert(0, expected.pop(29))
+    assert list(queue) == expected
+    assert queue._items.counts == _keys(queue)
+
+
+def test_skip_to(small_chunks):
+    tracks = make_tracks(30)
+    queue = RenifyQueue()
+    queue.put(tracks)
+    assert queue.skip_to(20) is tracks[20]
+    assert list(queue) == tracks[21:]
+    assert not queue.is_queued(tracks[20])
+    assert queue._items.counts == _keys(queue)
+    for index in (-1, len(queue)):
+        with pytest.raises(IndexError):
+            queue.skip_to(index)
+    assert list(queue) == tracks[21:]
+
+
+def test_counts_follow_duplicates(small_chunks):
+    tracks = make_tracks(10)
+    queue = RenifyQueue()
+    queue.put(tracks + tracks[:3])
+    assert queue._items.counts[track_key(tracks[0])] == 2
+    queue.remove_range(0, 2)
+    queue.shuffle()
+    assert queue._items.counts == _keys(queue)
+    queue.clear()
+    assert queue._items.counts == {}
+
+
+# --- DUPLICATES ---
+
+def test_is_queued():
+    tracks = make_tracks(3)
+    queue = RenifyQueue()
+    queue.put(tracks[:2])
+    assert queue.is_queued(tracks[0])
+    assert queue.is_queued(make_tracks(1)[0])  # Same source and identifier, different object
+    assert not queue.is_queued(tracks[2])
+    queue.get()
+    assert not queue.is_queued(tracks[0])
+
+
+def test_filter_new_drops_queued_and_repeated_tracks():
+    tracks = make_tracks(6)
+    queue = RenifyQueue()
+    queue.put(tracks[:2])
+    fresh, dropped = queue.filter_new(tracks[1:5] + tracks[3:4], exclude=[tracks[4], None])
+    assert fresh == tracks[2:4]
+    assert dropped == 3
+    assert queue.filter_new([]) == ([], 0)
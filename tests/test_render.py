@@ -0,0 +1,81 @@
+"""Embed and line fitting within Discord's limits."""
+import discord
+import pytest
+import wavelink
+
+from benchmarks.fakes import make_track_payload
+from renify_render import (EMBED_DESCRIPTION, EMBED_FIELDS, EMBED_TITLE, EMBED_TOTAL, FIELD_VALUE, clip,
+                           escape_author, escape_title, fit_embed, join_lines, track_line, track_title)
+
+
+def test_clip():
+    assert clip("short", 10) == "short"
+    assert clip("a long title", 6) == "a lon…"
+    assert clip("abc", 0) == ""
+
+
+def test_join_lines_keeps_everything_that_fits():
+    lines = ["one", "two", "three"]
+    assert join_lines(lines, limit=len("one\ntwo\nthree")) == "one\ntwo\nthree"
+
+
+def test_join_lines_drops_whole_lines_and_counts_them():
+    lines = [f"line {i:02}" for i in range(20)]
+    text = join_lines(lines, limit=50)
+    assert len(text) <= 50
+    kept = text.split("\n")
+    assert kept[:-1] == lines[:len(kept) - 1]
+    assert kept[-1] == f"…and {20 - (len(kept) - 1)} more"
+
+
+def test_fit_embed_leaves_small_embeds_alone():
+    embed = discord.Embed(title="Title", description="Body")
+    embed.add_field(name="Name", value="Value")
+    fit_embed(embed)
+    assert (embed.title, embed.description, embed.fields[0].name, embed.fields[0].value) == ("Title", "Body", "Name", "Value")
+
+
+def test_fit_embed_clips_each_part_to_its_own_limit():
+    embed = discord.Embed(title="t" * 1000, description="d" * 5000)
+    embed.add_field(name="n", value="v" * 2000)
+    for i in range(EMBED_FIELDS + 5):
+        embed.add_field(name=f"f{i}", value="x")
+    fit_embed(embed)
+    assert len(embed.title) == EMBED_TITLE and embed.title.endswith("…")
+    assert len(embed.description) == EMBED_DESCRIPTION
+    assert len(embed.fields[0].value) == FIELD_VALUE
+    assert len(embed.fields) <= EMBED_FIELDS
+    assert len(embed) <= EMBED_TOTAL
+
+
+@pytest.mark.parametrize('spare', range(6))
+def test_fit_embed_counts_placeholders_against_the_total(spare):
+    # The title, author, footer and description leave ``spare`` characters for the fields
+    embed = discord.Embed(title="t" * EMBED_TITLE, description="d" * EMBED_DESCRIPTION)
+    embed.set_author(name="a" * 256)
+    embed.set_footer(text="f" * (EMBED_TOTAL - EMBED_TITLE - EMBED_DESCRIPTION - 256 - spare))
+    for _ in range(3):
+        embed.add_field(name="", value="")
+    fit_embed(embed)
+    assert len(embed) <= EMBED_TOTAL
+    assert len(embed.fields) == min(3, spare // 2)
+    assert all(field.name and field.value for field in embed.fields)
+
+
+def test_track_text_is_escaped_and_cached():
+    payload = make_track_payload(0)
+    payload['info']['title'] = "[Live] *Song* " + "x" * 100
+    track = wavelink.Playable(payload)
+    line = track_line(track)
+    assert track_title(track).startswith("\\[Live\\] \\*Song\\*")
+    assert len(track_title(track)) < len(payload['info']['title'])
+    assert line.startswith(f"[{track_title(track)}]({track.uri})")
+    assert track_line(track) is line
+
+
+def test_escape_title_and_author():
+    # /history renders stored titles and authors, not tracks, so it escapes them directly
+    assert escape_title("**[Remix]** _v2_") == "\\*\\*\\[Remix\\]\\*\\* \\_v2\\_"
+    assert escape_title("abcdef", 4) == "abc…"
+    assert escape_author("DJ `Tick`") == "DJ 'Tick'"
+    assert escape_author("x" * 40, 5) == "xxxx…"
@@ -0,0 +1,65 @@
+"""GuildSettingsStore: shared first loads and coalesced write-behind."""
+import asyncio
+
+import pytest
+
+from renify_settings import GuildSettingsStore
+
+
+async def reload(store: GuildSettingsStore, *guild_ids: int):
+    return await asyncio.gather(*(store.get(guild_id) for guild_id in guild_ids))
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = GuildSettingsStore(f"sqlite:///{tmp_path / 'settings.db'}", flush_delay=0.5)
+    yield store
+    store.close()
+
+
+def test_changes_are_coalesced_per_guild(store, monkeypatch):
+    batches = []
+    write = store._write
+    monkeypatch.setattr(store, '_write', lambda rows: (batches.append(rows), write(rows)))
+
+    async def burst():
+        for volume in range(1, 101):
+            await store.update(1, volume=volume)
+        await store.update(2, fair_queue=True)
+        await store.update(1, dj_role_id=42)
+
+    asyncio.run(burst())
+    store.close()
+
+    rows = [row for batch in batches for row in batch]
+    assert sorted(row[0] for row in rows) == [1, 2]  # One row per guild for the whole burst
+    assert len(batches) == 1
+
+    reloaded = GuildSettingsStore(f"sqlite:///{store.path}")
+    first, second = asyncio.run(reload(reloaded, 1, 2))
+    assert (first.volume, first.dj_role_id, first.fair_queue) == (100, 42, False)
+    assert second.fair_queue is True
+
+
+def test_concurrent_first_uses_share_one_read(store, monkeypatch):
+    loads = []
+    load = store._load
+    monkeypatch.setattr(store, '_load', lambda guild_id: (loads.append(guild_id), load(guild_id))[1])
+
+    results = asyncio.run(reload(store, *[7] * 10))
+    assert loads == [7]
+    assert all(settings is results[0] for settings in results)
+    assert store.cached(7) is results[0]
+
+
+def test_unknown_setting_is_rejected(store):
+    with pytest.raises(TypeError):
+        asyncio.run(store.update(1, colour='blue'))
+    assert not store._dirty
+
+
+def test_without_a_database_settings_live_in_memory():
+    store = GuildSettingsStore("")
+    settings = asyncio.run(store.update(3, volume=50))
+    assert not store.enabled and store._writer is None
+    assert store.cached(3) is settings and settings.volume == 50
@@ -0,0 +1,63 @@
+"""Query classification and URL canonicalization."""
+import pytest
+
+from renify_sources import DEFAULT_SEARCH_SOURCE, PLAYLIST, SEARCH, TEXT, TRACK, canonical_url, classify
+
+
+@pytest.mark.parametrize('query, expected', [
+    ("https://www.youtube.com/watch?v=dQw4w9WgXcQ&si=abc&t=42", "https://www.youtube.com/watch?v=dQw4w9WgXcQ"),
+    ("https://youtu.be/dQw4w9WgXcQ?si=share", "https://www.youtube.com/watch?v=dQw4w9WgXcQ"),
+    ("https://m.youtube.com/shorts/dQw4w9WgXcQ", "https://www.youtube.com/watch?v=dQw4w9WgXcQ"),
+    ("youtube.com/watch?v=dQw4w9WgXcQ", "https://www.youtube.com/watch?v=dQw4w9WgXcQ"),
+    ("<https://www.youtube.com/watch?v=dQw4w9WgXcQ>", "https://www.youtube.com/watch?v=dQw4w9WgXcQ"),
+    ("https://music.youtube.com/watch?v=dQw4w9WgXcQ&feature=share", "https://music.youtube.com/watch?v=dQw4w9WgXcQ"),
+    ("https://open.spotify.com/intl-de/track/4uLU6hMCjMI75M1A2tKUQC?si=x", "https://open.spotify.com/track/4uLU6hMCjMI75M1A2tKUQC"),
+    ("spotify:track:4uLU6hMCjMI75M1A2tKUQC", "https://open.spotify.com/track/4uLU6hMCjMI75M1A2tKUQC"),
+    ("https://m.soundcloud.com/artist/song/", "https://soundcloud.com/artist/song"),
+    ("HTTPS://Artist.Bandcamp.com/track/song", "https://artist.bandcamp.com/track/song"),
+])
+def test_same_track_has_one_canonical_form(query, expected):
+    parsed = classify(query)
+    assert parsed.kind == TRACK
+    assert parsed.query == expected
+    assert parsed.search_source is None
+
+
+@pytest.mark.parametrize('query, expected', [
+    ("https://www.youtube.com/playlist?list=PL123", "https://www.youtube.com/playlist?list=PL123"),
+    ("https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PL123", "https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PL123"),
+    ("https://open.spotify.com/album/1DFixLWuPkv3KT3TnV35m3", "https://open.spotify.com/album/1DFixLWuPkv3KT3TnV35m3"),
+    ("https://soundcloud.com/artist/sets/mix", "https://soundcloud.com/artist/sets/mix"),
+    ("https://artist.bandcamp.com/album/record", "https://artist.bandcamp.com/album/record"),
+])
+def test_playlists(query, expected):
+    parsed = classify(query)
+    assert parsed.kind == PLAYLIST
+    assert parsed.query == expected
+
+
+def test_youtube_mix_loads_the_video_only():
+    parsed = classify("https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=RDdQw4w9WgXcQ")
+    assert (parsed.kind, parsed.query) == (TRACK, "https://www.youtube.com/watch?v=dQw4w9WgXcQ")
+
+
+def test_unknown_host_keeps_path_and_drops_tracking():
+    parsed = canonical_url("https://Example.com/a//b.mp3?utm_source=x&id=7&fbclid=y")
+    assert (parsed.kind, parsed.source) == (TRACK, 'url')
+    assert parsed.query == "https://example.com/a/b.mp3?id=7"
+
+
+def test_prefixed_search_passes_through():
+    parsed = classify("scsearch:  lofi beats ")
+    assert (parsed.kind, parsed.source, parsed.query) == (SEARCH, 'scsearch', "scsearch:lofi beats")
+
+
+def test_plain_text_is_searched_and_keyed_case_insensitively():
+    parsed = classify("  Never   Gonna Give You Up ")
+    assert (parsed.kind, parsed.query, parsed.search_source) == (TEXT, "Never Gonna Give You Up", DEFAULT_SEARCH_SOURCE)
+    assert parsed.key == classify("never gonna give you up").key
+    assert not parsed.is_url
+
+
+def test_text_with_spaces_is_not_a_link():
+    assert classify("example.com/song but with words").kind == TEXT
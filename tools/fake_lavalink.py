@@ -0,0 +1,439 @@
+"""
+Local stand-in Lavalink v4 server for deterministic load and failover tests.
+
+Implements the REST and websocket endpoints ``wavelink.Node`` uses:
+``/v4/websocket`` (ready, stats, playerUpdate and track events),
+``/v4/loadtracks``, ``/v4/sessions/{id}/players/{guild}``, ``/v4/info``,
+``/v4/stats``, ``/v4/decodetrack(s)`` and ``/version``. Searches and URLs are
+answered from a canned catalog, and latency, errors and node stats are all
+configurable, so no JVM and no network access are needed.
+
+Usage (from the repository root):
+    python -m tools.fake_lavalink --port 2333 --latency-ms 40 --error-rate 0.01
+    LAVALINK_HOST=127.0.0.1 python renify_core.py
+
+Run two instances on different ports and point ``LAVALINK_NODES`` at both
+to exercise node failover.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import uuid
+import zlib
+from time import time
+
+from aiohttp import web
+
+from benchmarks.fakes import encode_track, make_track_payload
+from renify_playlists import decode_track
+
+logger = logging.getLogger('RenifyBot.fake_lavalink')
+
+SEARCH_PREFIXES = ('ytsearch:', 'ytmsearch:', 'scsearch:', 'spsearch:', 'amsearch:', 'dzsearch:', 'bcsearch:')
+PLAYLIST_MARKERS = ('list=', '/playlist', '/album', '/sets/')
+
+
+class FakeLavalinkConfig:
+    """Behaviour knobs for the fake server. All latencies are in milliseconds."""
+
+    def __init__(self, password: str = "renifythoushallnotpass", catalog_size: int = 5000,
+                 catalog_path: str | None = None, latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 error_rate: float = 0.0, load_error_rate: float = 0.0, empty_rate: float = 0.0,
+                 track_exception_rate: float = 0.0, playlist_size: int = 100, search_results: int = 5,
+                 time_scale: float = 1.0, stats_interval: float = 60.0, update_interval: float = 5.0,
+                 cpu_cores: int = 4, system_load: float = 0.1, lavalink_load: float = 0.05,
+                 memory_used: int = 256 * 1024 * 1024, seed: int = 0, spotify: bool = False):
+        self.password = password
+        self.catalog_size = catalog_size
+        self.catalog_path = catalog_path
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.load_error_rate = load_error_rate
+        self.empty_rate = empty_rate
+        self.track_exception_rate = track_exception_rate
+        self.playlist_size = playlist_size
+        self.search_results = search_results
+        self.time_scale = time_scale  # 0.01 = tracks finish 100x faster than real time
+        self.stats_interval = stats_interval
+        self.update_interval = update_interval
+        self.cpu_cores = cpu_cores
+        self.system_load = system_load
+        self.lavalink_load = lavalink_load
+        self.memory_used = memory_used
+        self.seed = seed
+        self.spotify = spotify
+
+
+class FakePlayerState:
+    """Server-side state of one guild player."""
+
+    def __init__(self, guild_id: str):
+        self.guild_id = guild_id
+        self.track: dict | None = None
+        self.paused = False
+        self.volume = 100
+        self.voice: dict = {}
+        self.filters: dict = {}
+        self.started_at = 0.0
+        self.position = 0
+        self.end_task: asyncio.Task | None = None
+
+    def current_position(self) -> int:
+        if self.track is None:
+            return 0
+        if self.paused:
+            return self.position
+        return self.position + int((time() - self.started_at) * 1000)
+
+    def to_dict(self) -> dict:
+        return {
+            'guildId': self.guild_id,
+            'track': self.track,
+            'volume': self.volume,
+            'paused': self.paused,
+            'state': {'time': int(time() * 1000), 'position': self.current_position(), 'connected': bool(self.voice), 'ping': 1},
+            'voice': self.voice,
+            'filters': self.filters,
+        }
+
+
+class FakeSession:
+    """One websocket client (one ``wavelink.Node``) and its players."""
+
+    def __init__(self, ws: web.WebSocketResponse):
+        self.session_id = uuid.uuid4().hex[:16]
+        self.ws = ws
+        self.players: dict[str, FakePlayerState] = {}
+        self.resuming = False
+        self.timeout = 60
+
+    async def send(self, payload: dict):
+        if not self.ws.closed:
+            await self.ws.send_json(payload)
+
+
+class FakeLavalink:
+    """The fake server: catalog, sessions and HTTP application."""
+
+    def __init__(self, config: FakeLavalinkConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.started_at = time()
+        self.sessions: dict[str, FakeSession] = {}
+        self.catalog: list[dict] = self._load_catalog()
+        self.by_identifier = {t['info']['identifier']: t for t in self.catalog}
+        self.by_encoded = {t['encoded']: t for t in self.catalog}
+        self.requests = 0
+        self._runner: web.AppRunner | None = None
+
+    def _load_catalog(self) -> list[dict]:
+        if not self.config.catalog_path:
+            return [make_track_payload(i) for i in range(self.config.catalog_size)]
+        with open(self.config.catalog_path, encoding='utf-8') as f:
+            entries = json.load(f)
+        catalog = []
+        for i, entry in enumerate(entries):
+            payload = make_track_payload(i)
+            payload['info'].update(entry)
+            payload['encoded'] = encode_track(payload['info'])
+            catalog.append(payload)
+        return catalog
+
+    # --- Catalog lookups ---
+
+    def _pick(self, key: str, count: int) -> list[dict]:
+        """Deterministically map any query to catalog entries."""
+        start = zlib.crc32(key.encode()) % len(self.catalog)
+        return [self.catalog[(start + i) % len(self.catalog)] for i in range(count)]
+
+    def load(self, identifier: str) -> dict:
+        if self.config.empty_rate and self.rng.random() < self.config.empty_rate:
+            return {'loadType': 'empty', 'data': {}}
+        if self.config.load_error_rate and self.rng.random() < self.config.load_error_rate:
+            return {'loadType': 'error', 'data': {'message': 'Injected load failure', 'severity': 'common', 'cause': 'fake'}}
+
+        if identifier.startswith(SEARCH_PREFIXES):
+            term = identifier.split(':', 1)[1].strip().lower()
+            matches = [t for t in self.catalog if term in t['info']['title'].lower() or term in t['info']['author'].lower()]
+            return {'loadType': 'search', 'data': matches[:self.config.search_results] or self._pick(term, self.config.search_results)}
+
+        if any(marker in identifier for marker in PLAYLIST_MARKERS):
+            return {'loadType': 'playlist', 'data': {
+                'info': {'name': f"Fake Playlist {zlib.crc32(identifier.encode()) % 10000}", 'selectedTrack': -1},
+                'pluginInfo': {},
+                'tracks': self._pick(identifier, self.config.playlist_size),
+            }}
+
+        for part in identifier.replace('?', '/').replace('&', '/').replace('=', '/').split('/'):
+            if part in self.by_identifier:
+                return {'loadType': 'track', 'data': self.by_identifier[part]}
+        return {'loadType': 'track', 'data': self._pick(identifier, 1)[0]}
+
+    def decode(self, encoded: str) -> dict | None:
+        if encoded in self.by_encoded:
+            return self.by_encoded[encoded]
+        return decode_track(encoded)
+
+    def stats(self) -> dict:
+        players = sum(len(s.players) for s in self.sessions.values())
+        playing = sum(1 for s in self.sessions.values() for p in s.players.values() if p.track and not p.paused)
+        return {
+            'players': players,
+            'playingPlayers': playing,
+            'uptime': int((time() - self.started_at) * 1000),
+            'memory': {'free': 64 * 1024 * 1024, 'used': self.config.memory_used,
+                       'allocated': self.config.memory_used * 2, 'reservable': 1024 * 1024 * 1024},
+            'cpu': {'cores': self.config.cpu_cores, 'systemLoad': self.config.system_load,
+                    'lavalinkLoad': self.config.lavalink_load},
+        }
+
+    # --- Player lifecycle ---
+
+    async def _start_track(self, session: FakeSession, player: FakePlayerState, track: dict):
+        if player.track is not None:
+            await self._end_track(session, player, 'replaced')
+        player.track = track
+        player.position = 0
+        player.started_at = time()
+        await session.send({'op': 'event', 'type': 'TrackStartEvent', 'guildId': player.guild_id, 'track': track})
+        if self.config.track_exception_rate and self.rng.random() < self.config.track_exception_rate:
+            await session.send({'op': 'event', 'type': 'TrackExceptionEvent', 'guildId': player.guild_id, 'track': track,
+                                'exception': {'message': 'Injected playback failure', 'severity': 'common', 'cause': 'fake'}})
+            await self._end_track(session, player, 'loadFailed')
+            return
+        self._schedule_end(session, player)
+
+    def _schedule_end(self, session: FakeSession, player: FakePlayerState):
+        remaining = max(0, player.track['info']['length'] - player.current_position()) / 1000 * self.config.time_scale
+        player.end_task = asyncio.create_task(self._finish_later(session, player, remaining))
+
+    async def _finish_later(self, session: FakeSession, player: FakePlayerState, delay: float):
+        await asyncio.sleep(delay)
+        player.end_task = None
+        await self._end_track(session, player, 'finished')
+
+    async def _end_track(self, session: FakeSession, player: FakePlayerState, reason: str):
+        if player.end_task is not None and player.end_task is not asyncio.current_task():
+            player.end_task.cancel()
+        player.end_task = None
+        track, player.track = player.track, None
+        if track is not None:
+            await session.send({'op': 'event', 'type': 'TrackEndEvent', 'guildId': player.guild_id, 'track': track, 'reason': reason})
+
+    async def update_player(self, session: FakeSession, guild_id: str, data: dict, no_replace: bool) -> FakePlayerState:
+        player = session.players.setdefault(guild_id, FakePlayerState(guild_id))
+        if 'voice' in data:
+            player.voice = data['voice']
+        if 'volume' in data:
+            player.volume = data['volume']
+        if 'filters' in data:
+            player.filters = data['filters']
+        if 'paused' in data and data['paused'] != player.paused and player.track is not None:
+            if data['paused']:
+                player.position = player.current_position()
+                if player.end_task:
+                    player.end_task.cancel()
+                    player.end_task = None
+            else:
+                player.started_at = time()
+                self._schedule_end(session, player)
+        player.paused = data.get('paused', player.paused)
+
+        encoded = data['track'].get('encoded', ...) if isinstance(data.get('track'), dict) else data.get('encodedTrack', ...)
+        if encoded is None:
+            await self._end_track(session, player, 'stopped')
+        elif encoded is not ... and not (no_replace and player.track is not None):
+            track = self.decode(encoded)
+            if track is not None:
+                track = dict(track, userData=data['track'].get('userData', {}) if isinstance(data.get('track'), dict) else {})
+                await self._start_track(session, player, track)
+                if 'position' in data:
+                    player.position = data['position']
+        return player
+
+    async def destroy_player(self, session: FakeSession, guild_id: str):
+        player = session.players.pop(guild_id, None)
+        if player and player.end_task:
+            player.end_task.cancel()
+
+    # --- HTTP application ---
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        if request.headers.get('Authorization') != self.config.password:
+            return web.json_response(_error(401, 'Unauthorized', request.path), status=401)
+        self.requests += 1
+        if self.config.latency_ms or self.config.jitter_ms:
+            await asyncio.sleep(max(0.0, self.config.latency_ms + self.rng.uniform(-1, 1) * self.config.jitter_ms) / 1000)
+        if request.path != '/v4/websocket' and self.config.error_rate and self.rng.random() < self.config.error_rate:
+            return web.json_response(_error(500, 'Injected server error', request.path), status=500)
+        return await handler(request)
+
+    def _session(self, request: web.Request) -> FakeSession:
+        session = self.sessions.get(request.match_info['session_id'])
+        if session is None:
+            raise web.HTTPNotFound(text=json.dumps(_error(404, 'Session not found', request.path)),
+                                   content_type='application/json')
+        return session
+
+    async def handle_websocket(self, request: web.Request):
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        session = FakeSession(ws)
+        self.sessions[session.session_id] = session
+        logger.info(f"Client {request.headers.get('Client-Name')} connected, session {session.session_id}")
+        await session.send({'op': 'ready', 'resumed': False, 'sessionId': session.session_id})
+        pump = asyncio.create_task(self._pump(session))
+        try:
+            async for _ in ws:
+                pass  # Lavalink v4 clients never send anything over the websocket
+        finally:
+            pump.cancel()
+            for guild_id in list(session.players):
+                await self.destroy_player(session, guild_id)
+            self.sessions.pop(session.session_id, None)
+            logger.info(f"Session {session.session_id} closed")
+        return ws
+
+    async def _pump(self, session: FakeSession):
+        """Send periodic stats and playerUpdate ops like a real node."""
+        next_stats = 0.0
+        while not session.ws.closed:
+            now = time()
+            if now >= next_stats:
+                await session.send(dict(self.stats(), op='stats', frameStats=None))
+                next_stats = now + self.config.stats_interval
+            for player in list(session.players.values()):
+                await session.send({'op': 'playerUpdate', 'guildId': player.guild_id, 'state': player.to_dict()['state']})
+            await asyncio.sleep(self.config.update_interval)
+
+    async def handle_loadtracks(self, request: web.Request):
+        return web.json_response(self.load(request.query.get('identifier', '')))
+
+    async def handle_decodetrack(self, request: web.Request):
+        track = self.decode(request.query.get('encodedTrack', ''))
+        if track is None:
+            return web.json_response(_error(400, 'Invalid encoded track', request.path), status=400)
+        return web.json_response(track)
+
+    async def handle_decodetracks(self, request: web.Request):
+        tracks = [self.decode(encoded) for encoded in await request.json()]
+        return web.json_response([t for t in tracks if t is not None])
+
+    async def handle_get_players(self, request: web.Request):
+        return web.json_response([p.to_dict() for p in self._session(request).players.values()])
+
+    async def handle_get_player(self, request: web.Request):
+        player = self._session(request).players.get(request.match_info['guild_id'])
+        if player is None:
+            return web.json_response(_error(404, 'Player not found', request.path), status=404)
+        return web.json_response(player.to_dict())
+
+    async def handle_update_player(self, request: web.Request):
+        session = self._session(request)
+        no_replace = request.query.get('noReplace', 'false').lower() == 'true'
+        player = await self.update_player(session, request.match_info['guild_id'], await request.json(), no_replace)
+        return web.json_response(player.to_dict())
+
+    async def handle_destroy_player(self, request: web.Request):
+        await self.destroy_player(self._session(request), request.match_info['guild_id'])
+        return web.Response(status=204)
+
+    async def handle_update_session(self, request: web.Request):
+        session = self._session(request)
+        data = await request.json()
+        session.resuming = data.get('resuming', session.resuming)
+        session.timeout = data.get('timeout', session.timeout)
+        return web.json_response({'resuming': session.resuming, 'timeout': session.timeout})
+
+    async def handle_info(self, request: web.Request):
+        sources = ['youtube', 'soundcloud', 'bandcamp', 'http'] + (['spotify'] if self.config.spotify else [])
+        return web.json_response({
+            'version': {'semver': '4.0.0-fake', 'major': 4, 'minor': 0, 'patch': 0, 'preRelease': 'fake', 'build': None},
+            'buildTime': int(self.started_at * 1000),
+            'git': {'branch': 'fake', 'commit': 'fake', 'commitTime': int(self.started_at * 1000)},
+            'jvm': 'none', 'lavaplayer': 'fake',
+            'sourceManagers': sources, 'filters': [], 'plugins': [],
+        })
+
+    async def handle_stats(self, request: web.Request):
+        return web.json_response(dict(self.stats(), frameStats=None))
+
+    async def handle_version(self, request: web.Request):
+        return web.Response(text='4.0.0-fake')
+
+    def make_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        sessions = '/v4/sessions/{session_id}'
+        app.add_routes([
+            web.get('/v4/websocket', self.handle_websocket),
+            web.get('/v4/loadtracks', self.handle_loadtracks),
+            web.get('/v4/decodetrack', self.handle_decodetrack),
+            web.post('/v4/decodetracks', self.handle_decodetracks),
+            web.get(f'{sessions}/players', self.handle_get_players),
+            web.get(f'{sessions}/players/{{guild_id}}', self.handle_get_player),
+            web.patch(f'{sessions}/players/{{guild_id}}', self.handle_update_player),
+            web.delete(f'{sessions}/players/{{guild_id}}', self.handle_destroy_player),
+            web.patch(sessions, self.handle_update_session),
+            web.get('/v4/info', self.handle_info),
+            web.get('/v4/stats', self.handle_stats),
+            web.get('/version', self.handle_version),
+        ])
+        return app
+
+    async def start(self, host: str = '127.0.0.1', port: int = 2333):
+        """Start serving in the current event loop (for use from test harnesses)."""
+        self._runner = web.AppRunner(self.make_app())
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        logger.info(f"Fake Lavalink listening on http://{host}:{port} with {len(self.catalog)} catalog tracks")
+
+    async def stop(self):
+        """Drop every websocket session (clients see a node disconnect) and stop serving."""
+        for session in list(self.sessions.values()):
+            await session.ws.close()
+        await self._runner.cleanup()
+
+
+def _error(status: int, message: str, path: str) -> dict:
+    return {'timestamp': int(time() * 1000), 'status': status, 'error': message, 'message': message, 'path': path}
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Fake Lavalink v4 server for offline testing")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=2333)
+    parser.add_argument('--password', default='renifythoushallnotpass')
+    parser.add_argument('--catalog', dest='catalog_path', help="JSON list of track info objects (title, author, length, ...)")
+    parser.add_argument('--catalog-size', type=int, default=5000, help="Generated catalog size when --catalog is not given")
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Fraction of REST calls answered with HTTP 500")
+    parser.add_argument('--load-error-rate', type=float, default=0.0, help="Fraction of loads answered with loadType=error")
+    parser.add_argument('--empty-rate', type=float, default=0.0, help="Fraction of loads answered with loadType=empty")
+    parser.add_argument('--track-exception-rate', type=float, default=0.0)
+    parser.add_argument('--playlist-size', type=int, default=100)
+    parser.add_argument('--time-scale', type=float, default=1.0, help="Multiplier applied to track lengths")
+    parser.add_argument('--stats-interval', type=float, default=60.0)
+    parser.add_argument('--update-interval', type=float, default=5.0)
+    parser.add_argument('--cpu-cores', type=int, default=4)
+    parser.add_argument('--system-load', type=float, default=0.1)
+    parser.add_argument('--lavalink-load', type=float, default=0.05)
+    parser.add_argument('--spotify', action='store_true', help="Advertise the spotify source manager")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    host, port = args.host, args.port
+    options = vars(args)
+    del options['host'], options['port']
+    server = FakeLavalink(FakeLavalinkConfig(**options))
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    web.run_app(server.make_app(), host=host, port=port, print=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+Replay recorded interaction traffic through the cogs for capacity planning.
+
+Reads a stream written by ``renify_traffic.TrafficRecorder`` and feeds every
+command and button press through ``renify_core.MusicCog`` and
+``renify_controller.MusicControls`` at 1x, 10x or maximum speed. Searches go
+to a Lavalink node over HTTP (by default an in-process ``tools.fake_lavalink``
+server), while voice players are fakes, so a real Friday-night peak can be
+replayed on one box before a release.
+
+Usage (from the repository root):
+    python -m tools.replay traffic.jsonl.gz --speed 10
+    python -m tools.replay traffic.jsonl.gz --speed 0 --fake-latency-ms 80   # 0 = as fast as possible
+    python -m tools.replay traffic.jsonl.gz --lavalink http://127.0.0.1:2333
+"""
+import argparse
+import asyncio
+import atexit
+import logging
+import os
+import shutil
+import sys
+import tempfile
+from collections import defaultdict
+from time import perf_counter, time
+from types import SimpleNamespace
+
+# Recorded traffic carries real guild IDs; give the SQLite stores a throwaway file before
+# renify_core imports them so a replay never rewrites the bot's renify.db
+_DB_DIR = tempfile.mkdtemp(prefix='renify-replay-')
+atexit.register(shutil.rmtree, _DB_DIR, ignore_errors=True)
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_DB_DIR, 'renify.db')}"
+
+import wavelink
+from discord import app_commands
+
+import renify_controller
+import renify_core
+from benchmarks.fakes import FakeGuild, FakeInteraction, FakeUser
+from renify_tracing import tracer
+from renify_traffic import read_traffic
+from tools.fake_lavalink import FakeLavalink, FakeLavalinkConfig
+from tools.soak import percentile
+
+logger = logging.getLogger('RenifyBot.replay')
+
+# Admin commands that talk to Discord itself rather than to the music stack
+SKIPPED_COMMANDS = {'sync'}
+
+
+def synthesize_query(shape: dict) -> str:
+    """Turn a scrubbed query shape back into a query of the same kind for the fake catalog."""
+    h = shape.get('h', '0')
+    kind = shape.get('kind', 'text')
+    if kind == 'youtube_playlist':
+        return f"https://www.youtube.com/playlist?list=PL{h}"
+    if kind == 'youtube':
+        return f"https://www.youtube.com/watch?v={h[:11]}"
+    if kind == 'spotify_playlist':
+        return f"https://open.spotify.com/playlist/{h}"
+    if kind == 'spotify':
+        return f"https://open.spotify.com/track/{h}"
+    if kind == 'soundcloud_playlist':
+        return f"https://soundcloud.com/replay/sets/{h}"
+    if kind == 'soundcloud':
+        return f"https://soundcloud.com/replay/{h}"
+    if kind == 'bandcamp':
+        return f"https://replay.bandcamp.com/track/{h}"
+    if kind == 'url':
+        return f"https://example.com/audio/{h}.mp3"
+    # Same length as the original, and identical text for identical originals
+    return (f"replay {h} " * (shape.get('len', 10) // 18 + 1))[:max(1, shape.get('len', 10))].strip() or h
+
+
+class ReplayClock:
+    """Follows the recorded timeline so the rate limiter sees the original call spacing."""
+
+    def __init__(self):
+        self.base = time()
+        self.offset = 0.0
+
+    def __call__(self) -> float:
+        return self.base + self.offset
+
+
+class Replayer:
+    """Maps pseudonymous guilds/users to fakes and dispatches recorded entries."""
+
+    def __init__(self):
+        self.cog = renify_core.MusicCog(None)
+        # Keyed by qualified name, so group sub-commands such as "playlist save" resolve to their own callbacks
+        self.commands = {cmd.qualified_name: cmd for cmd in self.cog.walk_app_commands()
+                         if isinstance(cmd, app_commands.Command)}
+        self.buttons = {}
+        self.guilds: dict[str, FakeGuild] = {}
+        self.users: dict[tuple, FakeUser] = {}
+        self.clock = ReplayClock()
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.lag: list[float] = []
+        self.errors: dict[str, int] = defaultdict(int)
+        self.skipped: dict[str, int] = defaultdict(int)
+
+    def setup_buttons(self):
+        # Views must be created inside the running loop
+        view = renify_controller.MusicControls(None)
+        self.buttons = {item.custom_id: item for item in view.children}
+
+    def interaction_for(self, entry: dict) -> FakeInteraction:
+        guild_key = entry.get('g') or 'dm'
+        guild = self.guilds.get(guild_key)
+        if guild is None:
+            guild = self.guilds[guild_key] = FakeGuild(len(self.guilds) + 1)
+        user = self.users.get((guild_key, entry['u']))
+        if user is None:
+            user = self.users[(guild_key, entry['u'])] = FakeUser(100_000 + len(self.users), guild.voice_channel)
+        return FakeInteraction(guild, user)
+
+    def arguments(self, command: app_commands.Command, options: dict) -> dict:
+        """Keyword arguments for ``command`` from its recorded options (a sub-command's own, for groups)."""
+        kwargs = {}
+        for param in command.parameters:
+            if param.name not in options:
+                continue
+            value = options[param.name]
+            kwargs[param.name] = synthesize_query(value) if isinstance(value, dict) else value
+        return kwargs
+
+    async def dispatch(self, entry: dict, scheduled: float):
+        self.lag.append(max(0.0, perf_counter() - scheduled) * 1000)
+        self.clock.offset = entry['t']
+        interaction = self.interaction_for(entry)
+        name = entry['n']
+        start = perf_counter()
+        try:
+            if entry['k'] == 'button':
+                item = self.buttons.get(name)
+                if item is None:
+                    self.skipped[name] += 1
+                    return
+                await item.callback(interaction)
+            else:
+                command = self.commands.get(name)
+                if command is None or name in SKIPPED_COMMANDS:
+                    self.skipped[name] += 1
+                    return
+                await command.callback(self.cog, interaction, **self.arguments(command, entry.get('o', {})))
+        except Exception as e:
+            self.errors[f"{name}: {type(e).__name__}"] += 1
+            return
+        self.latencies[name].append((perf_counter() - start) * 1000)
+
+
+async def replay(args) -> int:
+    entries = list(read_traffic(args.traffic))
+    if not entries:
+        print("No entries to replay")
+        return 1
+
+    fake = None
+    uri = args.lavalink
+    if not uri:
+        fake = FakeLavalink(FakeLavalinkConfig(latency_ms=args.fake_latency_ms, jitter_ms=args.fake_jitter_ms,
+                                               error_rate=args.fake_error_rate, seed=args.seed))
+        await fake.start(port=args.fake_port)
+        uri = f"http://127.0.0.1:{args.fake_port}"
+
+    client = SimpleNamespace(user=SimpleNamespace(id=1), dispatch=lambda *a, **k: None)
+    node = wavelink.Node(uri=uri, password=args.password, client=client)
+    await wavelink.Pool.connect(nodes=[node], client=client)
+
+    replayer = Replayer()
+    replayer.setup_buttons()
+    renify_core.time = replayer.clock
+    renify_core.rate_limiter.last_sweep = replayer.clock()
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def run(entry, scheduled):
+        async with semaphore:
+            await replayer.dispatch(entry, scheduled)
+
+    started = perf_counter()
+    tasks = []
+    first = entries[0]['t']
+    for entry in entries:
+        scheduled = started + ((entry['t'] - first) / args.speed if args.speed > 0 else 0.0)
+        delay = scheduled - perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(run(entry, scheduled)))
+    await asyncio.gather(*tasks)
+    elapsed = perf_counter() - started
+
+    print(f"Replayed {len(entries)} interactions ({entries[-1]['t'] - first:.1f}s recorded) in {elapsed:.2f}s "
+          f"→ {len(entries) / elapsed:.1f} interactions/s")
+    print(f"Scheduling lag: p50 {percentile(replayer.lag, 50):.1f} ms, p99 {percentile(replayer.lag, 99):.1f} ms")
+    print(f"\n{'command':<22} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, samples in sorted(replayer.latencies.items()):
+        print(f"{name:<22} {len(samples):>7} {percentile(samples, 50):>9.2f} {percentile(samples, 95):>9.2f} {percentile(samples, 99):>9.2f}")
+    if replayer.skipped:
+        print(f"\nSkipped: {dict(replayer.skipped)}")
+    if replayer.errors:
+        print(f"Errors: {dict(replayer.errors)}")
+
+    await wavelink.Pool.close()
+    if fake is not None:
+        await fake.stop()
+    return 1 if replayer.errors else 0
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Replay recorded interaction traffic through the cogs")
+    parser.add_argument('traffic', help="File written with RENIFY_RECORD_TRAFFIC")
+    parser.add_argument('--speed', type=float, default=1.0, help="Replay speed multiplier; 0 = as fast as possible")
+    parser.add_argument('--concurrency', type=int, default=256, help="Max interactions in flight")
+    parser.add_argument('--lavalink', help="Use this Lavalink node instead of an in-process fake one")
+    parser.add_argument('--password', default=renify_core.LAVALINK_PASSWORD)
+    parser.add_argument('--fake-port', type=int, default=2399)
+    parser.add_argument('--fake-latency-ms', type=float, default=20.0)
+    parser.add_argument('--fake-jitter-ms', type=float, default=10.0)
+    parser.add_argument('--fake-error-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    logging.getLogger('RenifyBot').setLevel(logging.WARNING)
+    logging.getLogger('aiohttp.access').setLevel(logging.WARNING)
+    tracer.path = None
+
+    sys.exit(asyncio.run(replay(args)))
+
+
+if __name__ == "__main__":
+    main()
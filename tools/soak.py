@@ -0,0 +1,268 @@
+"""
+Many-guild soak simulator for ``MusicCog``.
+
+Drives the real cog callbacks from ``renify_core`` with thousands of fake
+guilds and users (play, playlists, queue, skip, pause, stop and reconnect)
+over hours of *simulated* time, then reports RSS, object counts per type and
+command latency percentiles per sampling window. Exits non-zero if memory
+grows past the allowed threshold after warm-up.
+
+Usage (from the repository root):
+    python -m tools.soak --guilds 2000 --users 20000 --hours 6 --report soak_report.json
+"""
+import argparse
+import asyncio
+import atexit
+import gc
+import json
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+from collections import Counter
+from time import perf_counter, time
+
+# Simulated guilds must never reach the bot's real renify.db: point every SQLite store at a
+# throwaway file before renify_core imports them
+_DB_DIR = tempfile.mkdtemp(prefix='renify-soak-')
+atexit.register(shutil.rmtree, _DB_DIR, ignore_errors=True)
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_DB_DIR, 'renify.db')}"
+
+import wavelink
+
+import renify_core
+from benchmarks.fakes import FakeGuild, FakeInteraction, FakePlayer, FakeUser, make_track_payload
+from renify_idle import FINISHED, idle_manager
+from renify_memory import rss_bytes
+from renify_tracing import tracer
+
+logger = logging.getLogger('RenifyBot.soak')
+
+ACTIONS = {
+    'play': 40,
+    'play_playlist': 5,
+    'queue': 15,
+    'skip': 10,
+    'pause_resume': 10,
+    'stop': 10,
+    'reconnect': 5,
+    'idle': 5,
+}
+
+
+class SimClock:
+    """Virtual wall clock patched into ``renify_core.time``."""
+
+    def __init__(self):
+        # Start at the real time so state created at import (e.g. the rate limiter) stays consistent
+        self.now = time()
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class SoakSimulator:
+    """Owns the simulated fleet and runs commands through the cog."""
+
+    def __init__(self, guilds: int, users: int, catalog: int, seed: int):
+        self.rng = random.Random(seed)
+        self.clock = SimClock()
+        self.cog = renify_core.MusicCog(None)
+        self.guilds = [FakeGuild(guild_id) for guild_id in range(1, guilds + 1)]
+        self.users = [FakeUser(10_000 + i, self.guilds[i % guilds].voice_channel) for i in range(users)]
+        self.catalog = [make_track_payload(i) for i in range(catalog)]
+        self.latencies: dict[str, list[float]] = {}
+        self.commands = 0
+
+    def install(self):
+        """Patch the clock and Lavalink search so the cog runs fully offline."""
+        self._patched = (renify_core.time, idle_manager.clock, vars(wavelink.Playable)['search'])
+        renify_core.time = self.clock
+        idle_manager.clock = self.clock
+        wavelink.Playable.search = self.search
+
+    def uninstall(self):
+        """Undo ``install``."""
+        renify_core.time, idle_manager.clock, wavelink.Playable.search = self._patched
+
+    async def search(self, query: str, **kwargs):
+        if query.startswith('playlist:'):
+            size = self.rng.randint(20, 200)
+            start = self.rng.randrange(len(self.catalog))
+            return wavelink.Playlist({
+                'info': {'name': f'Soak Playlist {start}', 'selectedTrack': -1},
+                'tracks': [self.catalog[(start + i) % len(self.catalog)] for i in range(size)],
+                'pluginInfo': {},
+            })
+        return [wavelink.Playable(self.rng.choice(self.catalog))]
+
+    async def run_command(self, name: str, callback, user: FakeUser, *args):
+        interaction = FakeInteraction(self.guilds[(user.id - 10_000) % len(self.guilds)], user)
+        start = perf_counter()
+        await callback(self.cog, interaction, *args)
+        self.latencies.setdefault(name, []).append((perf_counter() - start) * 1000)
+        self.commands += 1
+
+    async def step(self, actions: int, step_seconds: float):
+        """Advance simulated time and run a batch of random user actions."""
+        self.clock.advance(step_seconds)
+        self.advance_playback(step_seconds)
+        await idle_manager.reap()
+        names, weights = zip(*ACTIONS.items())
+        for action in self.rng.choices(names, weights, k=actions):
+            user = self.rng.choice(self.users)
+            guild = self.guilds[(user.id - 10_000) % len(self.guilds)]
+            player: FakePlayer | None = guild.voice_client
+            if action == 'play':
+                await self.run_command('play', renify_core.MusicCog.play_command.callback, user, f'song {self.rng.random()}')
+            elif action == 'play_playlist':
+                await self.run_command('play', renify_core.MusicCog.play_command.callback, user, f'playlist:{self.rng.random()}')
+            elif action == 'queue' and player:
+                await self.run_command('queue', renify_core.MusicCog.queue_command.callback, user)
+            elif action == 'skip' and player and player.playing:
+                await self.run_command('skip', renify_core.MusicCog.skip_command.callback, user)
+                self.play_next(player)
+            elif action == 'pause_resume' and player and player.playing:
+                if player.paused:
+                    await self.run_command('resume', renify_core.MusicCog.resume_command.callback, user)
+                else:
+                    await self.run_command('pause', renify_core.MusicCog.pause_command.callback, user)
+            elif action == 'stop' and player:
+                await self.run_command('stop', renify_core.MusicCog.stop_command.callback, user)
+            elif action == 'reconnect' and player:
+                # Simulate a dropped voice connection; the next /play reconnects
+                await player.disconnect()
+
+    def advance_playback(self, seconds: float):
+        """Finish tracks whose length has elapsed, like TrackEnd + autoplay would."""
+        for guild in self.guilds:
+            player = guild.voice_client
+            if player is None or player.current is None or player.paused:
+                continue
+            player.elapsed = getattr(player, 'elapsed', 0) + seconds * 1000
+            if player.elapsed >= player.current.length:
+                self.play_next(player)
+
+    @staticmethod
+    def play_next(player: FakePlayer):
+        player.elapsed = 0
+        player.current = player.queue.get() if not player.queue.is_empty else None
+        if player.current is None:
+            idle_manager.mark_idle(player, FINISHED)  # What the TrackEnd listener does
+
+    def sample(self, sim_hours: float, top_types: int) -> dict:
+        """Collect one measurement window and reset latency buffers."""
+        gc.collect()
+        counts = Counter(type(o).__name__ for o in gc.get_objects())
+        window = {
+            'sim_hours': round(sim_hours, 3),
+            'rss_mb': round((rss_bytes() or 0) / 1024 / 1024, 2),
+            'commands': self.commands,
+            'players': sum(1 for g in self.guilds if g.voice_client is not None),
+            'idle_players': len(idle_manager),
+            'queued_tracks': sum(len(g.voice_client.queue) for g in self.guilds if g.voice_client is not None),
+            'rate_limiter_users': len(renify_core.rate_limiter.users),
+            'latency_ms': {
+                name: {'p50': round(percentile(s, 50), 3), 'p95': round(percentile(s, 95), 3),
+                       'p99': round(percentile(s, 99), 3), 'n': len(s)}
+                for name, s in self.latencies.items()
+            },
+            'objects': dict(counts.most_common(top_types)),
+        }
+        self.latencies = {}
+        return window
+
+
+async def soak(args) -> int:
+    sim = SoakSimulator(args.guilds, args.users, args.catalog, args.seed)
+
+    steps = int(args.hours * 3600 / args.step_seconds)
+    sample_every = max(1, int(args.sample_minutes * 60 / args.step_seconds))
+    warmup_steps = int(args.warmup_minutes * 60 / args.step_seconds)
+    samples: list[dict] = []
+    baseline: dict | None = None
+
+    print(f"{'sim h':>6} {'rss MB':>8} {'players':>8} {'queued':>8} {'rl users':>9} {'play p50':>9} {'play p99':>9}")
+    sim.install()
+    try:
+        for step in range(1, steps + 1):
+            await sim.step(args.actions, args.step_seconds)
+            if step % sample_every == 0 or step == steps:
+                window = sim.sample(step * args.step_seconds / 3600, args.top_types)
+                samples.append(window)
+                if baseline is None and step >= warmup_steps:
+                    baseline = window
+                play = window['latency_ms'].get('play', {})
+                print(f"{window['sim_hours']:>6.2f} {window['rss_mb']:>8.1f} {window['players']:>8} {window['queued_tracks']:>8} "
+                      f"{window['rate_limiter_users']:>9} {play.get('p50', 0):>9.3f} {play.get('p99', 0):>9.3f}")
+    finally:
+        sim.uninstall()
+
+    baseline = baseline or samples[0]
+    final = samples[-1]
+    growth_mb = final['rss_mb'] - baseline['rss_mb']
+    object_growth = {
+        name: count - baseline['objects'].get(name, 0)
+        for name, count in final['objects'].items()
+        if count - baseline['objects'].get(name, 0) > 0
+    }
+    result = {
+        'config': vars(args),
+        'rss_growth_mb': round(growth_mb, 2),
+        'object_growth': dict(sorted(object_growth.items(), key=lambda kv: -kv[1])),
+        'samples': samples,
+    }
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+        print(f"Report written to {args.report}")
+
+    print(f"\nRSS growth after warm-up: {growth_mb:+.1f} MB (limit {args.max_growth_mb} MB)")
+    if object_growth:
+        top = ', '.join(f"{name} +{count}" for name, count in list(result['object_growth'].items())[:8])
+        print(f"Largest object count growth: {top}")
+    if growth_mb > args.max_growth_mb:
+        print("❌ Memory grew past the threshold")
+        return 1
+    print("✅ Memory stayed within the threshold")
+    return 0
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="Soak-test MusicCog with simulated guilds and users")
+    parser.add_argument('--guilds', type=int, default=2000)
+    parser.add_argument('--users', type=int, default=20000)
+    parser.add_argument('--catalog', type=int, default=20000, help="Distinct tracks searches can return")
+    parser.add_argument('--hours', type=float, default=4.0, help="Simulated hours to run")
+    parser.add_argument('--step-seconds', type=float, default=5.0, help="Simulated seconds per step")
+    parser.add_argument('--actions', type=int, default=20, help="User actions per step")
+    parser.add_argument('--sample-minutes', type=float, default=15.0, help="Simulated minutes per sample window")
+    parser.add_argument('--warmup-minutes', type=float, default=30.0, help="Simulated minutes before the RSS baseline")
+    parser.add_argument('--max-growth-mb', type=float, default=50.0, help="Allowed RSS growth after warm-up")
+    parser.add_argument('--top-types', type=int, default=25, help="Object types recorded per sample")
+    parser.add_argument('--report', help="Write samples and summary as JSON")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    # Per-command INFO logs and trace files would dominate both time and memory
+    logging.getLogger('RenifyBot').setLevel(logging.WARNING)
+    tracer.path = None
+    tracer.sample_rate = 0.0
+
+    sys.exit(asyncio.run(soak(args)))
+
+
+if __name__ == "__main__":
+    main()